@@ -0,0 +1,109 @@
+import os
+import sys
+
+# Get the absolute path of the src directory
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'src'))
+
+# Add the src directory to sys.path
+sys.path.insert(0, src_path)
+
+
+import argparse
+import json
+import tempfile
+
+from benchmarks.runner import (
+    compare_metadata,
+    compare_results,
+    format_duration,
+    run_benchmarks,
+)
+from benchmarks.suite import get_benchmarks
+
+
+def print_progress(name: str, timings: dict):
+    """
+    Print the minimum and median timing of a finished benchmark to stderr.
+    """
+    print(
+        f"{name:<50} {format_duration(timings['min']):>10} min {format_duration(timings['median']):>10} median  "
+        f"({timings['loops']} loops x {timings['repeat']})",
+        file=sys.stderr,
+    )
+
+
+def print_comparison(comparison: list[dict]):
+    """
+    Print the comparison of the current results against the baseline to stderr.
+    """
+    print(file=sys.stderr)
+    for entry in comparison:
+        if entry["status"] == "new":
+            print(f"{entry['name']:<50} {'new':>24}", file=sys.stderr)
+            continue
+        print(
+            f"{entry['name']:<50} {format_duration(entry['baseline']):>10} -> "
+            f"{format_duration(entry['current']):>10}  x{entry['ratio']:.2f}  {entry['status']}",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run the benchmarks of the habit tracker."
+    )
+    parser.add_argument(
+        "--output", help="The file to write the results to as JSON, or - for stdout."
+    )
+    parser.add_argument(
+        "--baseline",
+        help="A results file of an earlier run to compare against. Regressions result in exit code 1.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="The relative change of the minimum which counts as a regression, e.g. 0.1 for 10%%.",
+    )
+    parser.add_argument(
+        "--filter", help="Only run the benchmarks whose name contains this text."
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="The number of measurements per benchmark.",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=1,
+        help="The number of measurements per benchmark to discard before timing.",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Leave out the largest store sizes."
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = run_benchmarks(
+            get_benchmarks(directory, args.quick),
+            repeat=args.repeat,
+            name_filter=args.filter,
+            progress=print_progress,
+            warmup=args.warmup,
+        )
+    if args.output == "-":
+        print(json.dumps(results, indent=2))
+    elif args.output is not None:
+        with open(args.output, 'w') as fp:
+            json.dump(results, fp, indent=2)
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as fp:
+            baseline = json.load(fp)
+        for warning in compare_metadata(baseline, results):
+            print(f"Warning: {warning}", file=sys.stderr)
+        comparison = compare_results(baseline, results, args.threshold)
+        print_comparison(comparison)
+        if any(entry["status"] == "regression" for entry in comparison):
+            sys.exit(1)
@@ -8,37 +8,136 @@ src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'src'))
 sys.path.insert(0, src_path)
 
 
-import datetime
-import random
+import argparse
+import json
+from datetime import date, datetime, timedelta
 
+from data_storage.demo_data import RATE_DISTRIBUTIONS, generate_habits, generate_records
 from data_storage.json import JsonStorageInterface
-from habit_tracking.users import User
+from data_storage.jsonl import import_records
+from instrumentation.profiling import profile_until_exit
+
+
+def get_usernames(username: str, users: int) -> list[str]:
+    """
+    Get the usernames of the users to generate.
+    Args:
+        username: The username, used as it is for a single user and as a prefix followed by a number otherwise.
+        users: The number of users.
+
+    Returns:
+        The usernames.
+    """
+    if users == 1:
+        return [username]
+    return [f"{username}{number}" for number in range(1, users + 1)]
+
 
 if __name__ == "__main__":
-    days_of_data = 30
-    completion_rate = 0.75
-    username = "testuser"
-    storage_file = "demo_data.json"
-
-    storage = JsonStorageInterface(storage_file)
-    user = storage.get_user(username)
-    if user is None:
-        user = User(username)
-        storage.insert_user(user)
-    all_habits = storage.get_all_habits()
-    for habit in all_habits:
-        userhabit = user.add_habit(habit)
-        userhabit.creation_time = userhabit.creation_time - datetime.timedelta(days=30)
-        time_frames = userhabit.habit.get_all_periods_since(userhabit.creation_time)
-        for time_frame_start, time_frame_end in time_frames:
-            if random.random() < completion_rate:
-                time_frame_start = max(time_frame_start, userhabit.creation_time)
-                time_frame_end = min(time_frame_end, datetime.datetime.now())
-                completion_time = time_frame_start + datetime.timedelta(
-                    seconds=random.randint(
-                        0, int((time_frame_end - time_frame_start).total_seconds())
-                    )
-                )
-                userhabit.track_completion(completion_time)
-        storage.insert_user_habit(userhabit)
-    storage.update_user(user)
+    parser = argparse.ArgumentParser(
+        description="Generate reproducible demo data for the habit tracker."
+    )
+    parser.add_argument(
+        "--storage", default="demo_data.json", help="The JSON storage file to use."
+    )
+    parser.add_argument(
+        "--users", type=int, default=1, help="The number of users to generate."
+    )
+    parser.add_argument(
+        "--username",
+        default="testuser",
+        help="The username, used as a prefix followed by a number for multiple users.",
+    )
+    parser.add_argument(
+        "--habits",
+        type=int,
+        default=0,
+        help="The number of demo habits to generate. By default, the habits in the storage are used.",
+    )
+    parser.add_argument(
+        "--habits-per-user",
+        type=int,
+        default=None,
+        help="The number of habits tracked by each user. Defaults to all habits.",
+    )
+    history = parser.add_mutually_exclusive_group()
+    history.add_argument(
+        "--days", type=int, default=30, help="The days of history to generate."
+    )
+    history.add_argument(
+        "--years", type=float, help="The years of history to generate."
+    )
+    parser.add_argument(
+        "--end-date",
+        default=date.today().isoformat(),
+        help="The date (YYYY-MM-DD) up to which completions are generated. Defaults to today.",
+    )
+    parser.add_argument(
+        "--completion-rate",
+        type=float,
+        default=0.75,
+        help="The mean probability of completing a habit in each period.",
+    )
+    parser.add_argument(
+        "--rate-distribution",
+        choices=RATE_DISTRIBUTIONS,
+        default="fixed",
+        help="The distribution of the completion rates of the tracked habits.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="The seed for the random data."
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="The number of worker processes. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10000,
+        help="The number of records to insert per storage write.",
+    )
+    parser.add_argument(
+        "--profile",
+        help="Profile CPU time and memory allocations, and write a report to this file at exit. Only "
+        "the main process is profiled.",
+    )
+    args = parser.parse_args()
+    if args.profile is not None:
+        profile_until_exit(args.profile)
+
+    end = datetime.fromisoformat(args.end_date)
+    days = round(args.years * 365) if args.years is not None else args.days
+    start = end - timedelta(days=days)
+
+    storage = JsonStorageInterface(args.storage)
+    if args.habits > 0:
+        # Habits which already exist in the storage are used as they are
+        habits = [
+            storage.get_habit(habit.name) or habit
+            for habit in generate_habits(args.habits, start, args.seed)
+        ]
+    else:
+        habits = storage.get_all_habits()
+    if len(habits) == 0:
+        parser.error("The storage contains no habits. Use --habits to generate some.")
+    usernames = [
+        username
+        for username in get_usernames(args.username, args.users)
+        if storage.get_user(username) is None
+    ]
+    records = generate_records(
+        habits,
+        usernames,
+        args.habits_per_user or len(habits),
+        start,
+        end,
+        args.completion_rate,
+        args.rate_distribution,
+        args.seed,
+        args.processes,
+    )
+    stats = import_records(storage, records, args.batch_size)
+    print(json.dumps(stats), file=sys.stderr)
@@ -1,3 +1,8 @@
+import time
+
+# Measured as early as possible, for the --timings option
+start_time = time.perf_counter()
+
 import os
 import sys
 
@@ -8,9 +13,98 @@ src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'src'))
 sys.path.insert(0, src_path)
 
 
-from cli_menu.user_selection import user_menu_main
-from data_storage.json import JsonStorageInterface
+import argparse
+
+from cli_menu.batch_parser import add_batch_commands
+from data_storage.lazy import LazyStorage
+
+imports_done_time = time.perf_counter()
+
+
+def open_storage(file_path: str, event_log_path: str = None):
+    """
+    Open the JSON storage file, recording changes in the event log if one is given. Runs in a background thread, so
+    parsing a large file doesn't delay the first prompt.
+    """
+    from data_storage.json import JsonStorageInterface
+
+    storage = JsonStorageInterface(file_path)
+    if event_log_path is not None:
+        from data_storage.event_sourced import EventSourcedStorage
+
+        storage = EventSourcedStorage(storage, event_log_path)
+    return storage
+
+
+def report_timing(label: str, seconds: float):
+    """
+    Print a startup timing to stderr.
+    """
+    print(f"[timings] {label}: {seconds * 1000:.1f} ms", file=sys.stderr)
+
 
 if __name__ == "__main__":
-    storage = JsonStorageInterface("demo_data.json")
-    user_menu_main(storage)
+    parser = argparse.ArgumentParser(
+        description="Habit tracker. Starts the interactive menu unless a command is given."
+    )
+    parser.add_argument(
+        "--storage", default="demo_data.json", help="The JSON storage file to use."
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print import, startup and storage loading timings to stderr.",
+    )
+    parser.add_argument(
+        "--metrics",
+        help="Record call counts, latencies and bytes read and written, and write them to this file at exit, in the "
+        "Prometheus text format for files ending in .prom or .txt and as JSON otherwise.",
+    )
+    parser.add_argument(
+        "--profile",
+        help="Profile CPU time and memory allocations, and write a report to this file at exit.",
+    )
+    parser.add_argument(
+        "--event-log",
+        help="Record all changes of tracked habits in this event log, and read streaks from its projections.",
+    )
+    add_batch_commands(parser)
+    args = parser.parse_args()
+    if args.profile is not None:
+        from instrumentation.profiling import profile_until_exit
+
+        profile_until_exit(args.profile)
+    if args.metrics is not None:
+        from instrumentation.metrics import export_metrics_at_exit
+
+        export_metrics_at_exit(args.metrics)
+    # cProfile only covers the main thread, so the storage isn't loaded in the background while profiling
+    storage = LazyStorage(
+        lambda: open_storage(args.storage, args.event_log),
+        preload=args.profile is None,
+    )
+    if args.command is None:
+        from cli_menu.user_selection import user_menu_main
+
+        if args.timings:
+            report_timing("imports", imports_done_time - start_time)
+            report_timing(
+                "startup until first prompt", time.perf_counter() - start_time
+            )
+        user_menu_main(storage)
+        exit_code = 0
+    else:
+        # Imported only when needed, since it loads the analytics and projections modules
+        from cli_menu.batch_commands import run_batch_command
+
+        exit_code = run_batch_command(storage, args)
+    if args.event_log is not None and storage.loaded:
+        # Checkpoint the projections, so the next start only needs to apply new events
+        storage.close()
+    if args.timings:
+        if args.command is not None:
+            report_timing("imports", imports_done_time - start_time)
+        if storage.load_time is not None:
+            report_timing("storage loading (in the background)", storage.load_time)
+        report_timing("total", time.perf_counter() - start_time)
+    sys.exit(exit_code)
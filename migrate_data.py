@@ -0,0 +1,129 @@
+import os
+import sys
+
+# Get the absolute path of the src directory
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'src'))
+
+# Add the src directory to sys.path
+sys.path.insert(0, src_path)
+
+
+import argparse
+import json
+from datetime import datetime
+
+from data_storage.csv_import import import_completions_csv
+from data_storage.json import JsonStorageInterface
+from data_storage.json_stream import export_store_file, write_store_file
+from data_storage.jsonl import import_records, read_jsonl, write_jsonl
+from instrumentation.profiling import profile_until_exit
+
+
+def export_command(args: argparse.Namespace):
+    """
+    Export the data storage to a JSON Lines file, or to stdout if the output is "-".
+    The records are streamed from the storage file, so the data is never loaded into memory as a whole.
+    """
+    if args.output == "-":
+        count = write_jsonl(export_store_file(args.storage), sys.stdout)
+    else:
+        with open(args.output, 'w') as fp:
+            count = write_jsonl(export_store_file(args.storage), fp)
+    print(f"Exported {count} records.", file=sys.stderr)
+
+
+def import_command(args: argparse.Namespace):
+    """
+    Import a JSON Lines file, or stdin if the input is "-", into the data storage.
+    A new storage file is written record by record in constant memory. Importing into an existing storage file loads
+    it completely and rewrites it once per batch, see import_records.
+    """
+
+    def import_from(fp) -> dict[str, dict[str, int]]:
+        if not os.path.exists(args.storage):
+            return write_store_file(read_jsonl(fp), args.storage)
+        storage = JsonStorageInterface(args.storage)
+        return import_records(storage, read_jsonl(fp), args.batch_size)
+
+    if args.input == "-":
+        stats = import_from(sys.stdin)
+    else:
+        with open(args.input, 'r') as fp:
+            stats = import_from(fp)
+    print(json.dumps(stats), file=sys.stderr)
+
+
+def import_csv_command(args: argparse.Namespace):
+    """
+    Import completions of tracked habits from a CSV file, or stdin if the input is "-", into the data storage.
+    """
+    storage = JsonStorageInterface(args.storage)
+    if args.input == "-":
+        report = import_completions_csv(storage, sys.stdin)
+    else:
+        with open(args.input, 'r', newline='') as fp:
+            report = import_completions_csv(storage, fp)
+    print(json.dumps(report))
+    print(
+        f"Imported {report['imported']} of {report['rows']} completions.",
+        file=sys.stderr,
+    )
+
+
+def archive_command(args: argparse.Namespace):
+    """
+    Move all completions of periods ending before a date from the data storage into its archive file.
+    """
+    storage = JsonStorageInterface(args.storage)
+    count = storage.archive_completions(datetime.fromisoformat(args.before))
+    print(f"Archived {count} completions to {storage.archive_path}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export, import or archive the habit tracker data."
+    )
+    parser.add_argument(
+        "--storage", default="demo_data.json", help="The JSON storage file to use."
+    )
+    parser.add_argument(
+        "--profile",
+        help="Profile CPU time and memory allocations, and write a report to this file at exit.",
+    )
+    subparsers = parser.add_subparsers(required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export all records.")
+    export_parser.add_argument("output", help="The file to write to, or - for stdout.")
+    export_parser.set_defaults(func=export_command)
+
+    import_parser = subparsers.add_parser("import", help="Import records.")
+    import_parser.add_argument("input", help="The file to read from, or - for stdin.")
+    import_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="The number of records to insert per storage write.",
+    )
+    import_parser.set_defaults(func=import_command)
+
+    import_csv_parser = subparsers.add_parser(
+        "import-csv",
+        help="Import completions from a CSV file with the columns username, habit and completion_time.",
+    )
+    import_csv_parser.add_argument(
+        "input", help="The file to read from, or - for stdin."
+    )
+    import_csv_parser.set_defaults(func=import_csv_command)
+
+    archive_parser = subparsers.add_parser("archive", help="Archive old completions.")
+    archive_parser.add_argument(
+        "--before",
+        required=True,
+        help="The date (YYYY-MM-DD) before which completions are archived.",
+    )
+    archive_parser.set_defaults(func=archive_command)
+
+    args = parser.parse_args()
+    if args.profile is not None:
+        profile_until_exit(args.profile)
+    args.func(args)
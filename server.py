@@ -0,0 +1,56 @@
+import os
+import sys
+
+# Get the absolute path of the src directory
+src_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'src'))
+
+# Add the src directory to sys.path
+sys.path.insert(0, src_path)
+
+
+import argparse
+import asyncio
+
+from data_storage.json import JsonStorageInterface
+from http_api.server import HabitTrackerServer
+from instrumentation.metrics import export_metrics_at_exit
+
+
+async def serve(args: argparse.Namespace):
+    """
+    Load the data storage once and serve it until interrupted.
+    """
+    server = HabitTrackerServer(
+        JsonStorageInterface(args.storage), host=args.host, port=args.port
+    )
+    await server.start()
+    print(
+        f"Serving {args.storage} on http://{args.host}:{server.port}", file=sys.stderr
+    )
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve the habit tracker data over a local HTTP API."
+    )
+    parser.add_argument(
+        "--storage", default="demo_data.json", help="The JSON storage file to use."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="The host to listen on.")
+    parser.add_argument("--port", type=int, default=8080, help="The port to listen on.")
+    parser.add_argument(
+        "--metrics",
+        help="Record call counts, latencies and bytes read and written, and write them to this file at exit, in the "
+        "Prometheus text format for files ending in .prom or .txt and as JSON otherwise.",
+    )
+    args = parser.parse_args()
+    if args.metrics is not None:
+        export_metrics_at_exit(args.metrics)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,244 @@
+import gc
+import platform
+import statistics
+from collections.abc import Callable
+from datetime import datetime
+from time import perf_counter
+
+
+class Benchmark:
+    """
+    A single named benchmark.
+
+    The setup function prepares everything that should not be timed and returns the function to time. Benchmarks of
+    operations which change their own preconditions, like the first save after loading a file, can request a fresh
+    setup before every timed call.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        setup: Callable[[], Callable[[], object]],
+        setup_per_call: bool = False,
+    ):
+        """
+        Args:
+            name: The unique name of the benchmark, with dot separated parts from general to specific.
+            setup: A function preparing the benchmark and returning the function to time.
+            setup_per_call: Whether to call the setup function before every timed call, instead of only once.
+        """
+        self.name = name
+        self.setup = setup
+        self.setup_per_call = setup_per_call
+
+
+def measure(
+    benchmark: Benchmark, repeat: int = 5, min_time: float = 0.1, warmup: int = 1
+) -> dict:
+    """
+    Time a benchmark. The garbage collector is disabled while timing, like in timeit.
+    Unless the benchmark needs a setup per call, the number of calls per measurement is increased until a measurement
+    takes at least min_time, so that fast operations are timed precisely. Warm-up measurements are taken first and
+    discarded, so caches, lazy imports and allocator pools are primed before anything is timed.
+    Args:
+        benchmark: The benchmark to time.
+        repeat: The number of measurements.
+        min_time: The minimum duration of a measurement in seconds.
+        warmup: The number of measurements to discard before timing.
+
+    Returns:
+        The "min", "max", "median" and "mean" time per call in seconds, together with the number of "loops" (calls
+        per measurement), "repeat" (measurements) and "warmup" (discarded measurements).
+    """
+    assert repeat > 0, "Repeat must be positive."
+    assert warmup >= 0, "Warmup must not be negative."
+    timings = []
+    gc_enabled = gc.isenabled()
+    try:
+        if benchmark.setup_per_call:
+            loops = 1
+            for _ in range(warmup + repeat):
+                function = benchmark.setup()
+                gc.disable()
+                start = perf_counter()
+                function()
+                timings.append(perf_counter() - start)
+                if gc_enabled:
+                    gc.enable()
+        else:
+            function = benchmark.setup()
+            gc.disable()
+            loops = 1
+            while True:
+                duration = time_calls(function, loops)
+                if duration >= min_time:
+                    break
+                loops = loops * 10 if duration * 10 < min_time else loops * 2
+            # The last calibration measurement is the first warm-up measurement, or the first timed one without warm-up
+            timings.append(duration / loops)
+            for _ in range(warmup + repeat - 1):
+                timings.append(time_calls(function, loops) / loops)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    timings = timings[warmup:]
+    return {
+        "min": min(timings),
+        "max": max(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "loops": loops,
+        "repeat": repeat,
+        "warmup": warmup,
+    }
+
+
+def time_calls(function: Callable[[], object], loops: int) -> float:
+    """
+    Time a number of consecutive calls of a function.
+    Args:
+        function: The function to call.
+        loops: The number of calls.
+
+    Returns:
+        The total duration of the calls in seconds.
+    """
+    start = perf_counter()
+    for _ in range(loops):
+        function()
+    return perf_counter() - start
+
+
+def run_benchmarks(
+    benchmarks: list[Benchmark],
+    repeat: int = 5,
+    min_time: float = 0.1,
+    name_filter: str = None,
+    progress: Callable[[str, dict], object] = None,
+    warmup: int = 1,
+) -> dict:
+    """
+    Run benchmarks and collect their results in a JSON compatible format.
+    Args:
+        benchmarks: The benchmarks to run.
+        repeat: The number of measurements per benchmark.
+        min_time: The minimum duration of a measurement in seconds.
+        name_filter: If given, only benchmarks whose name contains this text are run.
+        progress: A function called with the name and the timings of each benchmark once it is done.
+        warmup: The number of measurements per benchmark to discard before timing.
+
+    Returns:
+        A dictionary with the "metadata" of the run (python version, platform and time) and the timings of each
+        benchmark by name under "benchmarks".
+    """
+    results = {
+        "metadata": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": datetime.now().isoformat(timespec="seconds"),
+        },
+        "benchmarks": {},
+    }
+    for benchmark in benchmarks:
+        if name_filter is not None and name_filter not in benchmark.name:
+            continue
+        timings = measure(benchmark, repeat, min_time, warmup)
+        results["benchmarks"][benchmark.name] = timings
+        if progress is not None:
+            progress(benchmark.name, timings)
+    return results
+
+
+def compare_results(
+    baseline: dict, results: dict, threshold: float = 0.1
+) -> list[dict]:
+    """
+    Compare the minimum timings of benchmark results against a baseline.
+    The minimum is the measurement least disturbed by other processes, so it is compared instead of the median. A
+    benchmark only counts as a regression or improvement if, in addition, the ranges of its measurements in both runs
+    don't overlap, so that noise within a run is never reported as a change. Baselines recorded without the "max" of
+    each benchmark are compared on the minimum alone.
+    Args:
+        baseline: The results of an earlier run, as returned by run_benchmarks.
+        results: The results of the current run, as returned by run_benchmarks.
+        threshold: The relative change of the minimum above which a benchmark counts as a regression or improvement,
+            e.g. 0.1 for 10%.
+
+    Returns:
+        One entry per benchmark of the current results, with the "name", the "baseline" and "current" minimum in
+        seconds, their "ratio" and the "status", which is "regression", "improvement", "unchanged", or "new" if the
+        benchmark is not part of the baseline.
+    """
+    assert threshold >= 0, "Threshold must not be negative."
+    comparison = []
+    for name, timings in results["benchmarks"].items():
+        baseline_timings = baseline["benchmarks"].get(name)
+        if baseline_timings is None:
+            comparison.append(
+                {
+                    "name": name,
+                    "baseline": None,
+                    "current": timings["min"],
+                    "ratio": None,
+                    "status": "new",
+                }
+            )
+            continue
+        ratio = timings["min"] / baseline_timings["min"]
+        if ratio > 1 + threshold and timings["min"] > baseline_timings.get(
+            "max", baseline_timings["min"]
+        ):
+            status = "regression"
+        elif ratio < 1 / (1 + threshold) and baseline_timings["min"] > timings.get(
+            "max", timings["min"]
+        ):
+            status = "improvement"
+        else:
+            status = "unchanged"
+        comparison.append(
+            {
+                "name": name,
+                "baseline": baseline_timings["min"],
+                "current": timings["min"],
+                "ratio": ratio,
+                "status": status,
+            }
+        )
+    return comparison
+
+
+def compare_metadata(baseline: dict, results: dict) -> list[str]:
+    """
+    Check whether benchmark results were recorded in the same environment as a baseline. Timings of different Python
+    versions or platforms are not comparable, so a comparison between them should not be trusted.
+    Args:
+        baseline: The results of an earlier run, as returned by run_benchmarks.
+        results: The results of the current run, as returned by run_benchmarks.
+
+    Returns:
+        A warning for every difference in the "python" version or "platform", empty if the environments match.
+    """
+    warnings = []
+    for key in ("python", "platform"):
+        baseline_value = baseline["metadata"].get(key)
+        value = results["metadata"].get(key)
+        if baseline_value != value:
+            warnings.append(
+                f"The baseline was recorded with {key} {baseline_value}, but the current run uses {value}."
+            )
+    return warnings
+
+
+def format_duration(seconds: float) -> str:
+    """
+    Format a duration with a unit that fits its magnitude.
+    Args:
+        seconds: The duration in seconds.
+
+    Returns:
+        The formatted duration, e.g. "12.3 us".
+    """
+    for unit, factor in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= factor:
+            return f"{seconds / factor:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
@@ -0,0 +1,155 @@
+import os
+from datetime import datetime, timedelta
+from functools import cache
+
+from benchmarks.runner import Benchmark
+from data_storage.demo_data import PERIODS, generate_habits, generate_records
+from data_storage.json import JsonStorageInterface
+from data_storage.jsonl import import_records
+from habit_analysis.analytics import (
+    get_current_streak_for_habit,
+    get_longest_streak_for_habit,
+)
+from habit_tracking.habits import Habit, UserHabit
+
+# History lengths in days for the history and streak benchmarks
+HISTORY_DAYS = (30, 365, 3650)
+# Store sizes in users for the storage benchmarks, each user tracking 5 habits over a year
+STORE_USERS = (10, 100, 1000)
+QUICK_STORE_USERS = (10, 100)
+
+
+def get_user_habit(period: str, days: int) -> UserHabit:
+    """
+    Create a UserHabit tracked for a number of days up to now, completed in every period but every seventh.
+    Args:
+        period: The period of the tracked habit.
+        days: The number of days of history.
+
+    Returns:
+        The UserHabit object.
+    """
+    now = datetime.now()
+    habit = Habit("Benchmark habit", "", period, creation_time=now)
+    user_habit = UserHabit(habit, creation_time=now - timedelta(days=days))
+    for index, (period_start, _) in enumerate(
+        habit.get_all_periods_since(user_habit.creation_time)
+    ):
+        if index % 7 != 6:
+            user_habit.track_completion(max(period_start, user_habit.creation_time))
+    return user_habit
+
+
+def get_benchmarks(directory: str, quick: bool = False) -> list[Benchmark]:
+    """
+    Get all benchmarks of the suite. The data for each benchmark is only prepared once the benchmark runs.
+    Args:
+        directory: A directory for the storage files of the storage benchmarks.
+        quick: Whether to leave out the largest store sizes.
+
+    Returns:
+        The benchmarks, covering period generation for each period type, completion history and streak computation for
+        different history lengths, loading and saving complete stores of different sizes, and single write operations.
+    """
+
+    @cache
+    def get_store_path(users: int) -> str:
+        file_path = os.path.join(directory, f"benchmark_{users}.json")
+        end = datetime(2024, 1, 1)
+        start = end - timedelta(days=365)
+        storage = JsonStorageInterface(file_path)
+        records = generate_records(
+            generate_habits(20, start, seed=0),
+            [f"user{number}" for number in range(1, users + 1)],
+            5,
+            start,
+            end,
+            0.75,
+            seed=0,
+            processes=1,
+        )
+        import_records(storage, records, batch_size=100000)
+        return file_path
+
+    benchmarks = []
+    for period in PERIODS:
+
+        def setup_periods(period=period):
+            habit = Habit("Benchmark habit", "", period)
+            start_time = datetime.now() - timedelta(days=3650)
+            return lambda: habit.get_all_periods_since(start_time)
+
+        benchmarks.append(Benchmark(f"periods.{period}.3650_days", setup_periods))
+
+    for days in HISTORY_DAYS:
+
+        def setup_history(days=days):
+            return get_user_habit("daily", days).get_completion_history
+
+        def setup_current_streak(days=days):
+            user_habit = get_user_habit("daily", days)
+            return lambda: get_current_streak_for_habit(user_habit)
+
+        def setup_longest_streak(days=days):
+            user_habit = get_user_habit("daily", days)
+            return lambda: get_longest_streak_for_habit(user_habit)
+
+        benchmarks.append(Benchmark(f"history.daily.{days}_days", setup_history))
+        benchmarks.append(
+            Benchmark(f"streak.current.daily.{days}_days", setup_current_streak)
+        )
+        benchmarks.append(
+            Benchmark(f"streak.longest.daily.{days}_days", setup_longest_streak)
+        )
+
+    for users in QUICK_STORE_USERS if quick else STORE_USERS:
+
+        def setup_load(users=users):
+            file_path = get_store_path(users)
+            return lambda: JsonStorageInterface(file_path)
+
+        def setup_save(users=users):
+            # The first write after loading serializes the whole store
+            storage = JsonStorageInterface(get_store_path(users))
+            habit = storage.get_habit("Demo habit 1")
+            return lambda: storage.update_habit(habit)
+
+        def setup_update_habit(users=users):
+            storage = JsonStorageInterface(get_store_path(users))
+            habit = storage.get_habit("Demo habit 1")
+            storage.update_habit(habit)
+            return lambda: storage.update_habit(habit)
+
+        def setup_track_completion(users=users):
+            storage = JsonStorageInterface(get_store_path(users))
+            habit = Habit(
+                "Benchmark habit", "", "daily", creation_time=datetime(2024, 1, 1)
+            )
+            user_habit = UserHabit(habit, creation_time=habit.creation_time)
+            storage.insert_habit(habit)
+            storage.insert_user_habit(user_habit)
+            # A new daily period is completed with every call
+            completion_times = (
+                habit.creation_time + timedelta(days=days) for days in range(10**6)
+            )
+
+            def track_completion():
+                user_habit.track_completion(next(completion_times))
+                storage.update_user_habit(user_habit)
+
+            return track_completion
+
+        benchmarks.append(Benchmark(f"storage.load.{users}_users", setup_load))
+        benchmarks.append(
+            Benchmark(f"storage.save.{users}_users", setup_save, setup_per_call=True)
+        )
+        benchmarks.append(
+            Benchmark(f"storage.write.update_habit.{users}_users", setup_update_habit)
+        )
+        benchmarks.append(
+            Benchmark(
+                f"storage.write.track_completion.{users}_users",
+                setup_track_completion,
+            )
+        )
+    return benchmarks
@@ -0,0 +1,167 @@
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from data_storage.interface import StorageInterface
+from habit_analysis.streaks import (
+    get_habit_streaks,
+    get_highest_streak,
+    get_projections,
+)
+from habit_tracking.users import User
+
+
+class CommandError(Exception):
+    """
+    An error in the arguments of a batch command, which is reported as JSON instead of raising.
+    """
+
+    pass
+
+
+def run_batch_command(data_storage: StorageInterface, args: argparse.Namespace) -> int:
+    """
+    Run a batch command and write its result as JSON to stdout, or an error as JSON to stderr.
+    Args:
+        data_storage: The data storage to use.
+        args: The parsed arguments, as produced by a parser set up with batch_parser.add_batch_commands.
+
+    Returns:
+        The exit code of the command.
+    """
+    commands = {
+        "track": track_command,
+        "list": list_command,
+        "streaks": streaks_command,
+        "report": report_command,
+    }
+    try:
+        result = commands[args.command](data_storage, args)
+    except CommandError as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        return 1
+    print(json.dumps(result))
+    return 0
+
+
+def get_user(data_storage: StorageInterface, username: str) -> User:
+    """
+    Retrieve a user from the data storage, raising a CommandError for unknown users.
+    Args:
+        data_storage: The data storage to use.
+        username: The username of the user to retrieve.
+
+    Returns:
+        The User object.
+    """
+    user = data_storage.get_user(username)
+    if user is None:
+        raise CommandError(f"User {username} not found.")
+    return user
+
+
+def track_command(data_storage: StorageInterface, args: argparse.Namespace) -> dict:
+    """
+    Track completions of habits of a user for the given dates. All changes are written with a single batched update.
+    Completions in the future or before the habit was started are rejected, like in the interactive menu.
+    Args:
+        data_storage: The data storage to use.
+        args: The parsed arguments of the track command.
+
+    Returns:
+        The outcome of every tracked completion, and the number of completions tracked.
+    """
+    user = get_user(data_storage, args.username)
+    user_habits = {user_habit.habit.name: user_habit for user_habit in user.habits}
+    unknown_habits = [name for name in args.habits if name not in user_habits]
+    if len(unknown_habits) > 0:
+        raise CommandError(
+            f"Habits not tracked by user {args.username}: {', '.join(unknown_habits)}"
+        )
+    now = datetime.now()
+    completion_times = args.dates if args.dates is not None else [now]
+    results = []
+    changed = {}
+    for habit_name in args.habits:
+        user_habit = user_habits[habit_name]
+        for completion_time in completion_times:
+            result = {"habit": habit_name, "time": completion_time.isoformat()}
+            if completion_time > now:
+                result["tracked"] = False
+                result["error"] = "Completion time is in the future."
+            elif completion_time < user_habit.creation_time:
+                result["tracked"] = False
+                result["error"] = "Completion time is before the habit was started."
+            else:
+                result["tracked"] = user_habit.track_completion(completion_time)
+                if result["tracked"]:
+                    changed[user_habit.userhabit_id] = user_habit
+            results.append(result)
+    if len(changed) > 0:
+        data_storage.update_user_habits(list(changed.values()))
+    return {
+        "tracked": sum(1 for result in results if result["tracked"]),
+        "results": results,
+    }
+
+
+def list_command(data_storage: StorageInterface, args: argparse.Namespace) -> list:
+    """
+    List all habits, or the habits tracked by a user, optionally only those with a given period.
+    Args:
+        data_storage: The data storage to use.
+        args: The parsed arguments of the list command.
+
+    Returns:
+        The json of the habits.
+    """
+    if args.user is not None:
+        habits = [
+            user_habit.habit for user_habit in get_user(data_storage, args.user).habits
+        ]
+        if args.period is not None:
+            habits = [habit for habit in habits if habit.period == args.period]
+    elif args.period is not None:
+        habits = data_storage.get_habits_by_period(args.period)
+    else:
+        habits = data_storage.get_all_habits()
+    return [habit.json() for habit in habits]
+
+
+def streaks_command(data_storage: StorageInterface, args: argparse.Namespace) -> list:
+    """
+    Show the current and longest streak of every habit tracked by a user.
+    Args:
+        data_storage: The data storage to use.
+        args: The parsed arguments of the streaks command.
+
+    Returns:
+        The name, period, current streak and longest streak of every habit.
+    """
+    return get_habit_streaks(
+        get_user(data_storage, args.username),
+        args.period,
+        get_projections(data_storage),
+    )
+
+
+def report_command(data_storage: StorageInterface, args: argparse.Namespace) -> dict:
+    """
+    Show a full analytics report for a user: the streaks of all habits, and the habits with the all-time and the
+    current longest streak.
+    Args:
+        data_storage: The data storage to use.
+        args: The parsed arguments of the report command.
+
+    Returns:
+        The analytics report.
+    """
+    user = get_user(data_storage, args.username)
+    habit_streaks = get_habit_streaks(user, projections=get_projections(data_storage))
+    return {
+        "username": user.username,
+        "habits": habit_streaks,
+        "longest_streak": get_highest_streak(habit_streaks, "longest_streak"),
+        "current_longest_streak": get_highest_streak(habit_streaks, "current_streak"),
+    }
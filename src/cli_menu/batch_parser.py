@@ -0,0 +1,76 @@
+import argparse
+from datetime import datetime
+
+# The periods habits can be tracked in
+PERIODS = ("daily", "weekly", "monthly", "quarterly", "annually")
+
+
+def parse_time(value: str) -> datetime:
+    """
+    Parse a date or time in ISO format. Times with a UTC offset are converted to local time, since all stored times
+    are naive local times.
+    Args:
+        value: The date or time to parse, e.g. "2024-01-31" or "2024-01-31T08:00:00+00:00".
+
+    Returns:
+        The naive local time.
+    """
+    time = datetime.fromisoformat(value)
+    if time.tzinfo is not None:
+        time = time.astimezone().replace(tzinfo=None)
+    return time
+
+
+def add_batch_commands(parser: argparse.ArgumentParser):
+    """
+    Add the non-interactive subcommands to an argument parser. Every subcommand writes its result as JSON to stdout.
+    The name of the chosen subcommand is stored in args.command, and the command is run with
+    batch_commands.run_batch_command.
+    Args:
+        parser: The argument parser to add the subcommands to.
+
+    Returns:
+        None
+    """
+    subparsers = parser.add_subparsers(dest="command")
+
+    track_parser = subparsers.add_parser(
+        "track", help="Track completions of one or more habits of a user."
+    )
+    track_parser.add_argument("username", help="The user to track completions for.")
+    track_parser.add_argument(
+        "--habit",
+        dest="habits",
+        action="append",
+        required=True,
+        help="A habit to track. Can be given multiple times.",
+    )
+    track_parser.add_argument(
+        "--date",
+        dest="dates",
+        action="append",
+        type=parse_time,
+        help="The date (YYYY-MM-DD) or time to track, times with a UTC offset are converted to local time. Can be "
+        "given multiple times. Defaults to now.",
+    )
+
+    list_parser = subparsers.add_parser(
+        "list", help="List all habits, or the habits tracked by a user."
+    )
+    list_parser.add_argument("--user", help="Only list habits tracked by this user.")
+    list_parser.add_argument(
+        "--period", choices=PERIODS, help="Only list habits with this period."
+    )
+
+    streaks_parser = subparsers.add_parser(
+        "streaks", help="Show the current and longest streaks of a user's habits."
+    )
+    streaks_parser.add_argument("username", help="The user to show streaks for.")
+    streaks_parser.add_argument(
+        "--period", choices=PERIODS, help="Only show habits with this period."
+    )
+
+    report_parser = subparsers.add_parser(
+        "report", help="Show a full analytics report for a user."
+    )
+    report_parser.add_argument("username", help="The user to report on.")
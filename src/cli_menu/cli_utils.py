@@ -1,59 +1,90 @@
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from itertools import islice
+
+# Number of options shown on each page of a multi-page selection menu
+PAGE_SIZE = 9
+
+
+def paged_options(options: Iterable) -> tuple[list, Iterator | None, int | None]:
+    """
+    Prepare options for paging through them. Sequences are used as they are, other iterables are consumed lazily.
+    Args:
+        options: The options to page through.
+
+    Returns:
+        The options fetched so far, an iterator over the remaining options (None if all options have been fetched) and
+        the total number of pages (None if unknown).
+    """
+    if isinstance(options, Sequence):
+        return options, None, max(1, -(-len(options) // PAGE_SIZE))
+    return [], iter(options), None
+
+
 def multi_page_option_selection_menu(
-    selection_name: str, options: list, page_number: int = 0
+    selection_name: str,
+    options: Iterable,
+    page_number: int = 0,
+    search: Callable[[str], list] = None,
 ):
     """
     Display a menu for selecting an option from a list that may span multiple pages.
+    Options which are not given as a sequence are fetched from the iterable as the user pages through them, so only
+    the options up to the current page (plus one, to know whether there is a next page) are ever fetched.
     Args:
         selection_name: The name of the selection.
-        options: The list of options to select from.
-        page_number: The current page number.
+        options: The options to select from, either as a sequence or as an iterable which is consumed lazily.
+        page_number: The page to start on.
+        search: A function returning the options matching a search term. If given, the user can search for options
+            instead of paging through them, and select from the matches.
 
     Returns:
         The selected option or None if the user chooses to return to the previous menu.
     """
-    options_on_page = options[page_number * 9 : page_number * 9 + 9]
-    total_pages = len(options) // 9 + 1
-    print(f"--- Please select a {selection_name} ---")
-    for i, option in enumerate(options_on_page):
-        print(f"{i + 1}: {option}")
-    if total_pages > 1:
-        print("n: Next page")
-        print("p: Previous page")
-    print("q: Return to previous menu")
-    print(f"Page {page_number + 1} / {total_pages}")
-    user_selection = input()
-    match user_selection:
-        case "n" if len(options) > (page_number + 1) * 9:
-            return multi_page_option_selection_menu(
-                selection_name, options, page_number + 1
-            )
-        case "n":
-            print("No more pages. Please try again.")
-            return multi_page_option_selection_menu(
-                selection_name, options, page_number
-            )
-        case "p" if page_number > 0:
-            return multi_page_option_selection_menu(
-                selection_name, options, page_number - 1
-            )
-        case "p":
-            print("No previous pages. Please try again.")
-            return multi_page_option_selection_menu(
-                selection_name, options, page_number
-            )
-        case "q":
-            return None
-        case _ if user_selection.isdigit():
-            selection_index = int(user_selection) - 1
-            if selection_index < len(options_on_page):
-                return options_on_page[selection_index]
-            else:
+    fetched_options, remaining_options, total_pages = paged_options(options)
+    while True:
+        page_start = page_number * PAGE_SIZE
+        missing_count = page_start + PAGE_SIZE + 1 - len(fetched_options)
+        if remaining_options is not None and missing_count > 0:
+            fetched_options.extend(islice(remaining_options, missing_count))
+        options_on_page = fetched_options[page_start : page_start + PAGE_SIZE]
+        has_next_page = len(fetched_options) > page_start + PAGE_SIZE
+        print(f"--- Please select a {selection_name} ---")
+        for i, option in enumerate(options_on_page):
+            print(f"{i + 1}: {option}")
+        if has_next_page or page_number > 0:
+            print("n: Next page")
+            print("p: Previous page")
+        if search is not None:
+            print("s: Search")
+        print("q: Return to previous menu")
+        if total_pages is None:
+            print(f"Page {page_number + 1}")
+        else:
+            print(f"Page {page_number + 1} / {total_pages}")
+        user_selection = input()
+        match user_selection:
+            case "n" if has_next_page:
+                page_number += 1
+            case "n":
+                print("No more pages. Please try again.")
+            case "p" if page_number > 0:
+                page_number -= 1
+            case "p":
+                print("No previous pages. Please try again.")
+            case "s" if search is not None:
+                matches = search(input("Enter search term: "))
+                if len(matches) == 0:
+                    print("No matches found. Please try again.")
+                else:
+                    fetched_options, remaining_options, total_pages = paged_options(
+                        matches
+                    )
+                    page_number = 0
+            case "q":
+                return None
+            case _ if user_selection.isdigit() and 0 < int(user_selection) <= len(
+                options_on_page
+            ):
+                return options_on_page[int(user_selection) - 1]
+            case _:
                 print("Invalid selection. Please try again.")
-                return multi_page_option_selection_menu(
-                    selection_name, options, page_number
-                )
-        case _:
-            print("Invalid selection. Please try again.")
-            return multi_page_option_selection_menu(
-                selection_name, options, page_number
-            )
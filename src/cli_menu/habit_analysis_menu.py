@@ -1,12 +1,20 @@
 from cli_menu.cli_utils import multi_page_option_selection_menu
-from habit_analysis import analytics
+from data_storage.interface import StorageInterface
+from habit_analysis.streaks import (
+    get_habit_streaks,
+    get_highest_streak,
+    get_projections,
+    get_user_habit_streaks,
+)
 from habit_tracking.users import User
 
 
-def habit_analysis_menu(user: User):
+def habit_analysis_menu(data_storage: StorageInterface, user: User):
     """
-    Menu for habit analysis options.
+    Menu for habit analysis options. Streaks are looked up in the projections of the event log if the data storage
+    records one, and computed from the completion history otherwise.
     Args:
+        data_storage: The data storage to use
         user: The currently logged in user
 
     Returns:
@@ -24,45 +32,51 @@ def habit_analysis_menu(user: User):
         user_input = input()
         match user_input:
             case "1":
-                show_all_habits_with_current_streak(user)
+                show_all_habits_with_current_streak(data_storage, user)
             case "2":
-                show_all_habits_with_current_streak_for_specific_periodicity(user)
+                show_all_habits_with_current_streak_for_specific_periodicity(
+                    data_storage, user
+                )
             case "3":
-                get_habit_with_all_time_longest_streak(user)
+                get_habit_with_all_time_longest_streak(data_storage, user)
             case "4":
-                get_habit_with_current_longest_streak(user)
+                get_habit_with_current_longest_streak(data_storage, user)
             case "5":
-                get_current_streak_for_specific_habit(user)
+                get_current_streak_for_specific_habit(data_storage, user)
             case "6":
-                get_longest_all_time_streak_for_specific_habit(user)
+                get_longest_all_time_streak_for_specific_habit(data_storage, user)
             case "q":
                 break
             case _:
                 print("Invalid input. Please try again.")
 
 
-def show_all_habits_with_current_streak(user: User):
+def show_all_habits_with_current_streak(data_storage: StorageInterface, user: User):
     """
     Show all habits with current streak for the user.
     Args:
+        data_storage: The data storage to use
         user: The user to show habits for
 
     Returns:
         None
     """
     print("--- Habits with current streak ---")
-    habits_with_streak = analytics.get_all_tracked_habits_with_streak(user)
-    if len(habits_with_streak) == 0:
+    habit_streaks = get_habit_streaks(user, projections=get_projections(data_storage))
+    if len(habit_streaks) == 0:
         print("No habits found for user.")
     else:
-        for habit, current_streak in habits_with_streak:
-            print(f"{habit.name}: {current_streak}")
+        for habit_streak in habit_streaks:
+            print(f"{habit_streak['habit']}: {habit_streak['current_streak']}")
 
 
-def show_all_habits_with_current_streak_for_specific_periodicity(user: User):
+def show_all_habits_with_current_streak_for_specific_periodicity(
+    data_storage: StorageInterface, user: User
+):
     """
     Show all habits with current streak for a specific periodicity.
     Args:
+        data_storage: The data storage to use
         user: The user to show habits for
 
     Returns:
@@ -77,54 +91,61 @@ def show_all_habits_with_current_streak_for_specific_periodicity(user: User):
         period = input(
             "Enter habit tracking period (daily, weekly, monthly, quarterly, annually): "
         )
-    habits_with_streak = analytics.get_all_tracked_habits_with_streak_for_periodicity(
-        user, period
-    )
-    if len(habits_with_streak) == 0:
+    habit_streaks = get_habit_streaks(user, period, get_projections(data_storage))
+    if len(habit_streaks) == 0:
         print("No habits with this periodicity found for user.")
     else:
-        for habit, current_streak in habits_with_streak:
-            print(f"{habit.name}: {current_streak}")
+        for habit_streak in habit_streaks:
+            print(f"{habit_streak['habit']}: {habit_streak['current_streak']}")
 
 
-def get_habit_with_all_time_longest_streak(user: User):
+def get_habit_with_all_time_longest_streak(data_storage: StorageInterface, user: User):
     """
     Get the habit with the all-time longest streak for the user.
     Args:
+        data_storage: The data storage to use
         user: The user to get the longest habit streak for
 
     Returns:
         None
     """
     print("--- Habit with all-time longest streak ---")
-    habit, longest_streak = analytics.get_all_time_longest_habit_streak(user)
-    if habit is not None:
-        print(f"{habit.name}: {longest_streak}")
+    highest_streak = get_highest_streak(
+        get_habit_streaks(user, projections=get_projections(data_storage)),
+        "longest_streak",
+    )
+    if highest_streak["habit"] is not None:
+        print(f"{highest_streak['habit']}: {highest_streak['streak']}")
     else:
         print("No habits found for user.")
 
 
-def get_habit_with_current_longest_streak(user: User):
+def get_habit_with_current_longest_streak(data_storage: StorageInterface, user: User):
     """
     Get the habit with the current longest streak for the user.
     Args:
+        data_storage: The data storage to use
         user: The user to get the longest current habit streak for
 
     Returns:
         None
     """
     print("--- Habit with current longest streak ---")
-    habit, longest_streak = analytics.get_current_longest_habit_streak(user)
-    if habit is not None:
-        print(f"{habit.name}: {longest_streak}")
+    highest_streak = get_highest_streak(
+        get_habit_streaks(user, projections=get_projections(data_storage)),
+        "current_streak",
+    )
+    if highest_streak["habit"] is not None:
+        print(f"{highest_streak['habit']}: {highest_streak['streak']}")
     else:
         print("No habits found for user.")
 
 
-def get_current_streak_for_specific_habit(user: User):
+def get_current_streak_for_specific_habit(data_storage: StorageInterface, user: User):
     """
     Get the current streak for a specific habit.
     Args:
+        data_storage: The data storage to use
         user: The user to get the streak for
 
     Returns:
@@ -137,14 +158,17 @@ def get_current_streak_for_specific_habit(user: User):
         userhabit = next(
             userhabit for userhabit in user.habits if userhabit.habit.name == habit_name
         )
-        streak = analytics.get_current_streak_for_habit(userhabit)
+        streak, _ = get_user_habit_streaks(userhabit, get_projections(data_storage))
         print(f"{habit_name}: {streak}")
 
 
-def get_longest_all_time_streak_for_specific_habit(user: User):
+def get_longest_all_time_streak_for_specific_habit(
+    data_storage: StorageInterface, user: User
+):
     """
     Get the longest all-time streak for a specific habit.
     Args:
+        data_storage: The data storage to use
         user: The user to get the streak for
 
     Returns:
@@ -157,5 +181,7 @@ def get_longest_all_time_streak_for_specific_habit(user: User):
         userhabit = next(
             userhabit for userhabit in user.habits if userhabit.habit.name == habit_name
         )
-        longest_streak = analytics.get_longest_streak_for_habit(userhabit)
+        _, longest_streak = get_user_habit_streaks(
+            userhabit, get_projections(data_storage)
+        )
         print(f"{habit_name}: {longest_streak}")
@@ -72,8 +72,11 @@ def edit_existing_habit(data_storage: StorageInterface):
         None
     """
     print("--- Edit existing habit ---")
-    all_habit_names = [habit.name for habit in data_storage.get_all_habits()]
-    habit_to_edit = multi_page_option_selection_menu("habit", all_habit_names)
+    habit_to_edit = multi_page_option_selection_menu(
+        "habit",
+        data_storage.iter_habit_names(),
+        search=data_storage.search_habits,
+    )
     if habit_to_edit is not None:
         habit_to_edit = data_storage.get_habit(habit_to_edit)
         print(f"Current task description: {habit_to_edit.task_description}")
@@ -93,19 +96,25 @@ def delete_existing_habit(data_storage: StorageInterface):
         None
     """
     print("--- Delete existing habit ---")
-    all_habit_names = [habit.name for habit in data_storage.get_all_habits()]
-    habit_to_delete = multi_page_option_selection_menu("habit", all_habit_names)
+    habit_to_delete = multi_page_option_selection_menu(
+        "habit",
+        data_storage.iter_habit_names(),
+        search=data_storage.search_habits,
+    )
     if habit_to_delete is not None:
         habit_to_delete = data_storage.get_habit(habit_to_delete)
-        no_user_habits = not any(
-            userhabit.habit.name == habit_to_delete.name
-            for userhabit in data_storage.get_all_user_habits()
+        no_user_habits = (
+            len(data_storage.get_user_habits_for_habit(habit_to_delete.name)) == 0
         )
         if no_user_habits:
             data_storage.delete_habit(habit_to_delete)
             print(f"{habit_to_delete.name} deleted.")
         else:
+            print(f"{habit_to_delete.name} is currently being tracked by users.")
             print(
-                f"{habit_to_delete.name} is currently being tracked by users. "
-                f"Please remove it from tracking before deleting."
+                "Type 'y' to delete it anyway and remove it from tracking for all users, "
+                "or press enter to cancel."
             )
+            if input() == "y":
+                data_storage.delete_habit(habit_to_delete, cascade=True)
+                print(f"{habit_to_delete.name} deleted.")
@@ -102,8 +102,11 @@ def add_habit_to_tracking(data_storage: StorageInterface, user: User):
         None
     """
     print("--- Add habit to tracking ---")
-    all_habit_names = [habit.name for habit in data_storage.get_all_habits()]
-    habit_to_add = multi_page_option_selection_menu("habit", all_habit_names)
+    habit_to_add = multi_page_option_selection_menu(
+        "habit",
+        data_storage.iter_habit_names(),
+        search=data_storage.search_habits,
+    )
     if habit_to_add is not None:
         habit_to_add = data_storage.get_habit(habit_to_add)
         user_habit = user.add_habit(habit_to_add)
@@ -1,6 +1,3 @@
-from cli_menu.habit_analysis_menu import habit_analysis_menu
-from cli_menu.habit_creation_menu import habit_creation_menu
-from cli_menu.habit_tracking_menu import habit_tracking_menu
 from data_storage.interface import StorageInterface
 from habit_tracking.users import User
 
@@ -23,12 +20,21 @@ def main_menu(data_storage: StorageInterface, user: User):
         print("q: Exit program")
         user_selection = input()
         match user_selection:
+            # Submenus are only imported once they are opened, to keep the startup fast
             case "1":
+                from cli_menu.habit_tracking_menu import habit_tracking_menu
+
                 habit_tracking_menu(data_storage, user)
             case "2":
+                from cli_menu.habit_creation_menu import habit_creation_menu
+
                 habit_creation_menu(data_storage)
+                # Deleting a habit may have removed it from the user's tracked habits
+                user = data_storage.get_user(user.username)
             case "3":
-                habit_analysis_menu(user)
+                from cli_menu.habit_analysis_menu import habit_analysis_menu
+
+                habit_analysis_menu(data_storage, user)
             case "q":
                 print("Exiting program...")
                 break
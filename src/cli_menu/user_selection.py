@@ -1,4 +1,3 @@
-from cli_menu.main_menu import main_menu
 from data_storage.interface import StorageInterface
 from habit_tracking.users import User
 
@@ -46,6 +45,8 @@ def user_login(data_storage: StorageInterface):
     if user is None:
         print("User not found. Please try again.")
         return user_login(data_storage)
+    from cli_menu.main_menu import main_menu
+
     return main_menu(data_storage, user)
 
 
@@ -65,6 +66,8 @@ def create_user(data_storage: StorageInterface):
     user = User(username=username, habits=[])
     create_success = data_storage.insert_user(user)
     if create_success:
+        from cli_menu.main_menu import main_menu
+
         return main_menu(data_storage, user)
     else:
         print("Username already exists. Please try again.")
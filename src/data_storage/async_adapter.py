@@ -0,0 +1,268 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from data_storage.async_interface import AsyncStorageInterface
+from data_storage.interface import StorageInterface
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+# Single record inserts which can be combined into one call of the corresponding bulk insert method.
+BULK_INSERT_METHODS = {
+    "insert_user": "insert_users",
+    "insert_habit": "insert_habits",
+    "insert_user_habit": "insert_user_habits",
+}
+
+# Single record updates which can be combined into one call of the corresponding bulk update method.
+BULK_UPDATE_METHODS = {
+    "update_user_habit": "update_user_habits",
+}
+
+# Single record updates which can be deduplicated, together with the primary key of the updated object.
+UPDATE_KEYS = {
+    "update_user": lambda user: user.username,
+    "update_habit": lambda habit: habit.name,
+    "update_user_habit": lambda user_habit: user_habit.userhabit_id,
+}
+
+
+class AsyncStorageAdapter(AsyncStorageInterface):
+    """
+    An asynchronous data storage interface that wraps a synchronous StorageInterface.
+
+    All calls to the wrapped storage are made from an executor, so blocking file I/O never stalls the event loop.
+    Operations are executed in the order in which they were issued. Operations issued while the executor is busy are
+    queued and executed together as soon as it becomes free, which allows concurrent writes to be coalesced:
+        - Consecutive inserts of the same record type are combined into a single bulk insert.
+        - Consecutive updates of the same record type only write the latest version of each record once, using a
+          single bulk update where the storage provides one.
+    """
+
+    def __init__(self, storage: StorageInterface, executor: Executor = None):
+        """
+        Args:
+            storage: The synchronous data storage to wrap.
+            executor: The executor to run storage calls in. Defaults to a single-threaded ThreadPoolExecutor, since
+                the wrapped storage is not required to be thread-safe.
+        """
+        self.storage = storage
+        self.__owns_executor = executor is None
+        self.executor = executor if executor is not None else ThreadPoolExecutor(1)
+        self.__queue = []
+        self.__worker = None
+
+    def close(self):
+        """
+        Shut down the executor, if it was created by this adapter.
+        Returns:
+            None
+        """
+        if self.__owns_executor:
+            self.executor.shutdown(wait=True)
+
+    async def __submit(self, method_name: str, *args):
+        """
+        Queue a call of a method of the wrapped storage and wait for its result.
+        Args:
+            method_name: The name of the StorageInterface method to call.
+            *args: The arguments to pass to the method.
+
+        Returns:
+            The return value of the method.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.__queue.append((method_name, args, future))
+        if self.__worker is None or self.__worker.done():
+            self.__worker = loop.create_task(self.__drain())
+        return await future
+
+    async def __drain(self):
+        """
+        Execute queued operations until the queue is empty, handing each batch of queued operations to the executor.
+        Returns:
+            None
+        """
+        loop = asyncio.get_running_loop()
+        while len(self.__queue) > 0:
+            operations = self.__queue
+            self.__queue = []
+            try:
+                outcomes = await loop.run_in_executor(
+                    self.executor,
+                    self.__run_operations,
+                    [(method_name, args) for method_name, args, _ in operations],
+                )
+            except Exception as e:
+                # The batch could not be run at all, e.g. because the executor was shut down
+                for _, _, future in operations:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            except BaseException:
+                # The worker was cancelled, so nothing would ever complete the batch or the operations queued since
+                for _, _, future in operations + self.__queue:
+                    future.cancel()
+                self.__queue = []
+                raise
+            for (_, _, future), (result, exception) in zip(operations, outcomes):
+                if future.done():
+                    # The caller stopped waiting for the result
+                    continue
+                if exception is not None:
+                    future.set_exception(exception)
+                else:
+                    future.set_result(result)
+
+    def __run_operations(self, operations: list[tuple[str, tuple]]) -> list[tuple]:
+        """
+        Execute a batch of operations on the wrapped storage, coalescing consecutive inserts and updates.
+        Runs inside the executor.
+        Args:
+            operations: The operations to execute, as tuples of method name and arguments.
+
+        Returns:
+            A list with one (result, exception) tuple per operation.
+        """
+        outcomes = [None] * len(operations)
+        index = 0
+        while index < len(operations):
+            method_name, args = operations[index]
+            # Find the run of consecutive operations calling the same method
+            run_end = index + 1
+            while run_end < len(operations) and operations[run_end][0] == method_name:
+                run_end += 1
+            run = range(index, run_end)
+            if method_name in BULK_INSERT_METHODS and len(run) > 1:
+                objects = [operations[i][1][0] for i in run]
+                bulk_outcomes = self.__run_bulk_operation(
+                    BULK_INSERT_METHODS[method_name], objects
+                )
+                for i, outcome in zip(run, bulk_outcomes):
+                    outcomes[i] = outcome
+            elif method_name in UPDATE_KEYS and len(run) > 1:
+                # Only the latest version of each record needs to be written
+                latest = {}
+                for i in run:
+                    key = UPDATE_KEYS[method_name](operations[i][1][0])
+                    latest.setdefault(key, [None, []])
+                    latest[key][0] = operations[i][1][0]
+                    latest[key][1].append(i)
+                if method_name in BULK_UPDATE_METHODS:
+                    bulk_outcomes = self.__run_bulk_operation(
+                        BULK_UPDATE_METHODS[method_name],
+                        [obj for obj, _ in latest.values()],
+                    )
+                else:
+                    bulk_outcomes = [
+                        self.__run_operation(method_name, (obj,))
+                        for obj, _ in latest.values()
+                    ]
+                for (_, key_indices), outcome in zip(latest.values(), bulk_outcomes):
+                    for i in key_indices:
+                        outcomes[i] = outcome
+            else:
+                for i in run:
+                    outcomes[i] = self.__run_operation(method_name, operations[i][1])
+            index = run_end
+        return outcomes
+
+    def __run_bulk_operation(self, method_name: str, objects: list) -> list[tuple]:
+        """
+        Execute a bulk operation on the wrapped storage.
+        Args:
+            method_name: The name of the bulk StorageInterface method to call.
+            objects: The objects to pass to the method.
+
+        Returns:
+            A list with one (result, exception) tuple per object.
+        """
+        try:
+            results = getattr(self.storage, method_name)(objects)
+            return [(result, None) for result in results]
+        except Exception as e:
+            return [(None, e)] * len(objects)
+
+    def __run_operation(self, method_name: str, args: tuple) -> tuple:
+        """
+        Execute a single operation on the wrapped storage.
+        Args:
+            method_name: The name of the StorageInterface method to call.
+            args: The arguments to pass to the method.
+
+        Returns:
+            A (result, exception) tuple.
+        """
+        try:
+            return getattr(self.storage, method_name)(*args), None
+        except Exception as e:
+            return None, e
+
+    async def insert_user(self, user: User) -> bool:
+        return await self.__submit("insert_user", user)
+
+    async def update_user(self, user: User) -> bool:
+        return await self.__submit("update_user", user)
+
+    async def delete_user(self, user: User) -> bool:
+        return await self.__submit("delete_user", user)
+
+    async def get_user(self, username: str) -> User | None:
+        return await self.__submit("get_user", username)
+
+    async def get_all_users(self) -> list[User]:
+        return await self.__submit("get_all_users")
+
+    async def insert_habit(self, habit: Habit) -> bool:
+        return await self.__submit("insert_habit", habit)
+
+    async def update_habit(self, habit: Habit) -> bool:
+        return await self.__submit("update_habit", habit)
+
+    async def delete_habit(self, habit: Habit, cascade: bool = False) -> bool:
+        return await self.__submit("delete_habit", habit, cascade)
+
+    async def get_habit(self, name: str) -> Habit | None:
+        return await self.__submit("get_habit", name)
+
+    async def get_all_habits(self) -> list[Habit]:
+        return await self.__submit("get_all_habits")
+
+    async def insert_user_habit(self, user_habit: UserHabit) -> bool:
+        return await self.__submit("insert_user_habit", user_habit)
+
+    async def update_user_habit(self, user_habit: UserHabit) -> bool:
+        return await self.__submit("update_user_habit", user_habit)
+
+    async def delete_user_habit(self, user_habit: UserHabit) -> bool:
+        return await self.__submit("delete_user_habit", user_habit)
+
+    async def get_user_habit(self, userhabit_id: str) -> UserHabit | None:
+        return await self.__submit("get_user_habit", userhabit_id)
+
+    async def get_all_user_habits(self) -> list[UserHabit]:
+        return await self.__submit("get_all_user_habits")
+
+    async def insert_users(self, users: list[User]) -> list[bool]:
+        return await self.__submit("insert_users", users)
+
+    async def insert_habits(self, habits: list[Habit]) -> list[bool]:
+        return await self.__submit("insert_habits", habits)
+
+    async def insert_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        return await self.__submit("insert_user_habits", user_habits)
+
+    async def get_user_habits(self, userhabit_ids: list[str]) -> list[UserHabit | None]:
+        return await self.__submit("get_user_habits", userhabit_ids)
+
+    async def update_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        return await self.__submit("update_user_habits", user_habits)
+
+    async def delete_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        return await self.__submit("delete_user_habits", user_habits)
+
+    async def get_habits_by_period(self, period: str) -> list[Habit]:
+        return await self.__submit("get_habits_by_period", period)
+
+    async def get_user_habits_for_habit(self, habit_name: str) -> list[UserHabit]:
+        return await self.__submit("get_user_habits_for_habit", habit_name)
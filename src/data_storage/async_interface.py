@@ -0,0 +1,319 @@
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+
+class AsyncStorageInterface(ABC):
+    """
+    An asynchronous interface for interacting with a data storage system.
+    Mirrors StorageInterface, with every method being awaitable.
+    """
+
+    @abstractmethod
+    async def insert_user(self, user: User) -> bool:
+        """
+        Insert a new user into the data storage.
+        Args:
+            user: The User object to insert into the data storage.
+
+        Returns:
+            True if the user was successfully inserted, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    async def update_user(self, user: User) -> bool:
+        """
+        Update an existing user in the data storage.
+        Args:
+            user: The User object to update in the data storage.
+
+        Returns:
+            True if the user was successfully updated, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_user(self, user: User) -> bool:
+        """
+        Delete an existing user from the data storage.
+        Args:
+            user: The User object to delete from the data storage.
+
+        Returns:
+            True if the user was successfully deleted, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    async def get_user(self, username: str) -> User | None:
+        """
+        Retrieve a user from the data storage by their username.
+        Args:
+            username: The username of the user to retrieve.
+
+        Returns:
+            The User object corresponding to the provided username, or None if the user does not exist.
+        """
+        pass
+
+    @abstractmethod
+    async def get_all_users(self) -> list[User]:
+        """
+        Retrieve all users from the data storage.
+        Returns:
+            A list of all User objects in the data storage.
+        """
+        pass
+
+    @abstractmethod
+    async def insert_habit(self, habit: Habit) -> bool:
+        """
+        Insert a new habit into the data storage.
+        Args:
+            habit: The Habit object to insert into the data storage.
+
+        Returns:
+            True if the habit was successfully inserted, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    async def update_habit(self, habit: Habit) -> bool:
+        """
+        Update an existing habit in the data storage.
+        Args:
+            habit: The Habit object to update in the data storage.
+
+        Returns:
+            True if the habit was successfully updated, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_habit(self, habit: Habit, cascade: bool = False) -> bool:
+        """
+        Delete an existing habit from the data storage.
+        Args:
+            habit: The Habit object to delete from the data storage.
+            cascade: Whether to also delete all UserHabit objects tracking the habit, and remove them from the users
+                tracking them.
+
+        Returns:
+            True if the habit was successfully deleted, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    async def get_habit(self, name: str) -> Habit | None:
+        """
+        Retrieve a habit from the data storage by its name.
+        Args:
+            name: The name of the habit to retrieve.
+
+        Returns:
+            The Habit object corresponding to the provided name, or None if the habit does not exist.
+        """
+        pass
+
+    @abstractmethod
+    async def get_all_habits(self) -> list[Habit]:
+        """
+        Retrieve all habits from the data storage.
+        Returns:
+            A list of all Habit objects in the data storage.
+        """
+        pass
+
+    @abstractmethod
+    async def insert_user_habit(self, user_habit: UserHabit) -> bool:
+        """
+        Insert a new UserHabit object into the data storage.
+        Args:
+            user_habit: The UserHabit object to insert into the data storage.
+
+        Returns:
+            True if the UserHabit object was successfully inserted, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    async def update_user_habit(self, user_habit: UserHabit) -> bool:
+        """
+        Update an existing UserHabit object in the data storage.
+        Args:
+            user_habit: The UserHabit object to update in the data storage.
+
+        Returns:
+            True if the UserHabit object was successfully updated, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_user_habit(self, user_habit: UserHabit) -> bool:
+        """
+        Delete an existing UserHabit object from the data storage.
+        Args:
+            user_habit: The UserHabit object to delete from the data storage.
+
+        Returns:
+            True if the UserHabit object was successfully deleted, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    async def get_user_habit(self, userhabit_id: str) -> UserHabit | None:
+        """
+        Retrieve a UserHabit object from the data storage by its ID.
+        Args:
+            userhabit_id: The ID of the UserHabit object to retrieve.
+
+        Returns:
+            The UserHabit object corresponding to the provided ID, or None if the UserHabit object does not exist.
+        """
+        pass
+
+    @abstractmethod
+    async def get_all_user_habits(self) -> list[UserHabit]:
+        """
+        Retrieve all UserHabit objects from the data storage.
+        Returns:
+            A list of all UserHabit objects in the data storage.
+        """
+        pass
+
+    async def iter_users(self) -> AsyncIterator[User]:
+        """
+        Iterate over all users in the data storage, one at a time.
+        Backends may override this to avoid building all User objects up front.
+        Returns:
+            An iterator over all User objects in the data storage.
+        """
+        for user in await self.get_all_users():
+            yield user
+
+    async def iter_habits(self) -> AsyncIterator[Habit]:
+        """
+        Iterate over all habits in the data storage, one at a time.
+        Backends may override this to avoid building all Habit objects up front.
+        Returns:
+            An iterator over all Habit objects in the data storage.
+        """
+        for habit in await self.get_all_habits():
+            yield habit
+
+    async def iter_user_habits(self) -> AsyncIterator[UserHabit]:
+        """
+        Iterate over all UserHabit objects in the data storage, one at a time.
+        Backends may override this to avoid building all UserHabit objects up front.
+        Returns:
+            An iterator over all UserHabit objects in the data storage.
+        """
+        for user_habit in await self.get_all_user_habits():
+            yield user_habit
+
+    async def get_habits_by_period(self, period: str) -> list[Habit]:
+        """
+        Retrieve all habits with a specific period from the data storage.
+        Backends may override this to use an index instead of scanning all habits.
+        Args:
+            period: The period of the habits to retrieve.
+
+        Returns:
+            A list of all Habit objects with the provided period.
+        """
+        return [
+            habit for habit in await self.get_all_habits() if habit.period == period
+        ]
+
+    async def get_user_habits_for_habit(self, habit_name: str) -> list[UserHabit]:
+        """
+        Retrieve all UserHabit objects tracking a specific habit from the data storage.
+        Backends may override this to use an index instead of scanning all UserHabit objects.
+        Args:
+            habit_name: The name of the habit tracked by the UserHabit objects to retrieve.
+
+        Returns:
+            A list of all UserHabit objects tracking the habit.
+        """
+        return [
+            user_habit
+            for user_habit in await self.get_all_user_habits()
+            if user_habit.habit.name == habit_name
+        ]
+
+    async def insert_users(self, users: list[User]) -> list[bool]:
+        """
+        Insert multiple new users into the data storage.
+        Backends may override this to persist all users with a single write.
+        Args:
+            users: The User objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per user, True if that user was successfully inserted, False otherwise.
+        """
+        return [await self.insert_user(user) for user in users]
+
+    async def insert_habits(self, habits: list[Habit]) -> list[bool]:
+        """
+        Insert multiple new habits into the data storage.
+        Backends may override this to persist all habits with a single write.
+        Args:
+            habits: The Habit objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per habit, True if that habit was successfully inserted, False otherwise.
+        """
+        return [await self.insert_habit(habit) for habit in habits]
+
+    async def get_user_habits(self, userhabit_ids: list[str]) -> list[UserHabit | None]:
+        """
+        Retrieve multiple UserHabit objects from the data storage by their IDs.
+        Backends may override this to share work between the lookups.
+        Args:
+            userhabit_ids: The IDs of the UserHabit objects to retrieve.
+
+        Returns:
+            A list with one entry per ID, containing the corresponding UserHabit object, or None if it does not exist.
+        """
+        return [
+            await self.get_user_habit(userhabit_id) for userhabit_id in userhabit_ids
+        ]
+
+    async def insert_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Insert multiple new UserHabit objects into the data storage.
+        Backends may override this to persist all UserHabit objects with a single write.
+        Args:
+            user_habits: The UserHabit objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per UserHabit, True if that UserHabit was successfully inserted, False otherwise.
+        """
+        return [await self.insert_user_habit(user_habit) for user_habit in user_habits]
+
+    async def update_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Update multiple existing UserHabit objects in the data storage.
+        Backends may override this to persist all UserHabit objects with a single write.
+        Args:
+            user_habits: The UserHabit objects to update in the data storage.
+
+        Returns:
+            A list with one entry per UserHabit, True if that UserHabit was successfully updated, False otherwise.
+        """
+        return [await self.update_user_habit(user_habit) for user_habit in user_habits]
+
+    async def delete_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Delete multiple existing UserHabit objects from the data storage.
+        Backends may override this to persist the deletion with a single write.
+        Args:
+            user_habits: The UserHabit objects to delete from the data storage.
+
+        Returns:
+            A list with one entry per UserHabit, True if that UserHabit was successfully deleted, False otherwise.
+        """
+        return [await self.delete_user_habit(user_habit) for user_habit in user_habits]
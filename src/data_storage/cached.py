@@ -0,0 +1,651 @@
+import atexit
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+
+from data_storage.interface import StorageInterface
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+WRITE_THROUGH = "write-through"
+WRITE_BEHIND = "write-behind"
+
+
+class CachedStorage(StorageInterface):
+    """
+    A data storage interface that puts a bounded LRU cache of deserialized objects in front of another data storage.
+
+    Objects returned by get_user, get_habit, get_user_habit and get_user_habits are cached and shared between callers,
+    so changes to a returned object should always be followed by the corresponding update call. A cached user holds
+    the cached UserHabit objects, so its habits always show the latest updates. Queries returning all records, or
+    records selected by an index, are passed through to the wrapped storage.
+
+    Two write policies are supported:
+        - "write-through": every write is passed on to the wrapped storage immediately.
+        - "write-behind": updates are buffered and written in one go once max_pending_writes updates are pending, or
+          when flush() is called. Repeated updates of the same record are only written once. Inserts, deletes and
+          pass-through queries flush the buffered updates first, so the wrapped storage never sees writes out of order.
+          Buffered updates are lost unless they are flushed, so close() should be called once the cache is no longer
+          needed. As a safeguard, it is also registered to run at interpreter exit until it was called.
+    """
+
+    def __init__(
+        self,
+        storage: StorageInterface,
+        max_size: int = 1024,
+        write_policy: str = WRITE_THROUGH,
+        max_pending_writes: int = 100,
+    ):
+        """
+        Args:
+            storage: The data storage to wrap.
+            max_size: The maximum number of objects kept in the cache.
+            write_policy: Either "write-through" or "write-behind".
+            max_pending_writes: The number of buffered updates that triggers a flush with the "write-behind" policy.
+        """
+        assert max_size > 0, "Cache size must be positive."
+        assert write_policy in (
+            WRITE_THROUGH,
+            WRITE_BEHIND,
+        ), f"Write policy must be '{WRITE_THROUGH}' or '{WRITE_BEHIND}'."
+        assert (
+            max_pending_writes > 0
+        ), "Maximum number of pending writes must be positive."
+        self.storage = storage
+        self.max_size = max_size
+        self.write_policy = write_policy
+        self.max_pending_writes = max_pending_writes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Maps (record type, primary key) to the cached object, least recently used first
+        self.__cache = OrderedDict()
+        # Maps (record type, primary key) to the latest version of objects which still need to be written
+        self.__pending_writes = {}
+        if write_policy == WRITE_BEHIND:
+            atexit.register(self.close)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        The cache statistics.
+        Returns:
+            A dictionary with the number of cache "hits", "misses" and "evictions", the current "size" of the cache,
+            and the number of "pending_writes".
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.__cache),
+            "pending_writes": len(self.__pending_writes),
+        }
+
+    def clear(self):
+        """
+        Empty the cache, after writing all pending updates. The statistics are kept.
+        Returns:
+            None
+        """
+        self.flush()
+        self.__cache.clear()
+
+    def flush(self):
+        """
+        Write all buffered updates to the wrapped storage.
+        Returns:
+            None
+        """
+        if len(self.__pending_writes) == 0:
+            return
+        pending_writes = self.__pending_writes
+        self.__pending_writes = {}
+        user_habits = []
+        for (record_type, _), obj in pending_writes.items():
+            match record_type:
+                case "user":
+                    self.storage.update_user(obj)
+                case "habit":
+                    self.storage.update_habit(obj)
+                case "user_habit":
+                    user_habits.append(obj)
+        if len(user_habits) > 0:
+            self.storage.update_user_habits(user_habits)
+
+    def close(self):
+        """
+        Write all buffered updates to the wrapped storage. Should be called before the cache is discarded, otherwise
+        it is called at interpreter exit with the "write-behind" policy.
+        Returns:
+            None
+        """
+        self.flush()
+        atexit.unregister(self.close)
+
+    def __cache_put(self, record_type: str, key: str, obj: User | Habit | UserHabit):
+        """
+        Add an object to the cache as the most recently used one, evicting the least recently used object if needed.
+        Args:
+            record_type: The type of the object ("user", "habit" or "user_habit").
+            key: The primary key of the object.
+            obj: The object to cache.
+
+        Returns:
+            None
+        """
+        self.__cache[(record_type, key)] = obj
+        self.__cache.move_to_end((record_type, key))
+        while len(self.__cache) > self.max_size:
+            self.__cache.popitem(last=False)
+            self.evictions += 1
+
+    def __cache_discard(self, record_type: str, key: str = None):
+        """
+        Remove an object, or all objects of a record type, from the cache.
+        Args:
+            record_type: The type of the objects to remove.
+            key: The primary key of the object to remove, or None to remove all objects of the record type.
+
+        Returns:
+            None
+        """
+        if key is not None:
+            self.__cache.pop((record_type, key), None)
+            return
+        for cache_key in [k for k in self.__cache if k[0] == record_type]:
+            del self.__cache[cache_key]
+
+    def __get(self, record_type: str, key: str, load: Callable):
+        """
+        Retrieve an object from the cache, loading it from the wrapped storage on a cache miss.
+        Args:
+            record_type: The type of the object ("user", "habit" or "user_habit").
+            key: The primary key of the object.
+            load: The method of the wrapped storage to load the object with.
+
+        Returns:
+            The object, or None if it does not exist.
+        """
+        if (record_type, key) in self.__pending_writes:
+            self.hits += 1
+            return self.__pending_writes[(record_type, key)]
+        if (record_type, key) in self.__cache:
+            self.hits += 1
+            self.__cache.move_to_end((record_type, key))
+            return self.__cache[(record_type, key)]
+        self.misses += 1
+        obj = load(key)
+        if obj is not None:
+            self.__cache_put(record_type, key, obj)
+        return obj
+
+    def __load_user(self, username: str) -> User | None:
+        """
+        Load a user from the wrapped storage, replacing its UserHabit objects with the cached ones, and caching the
+        others, so the user and the UserHabit cache share the same objects.
+        Args:
+            username: The username of the user to load.
+
+        Returns:
+            The User object, or None if the user does not exist.
+        """
+        user = self.storage.get_user(username)
+        if user is None:
+            return None
+        user_habits = []
+        for user_habit in user.habits:
+            key = ("user_habit", user_habit.userhabit_id)
+            cached = self.__pending_writes.get(key, self.__cache.get(key))
+            if cached is None:
+                self.__cache_put("user_habit", user_habit.userhabit_id, user_habit)
+                cached = user_habit
+            user_habits.append(cached)
+        user.habits = user_habits
+        return user
+
+    def __share_with_users(self, user_habits: list[UserHabit]):
+        """
+        Replace other versions of updated UserHabit objects in the habits of cached users, e.g. versions loaded before
+        the UserHabit was evicted from the cache, or copies which were passed to an update.
+        Args:
+            user_habits: The updated UserHabit objects.
+
+        Returns:
+            None
+        """
+        updated = {user_habit.userhabit_id: user_habit for user_habit in user_habits}
+        users = [
+            obj
+            for cache in (self.__cache, self.__pending_writes)
+            for (record_type, _), obj in cache.items()
+            if record_type == "user"
+        ]
+        for user in users:
+            for index, user_habit in enumerate(user.habits):
+                latest = updated.get(user_habit.userhabit_id)
+                if latest is not None and latest is not user_habit:
+                    user.habits[index] = latest
+
+    def __insert(self, record_type: str, key: str, obj, insert: Callable) -> bool:
+        """
+        Insert an object into the wrapped storage and cache it.
+        Args:
+            record_type: The type of the object ("user", "habit" or "user_habit").
+            key: The primary key of the object.
+            obj: The object to insert.
+            insert: The method of the wrapped storage to insert the object with.
+
+        Returns:
+            True if the object was successfully inserted, False otherwise.
+        """
+        self.flush()
+        inserted = insert(obj)
+        if inserted:
+            self.__cache_put(record_type, key, obj)
+        return inserted
+
+    def __update(
+        self, record_type: str, key: str, obj, update: Callable, load: Callable
+    ) -> bool:
+        """
+        Update an object according to the write policy, and cache the new version.
+        Args:
+            record_type: The type of the object ("user", "habit" or "user_habit").
+            key: The primary key of the object.
+            obj: The object to update.
+            update: The method of the wrapped storage to update the object with.
+            load: The method of the wrapped storage to load the object with.
+
+        Returns:
+            True if the object was successfully updated, False otherwise.
+        """
+        if self.write_policy == WRITE_THROUGH:
+            updated = update(obj)
+        else:
+            # The object can only be updated if it exists, which is usually answered by the cache
+            updated = self.__get(record_type, key, load) is not None
+            if updated:
+                self.__pending_writes[(record_type, key)] = obj
+        if updated:
+            self.__cache_put(record_type, key, obj)
+        if len(self.__pending_writes) >= self.max_pending_writes:
+            self.flush()
+        return updated
+
+    def insert_user(self, user: User) -> bool:
+        """
+        Insert a new user into the data storage.
+        Args:
+            user: The User object to insert into the data storage.
+
+        Returns:
+            True if the user was successfully inserted, False otherwise.
+        """
+        return self.__insert("user", user.username, user, self.storage.insert_user)
+
+    def update_user(self, user: User) -> bool:
+        """
+        Update an existing user in the data storage.
+        Args:
+            user: The User object to update in the data storage.
+
+        Returns:
+            True if the user was successfully updated, False otherwise.
+        """
+        return self.__update(
+            "user", user.username, user, self.storage.update_user, self.storage.get_user
+        )
+
+    def delete_user(self, user: User) -> bool:
+        """
+        Delete an existing user from the data storage.
+        Args:
+            user: The User object to delete from the data storage.
+
+        Returns:
+            True if the user was successfully deleted, False otherwise.
+        """
+        self.flush()
+        self.__cache_discard("user", user.username)
+        return self.storage.delete_user(user)
+
+    def get_user(self, username: str) -> User | None:
+        """
+        Retrieve a user from the data storage by their username.
+        Args:
+            username: The username of the user to retrieve.
+
+        Returns:
+            The User object corresponding to the provided username, or None if the user does not exist.
+        """
+        return self.__get("user", username, self.__load_user)
+
+    def get_all_users(self) -> list[User]:
+        """
+        Retrieve all users from the wrapped storage, bypassing the cache.
+        Returns:
+            A list of all User objects in the data storage.
+        """
+        self.flush()
+        return self.storage.get_all_users()
+
+    def iter_users(self) -> Iterator[User]:
+        """
+        Iterate over all users of the wrapped storage, bypassing the cache.
+        Returns:
+            An iterator over all User objects in the data storage.
+        """
+        self.flush()
+        return self.storage.iter_users()
+
+    def insert_habit(self, habit: Habit) -> bool:
+        """
+        Insert a new habit into the data storage.
+        Args:
+            habit: The Habit object to insert into the data storage.
+
+        Returns:
+            True if the habit was successfully inserted, False otherwise.
+        """
+        return self.__insert("habit", habit.name, habit, self.storage.insert_habit)
+
+    def update_habit(self, habit: Habit) -> bool:
+        """
+        Update an existing habit in the data storage.
+        Cached users and UserHabit objects are discarded, since they reference the previous version of the habit.
+        Args:
+            habit: The Habit object to update in the data storage.
+
+        Returns:
+            True if the habit was successfully updated, False otherwise.
+        """
+        self.flush()
+        self.__cache_discard("user")
+        self.__cache_discard("user_habit")
+        return self.__update(
+            "habit",
+            habit.name,
+            habit,
+            self.storage.update_habit,
+            self.storage.get_habit,
+        )
+
+    def delete_habit(self, habit: Habit, cascade: bool = False) -> bool:
+        """
+        Delete an existing habit from the data storage.
+        Args:
+            habit: The Habit object to delete from the data storage.
+            cascade: Whether to also delete all UserHabit objects tracking the habit, and remove them from the users
+                tracking them.
+
+        Returns:
+            True if the habit was successfully deleted, False otherwise.
+        """
+        self.flush()
+        self.__cache_discard("habit", habit.name)
+        if cascade:
+            self.__cache_discard("user")
+            self.__cache_discard("user_habit")
+        return self.storage.delete_habit(habit, cascade)
+
+    def get_habit(self, name: str) -> Habit | None:
+        """
+        Retrieve a habit from the data storage by its name.
+        Args:
+            name: The name of the habit to retrieve.
+
+        Returns:
+            The Habit object corresponding to the provided name, or None if the habit does not exist.
+        """
+        return self.__get("habit", name, self.storage.get_habit)
+
+    def get_all_habits(self) -> list[Habit]:
+        """
+        Retrieve all habits from the wrapped storage, bypassing the cache.
+        Returns:
+            A list of all Habit objects in the data storage.
+        """
+        self.flush()
+        return self.storage.get_all_habits()
+
+    def iter_habits(self) -> Iterator[Habit]:
+        """
+        Iterate over all habits of the wrapped storage, bypassing the cache.
+        Returns:
+            An iterator over all Habit objects in the data storage.
+        """
+        self.flush()
+        return self.storage.iter_habits()
+
+    def iter_habit_names(self) -> Iterator[str]:
+        """
+        Iterate over the names of all habits of the wrapped storage, bypassing the cache.
+        Returns:
+            An iterator over the names of all habits in the data storage.
+        """
+        self.flush()
+        return self.storage.iter_habit_names()
+
+    def search_habits(self, query: str, limit: int = 9) -> list[str]:
+        """
+        Search for habits in the wrapped storage, bypassing the cache.
+        Args:
+            query: The text to search for.
+            limit: The maximum number of results.
+
+        Returns:
+            The names of the matching habits, best match first.
+        """
+        self.flush()
+        return self.storage.search_habits(query, limit)
+
+    def get_habits_by_period(self, period: str) -> list[Habit]:
+        """
+        Retrieve all habits with a given period from the wrapped storage, bypassing the cache.
+        Args:
+            period: The period of the habits to retrieve ("daily", "weekly", "monthly", "quarterly" or "annually").
+
+        Returns:
+            A list of all Habit objects with the given period.
+        """
+        self.flush()
+        return self.storage.get_habits_by_period(period)
+
+    def insert_user_habit(self, user_habit: UserHabit) -> bool:
+        """
+        Insert a new UserHabit object into the data storage.
+        Args:
+            user_habit: The UserHabit object to insert into the data storage.
+
+        Returns:
+            True if the UserHabit object was successfully inserted, False otherwise.
+        """
+        return self.__insert(
+            "user_habit",
+            user_habit.userhabit_id,
+            user_habit,
+            self.storage.insert_user_habit,
+        )
+
+    def update_user_habit(self, user_habit: UserHabit) -> bool:
+        """
+        Update an existing UserHabit object in the data storage.
+        Cached users holding another version of the UserHabit object are changed to hold the updated one.
+        Args:
+            user_habit: The UserHabit object to update in the data storage.
+
+        Returns:
+            True if the UserHabit object was successfully updated, False otherwise.
+        """
+        updated = self.__update(
+            "user_habit",
+            user_habit.userhabit_id,
+            user_habit,
+            self.storage.update_user_habit,
+            self.storage.get_user_habit,
+        )
+        if updated:
+            self.__share_with_users([user_habit])
+        return updated
+
+    def delete_user_habit(self, user_habit: UserHabit) -> bool:
+        """
+        Delete an existing UserHabit object from the data storage.
+        Cached users are discarded, since they may still contain the deleted UserHabit object.
+        Args:
+            user_habit: The UserHabit object to delete from the data storage.
+
+        Returns:
+            True if the UserHabit object was successfully deleted, False otherwise.
+        """
+        return self.delete_user_habits([user_habit])[0]
+
+    def get_user_habit(self, userhabit_id: str) -> UserHabit | None:
+        """
+        Retrieve a UserHabit object from the data storage by its ID.
+        Args:
+            userhabit_id: The ID of the UserHabit object to retrieve.
+
+        Returns:
+            The UserHabit object corresponding to the provided ID, or None if the UserHabit object does not exist.
+        """
+        return self.__get("user_habit", userhabit_id, self.storage.get_user_habit)
+
+    def get_all_user_habits(self) -> list[UserHabit]:
+        """
+        Retrieve all UserHabit objects from the wrapped storage, bypassing the cache.
+        Returns:
+            A list of all UserHabit objects in the data storage.
+        """
+        self.flush()
+        return self.storage.get_all_user_habits()
+
+    def iter_user_habits(self) -> Iterator[UserHabit]:
+        """
+        Iterate over all UserHabit objects of the wrapped storage, bypassing the cache.
+        Returns:
+            An iterator over all UserHabit objects in the data storage.
+        """
+        self.flush()
+        return self.storage.iter_user_habits()
+
+    def get_user_habits_for_habit(self, habit_name: str) -> list[UserHabit]:
+        """
+        Retrieve all UserHabit objects tracking a given habit from the wrapped storage, bypassing the cache.
+        Args:
+            habit_name: The name of the habit.
+
+        Returns:
+            A list of all UserHabit objects tracking the habit.
+        """
+        self.flush()
+        return self.storage.get_user_habits_for_habit(habit_name)
+
+    def insert_users(self, users: list[User]) -> list[bool]:
+        """
+        Insert multiple new users into the data storage with a single bulk insert of the wrapped storage.
+        Args:
+            users: The User objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per user, which is True if the user was successfully inserted, False otherwise.
+        """
+        self.flush()
+        results = self.storage.insert_users(users)
+        for user, inserted in zip(users, results):
+            if inserted:
+                self.__cache_put("user", user.username, user)
+        return results
+
+    def insert_habits(self, habits: list[Habit]) -> list[bool]:
+        """
+        Insert multiple new habits into the data storage with a single bulk insert of the wrapped storage.
+        Args:
+            habits: The Habit objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per habit, which is True if the habit was successfully inserted, False otherwise.
+        """
+        self.flush()
+        results = self.storage.insert_habits(habits)
+        for habit, inserted in zip(habits, results):
+            if inserted:
+                self.__cache_put("habit", habit.name, habit)
+        return results
+
+    def insert_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Insert multiple new UserHabit objects into the data storage with a single bulk insert of the wrapped storage.
+        Args:
+            user_habits: The UserHabit objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per UserHabit object, which is True if it was successfully inserted, False otherwise.
+        """
+        self.flush()
+        results = self.storage.insert_user_habits(user_habits)
+        for user_habit, inserted in zip(user_habits, results):
+            if inserted:
+                self.__cache_put("user_habit", user_habit.userhabit_id, user_habit)
+        return results
+
+    def get_user_habits(self, userhabit_ids: list[str]) -> list[UserHabit | None]:
+        """
+        Retrieve multiple UserHabit objects from the data storage by their IDs.
+        All cache misses are loaded with a single call of the wrapped storage.
+        Args:
+            userhabit_ids: The IDs of the UserHabit objects to retrieve.
+
+        Returns:
+            A list with one entry per ID, containing the corresponding UserHabit object, or None if it does not exist.
+        """
+        missing_ids = [
+            userhabit_id
+            for userhabit_id in userhabit_ids
+            if ("user_habit", userhabit_id) not in self.__pending_writes
+            and ("user_habit", userhabit_id) not in self.__cache
+        ]
+        loaded = {}
+        if len(missing_ids) > 0:
+            loaded = dict(zip(missing_ids, self.storage.get_user_habits(missing_ids)))
+        return [
+            self.__get("user_habit", userhabit_id, loaded.get)
+            for userhabit_id in userhabit_ids
+        ]
+
+    def update_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Update multiple existing UserHabit objects in the data storage.
+        With the "write-through" policy, a single bulk update of the wrapped storage is used. Cached users holding
+        another version of an updated UserHabit object are changed to hold the updated one.
+        Args:
+            user_habits: The UserHabit objects to update in the data storage.
+
+        Returns:
+            A list with one entry per UserHabit object, which is True if it was successfully updated, False otherwise.
+        """
+        if self.write_policy == WRITE_BEHIND:
+            return [self.update_user_habit(user_habit) for user_habit in user_habits]
+        results = self.storage.update_user_habits(user_habits)
+        for user_habit, updated in zip(user_habits, results):
+            if updated:
+                self.__cache_put("user_habit", user_habit.userhabit_id, user_habit)
+        self.__share_with_users(
+            [user_habit for user_habit, updated in zip(user_habits, results) if updated]
+        )
+        return results
+
+    def delete_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Delete multiple existing UserHabit objects from the data storage with a single bulk delete of the wrapped
+        storage. Cached users are discarded, since they may still contain the deleted UserHabit objects.
+        Args:
+            user_habits: The UserHabit objects to delete from the data storage.
+
+        Returns:
+            A list with one entry per UserHabit object, which is True if it was successfully deleted, False otherwise.
+        """
+        self.flush()
+        self.__cache_discard("user")
+        for user_habit in user_habits:
+            self.__cache_discard("user_habit", user_habit.userhabit_id)
+        return self.storage.delete_user_habits(user_habits)
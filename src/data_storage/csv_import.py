@@ -0,0 +1,129 @@
+import bisect
+import csv
+from datetime import datetime
+from typing import TextIO
+
+from data_storage.interface import StorageInterface
+from habit_tracking.users import User
+
+# The columns every completions CSV file must have. Further columns are ignored.
+CSV_COLUMNS = ("username", "habit", "completion_time")
+
+
+def import_completions_csv(storage: StorageInterface, fp: TextIO) -> dict:
+    """
+    Import completions of tracked habits from a CSV file with a header row and the columns "username", "habit" and
+    "completion_time" (in ISO format, e.g. "2024-01-31" or "2024-01-31T08:00:00"). Times with a UTC offset are
+    converted to local time.
+
+    Rows are grouped by user and habit, and each group is deduplicated in a single pass in chronological order, with
+    the same rule as UserHabit.track_completion: a completion is rejected if its period already contains a completion.
+    Completions before the start of a UserHabit move its creation time back, so imported history counts towards its
+    streaks. All changed UserHabit objects are written to the data storage with a single bulk update.
+    Args:
+        storage: The data storage to import into.
+        fp: The CSV file to read from.
+
+    Returns:
+        A dictionary with the number of "rows" read, the number of completions "imported", and a list of "rejected"
+        rows, each with its "line" number in the file and the "reason" for the rejection.
+    """
+    reader = csv.reader(fp)
+    header = next(reader, None)
+    missing_columns = [
+        column for column in CSV_COLUMNS if header is None or column not in header
+    ]
+    if len(missing_columns) > 0:
+        raise ValueError(f"Missing CSV columns: {', '.join(missing_columns)}")
+    username_index, habit_index, time_index = [
+        header.index(column) for column in CSV_COLUMNS
+    ]
+    now = datetime.now()
+    users = {}
+    groups = {}
+    rejected = []
+    rows = 0
+
+    def get_user(username: str) -> User | None:
+        if username not in users:
+            users[username] = storage.get_user(username)
+        return users[username]
+
+    for row in reader:
+        rows += 1
+        line = reader.line_num
+        if len(row) <= max(username_index, habit_index, time_index):
+            rejected.append({"line": line, "reason": "Missing values."})
+            continue
+        username, habit_name = row[username_index], row[habit_index]
+        try:
+            completion_time = datetime.fromisoformat(row[time_index])
+        except ValueError:
+            rejected.append({"line": line, "reason": "Invalid completion time."})
+            continue
+        if completion_time.tzinfo is not None:
+            # Stored times are naive local times, which can't be compared with aware ones
+            completion_time = completion_time.astimezone().replace(tzinfo=None)
+        if completion_time > now:
+            rejected.append(
+                {"line": line, "reason": "Completion time is in the future."}
+            )
+            continue
+        if (username, habit_name) not in groups:
+            user = get_user(username)
+            if user is None:
+                rejected.append({"line": line, "reason": f"Unknown user {username}."})
+                continue
+            user_habit = next(
+                (uh for uh in user.habits if uh.habit.name == habit_name), None
+            )
+            if user_habit is None:
+                rejected.append(
+                    {
+                        "line": line,
+                        "reason": f"Habit {habit_name} is not tracked by user {username}.",
+                    }
+                )
+                continue
+            groups[(username, habit_name)] = (user_habit, [])
+        groups[(username, habit_name)][1].append((completion_time, line))
+
+    changed_user_habits = []
+    imported = 0
+    for user_habit, completions in groups.values():
+        completions.sort()
+        archived_until = (
+            user_habit.archive.archived_until
+            if user_habit.archive is not None
+            else None
+        )
+        existing = sorted(user_habit.completion_times)
+        accepted = []
+        for completion_time, line in completions:
+            if archived_until is not None and completion_time < archived_until:
+                rejected.append({"line": line, "reason": "Period is archived."})
+                continue
+            period_start, period_end = user_habit.habit.get_period_start_end(
+                completion_time
+            )
+            # Completions are processed in chronological order, so the latest accepted one is the only one which can
+            # fall into the period of the current completion
+            if len(accepted) > 0 and accepted[-1] >= period_start:
+                rejected.append({"line": line, "reason": "Period already completed."})
+                continue
+            index = bisect.bisect_left(existing, period_start)
+            if index < len(existing) and existing[index] < period_end:
+                rejected.append({"line": line, "reason": "Period already completed."})
+                continue
+            accepted.append(completion_time)
+        if len(accepted) == 0:
+            continue
+        if accepted[0] < user_habit.creation_time:
+            user_habit.creation_time = accepted[0]
+        user_habit.completion_times = sorted(existing + accepted)
+        changed_user_habits.append(user_habit)
+        imported += len(accepted)
+    if len(changed_user_habits) > 0:
+        storage.update_user_habits(changed_user_habits)
+    rejected.sort(key=lambda reject: reject["line"])
+    return {"rows": rows, "imported": imported, "rejected": rejected}
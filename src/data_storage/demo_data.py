@@ -0,0 +1,200 @@
+import random
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+PERIODS = ("daily", "weekly", "monthly", "quarterly", "annually")
+RATE_DISTRIBUTIONS = ("fixed", "uniform", "beta")
+
+
+def draw_completion_rate(
+    rng: random.Random, completion_rate: float, distribution: str
+) -> float:
+    """
+    Draw the completion rate of a single tracked habit from a distribution with the given mean.
+    Args:
+        rng: The random number generator to use.
+        completion_rate: The mean completion rate, between 0 and 1.
+        distribution: "fixed" to always use the mean, "uniform" for a uniform distribution over the widest interval
+            around the mean that fits into [0, 1], or "beta" for a beta distribution concentrated around the mean.
+
+    Returns:
+        The completion rate, between 0 and 1.
+    """
+    assert 0 <= completion_rate <= 1, "Completion rate must be between 0 and 1."
+    match distribution:
+        case "fixed":
+            return completion_rate
+        case "uniform":
+            spread = min(completion_rate, 1 - completion_rate)
+            return rng.uniform(completion_rate - spread, completion_rate + spread)
+        case "beta" if 0 < completion_rate < 1:
+            return rng.betavariate(4 * completion_rate, 4 * (1 - completion_rate))
+        case "beta":
+            return completion_rate
+        case _:
+            raise ValueError(
+                f"Unsupported completion rate distribution {distribution}."
+            )
+
+
+def generate_habits(count: int, start: datetime, seed: int) -> list[Habit]:
+    """
+    Generate a catalog of habits with random periods.
+    Args:
+        count: The number of habits to generate.
+        start: The creation time of the habits.
+        seed: The seed for the random number generator. The same seed always generates the same habits.
+
+    Returns:
+        The generated habits, named "Demo habit 1" to "Demo habit <count>".
+    """
+    rng = random.Random(f"{seed}:habits")
+    return [
+        Habit(
+            f"Demo habit {number}",
+            f"Complete demo habit {number}",
+            rng.choice(PERIODS),
+            creation_time=start,
+        )
+        for number in range(1, count + 1)
+    ]
+
+
+def generate_user_records(
+    username: str,
+    habits: list[Habit],
+    habits_per_user: int,
+    start: datetime,
+    end: datetime,
+    completion_rate: float,
+    rate_distribution: str,
+    seed: int,
+) -> list[dict]:
+    """
+    Generate a user tracking randomly chosen habits, with random completions between the start and the end time.
+    The user's random number generator is seeded with the seed and the username, so the generated data doesn't depend
+    on which other users are generated or in which process.
+    Args:
+        username: The username of the user.
+        habits: The habits to choose from.
+        habits_per_user: The number of habits tracked by the user. Capped at the number of habits.
+        start: The time at which the user started tracking the habits.
+        end: The time up to which completions are generated.
+        completion_rate: The mean probability of completing a habit in each period.
+        rate_distribution: The distribution of the completion rates of the tracked habits, see draw_completion_rate.
+        seed: The seed for the random number generator.
+
+    Returns:
+        The records of the user's UserHabit objects followed by the record of the user, in the format used by
+        export_records.
+    """
+    rng = random.Random(f"{seed}:{username}")
+    user_habits = []
+    for habit in rng.sample(habits, min(habits_per_user, len(habits))):
+        rate = draw_completion_rate(rng, completion_rate, rate_distribution)
+        completion_times = []
+        period_start, period_end = habit.get_period_start_end(start)
+        while period_start < end:
+            if rng.random() < rate:
+                earliest = max(period_start, start)
+                seconds = int((min(period_end, end) - earliest).total_seconds())
+                completion_times.append(
+                    earliest + timedelta(seconds=rng.randrange(max(seconds, 1)))
+                )
+            period_start, period_end = habit.get_next_period(period_end)
+        user_habits.append(
+            UserHabit(
+                habit,
+                userhabit_id=f"{rng.getrandbits(128):032x}",
+                completion_times=completion_times,
+                creation_time=start,
+            )
+        )
+    records = [
+        {"type": "user_habit", "data": user_habit.json()} for user_habit in user_habits
+    ]
+    records.append({"type": "user", "data": User(username, user_habits).json()})
+    return records
+
+
+def generate_user_chunk(arguments: tuple) -> list[dict]:
+    """
+    Generate the records of multiple users, for use in a worker process.
+    Args:
+        arguments: The usernames, followed by the remaining arguments of generate_user_records.
+
+    Returns:
+        The records of all UserHabit objects of the users, followed by the records of the users.
+    """
+    usernames, *user_arguments = arguments
+    user_habit_records = []
+    user_records = []
+    for username in usernames:
+        *records, user_record = generate_user_records(username, *user_arguments)
+        user_habit_records.extend(records)
+        user_records.append(user_record)
+    return user_habit_records + user_records
+
+
+def generate_records(
+    habits: list[Habit],
+    usernames: list[str],
+    habits_per_user: int,
+    start: datetime,
+    end: datetime,
+    completion_rate: float,
+    rate_distribution: str = "fixed",
+    seed: int = 0,
+    processes: int = None,
+    chunk_size: int = 100,
+) -> Iterator[dict]:
+    """
+    Generate demo data for multiple users in parallel, as a stream of records which can be passed to import_records.
+    The users are generated in chunks by a pool of worker processes. Chunks are yielded in order as they are done, so
+    the output is the same for any number of processes.
+    Args:
+        habits: The habits the users can track. Their records are yielded first.
+        usernames: The usernames of the users to generate.
+        habits_per_user: The number of habits tracked by each user.
+        start: The time at which the users started tracking their habits.
+        end: The time up to which completions are generated.
+        completion_rate: The mean probability of completing a habit in each period.
+        rate_distribution: The distribution of the completion rates of the tracked habits, see draw_completion_rate.
+        seed: The seed for the random number generators.
+        processes: The number of worker processes. Defaults to the number of CPUs. With 1, the data is generated in
+            the current process.
+        chunk_size: The number of users generated per task of a worker process.
+
+    Returns:
+        An iterator over the records of the habits, followed by the records of the UserHabit objects and users of each
+        chunk of users.
+    """
+    assert habits_per_user > 0, "Habits per user must be positive."
+    assert chunk_size > 0, "Chunk size must be positive."
+    assert rate_distribution in RATE_DISTRIBUTIONS, "Unsupported rate distribution."
+    for habit in habits:
+        yield {"type": "habit", "data": habit.json()}
+    chunks = [
+        (
+            usernames[chunk_start : chunk_start + chunk_size],
+            habits,
+            habits_per_user,
+            start,
+            end,
+            completion_rate,
+            rate_distribution,
+            seed,
+        )
+        for chunk_start in range(0, len(usernames), chunk_size)
+    ]
+    if processes == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield from generate_user_chunk(chunk)
+        return
+    with ProcessPoolExecutor(processes) as executor:
+        for records in executor.map(generate_user_chunk, chunks):
+            yield from records
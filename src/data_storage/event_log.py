@@ -0,0 +1,116 @@
+import json
+import os
+from collections.abc import Iterator
+
+# The types of events in the completion log
+EVENT_TYPES = ("habit_created", "completion_tracked", "habit_removed")
+
+
+class EventLog:
+    """
+    An append-only log of the events of tracked habits, stored as JSON Lines with one event per line.
+
+    Events are never changed or removed once written. Positions in the log are byte offsets, so reading can resume
+    right after the last event a reader has seen. Each append is a single write to a file opened in append mode, so
+    events of concurrent writers are never interleaved. A partially written last line, e.g. from a crash during an
+    append, is removed when the log is opened.
+
+    Each event is a dictionary with the event "type", the "userhabit_id" of the UserHabit it belongs to, and:
+        - "habit_created": the "habit" name, its "period", the "creation_time" of the UserHabit, and optionally the
+          "archive" summary of completions archived before the log was started.
+        - "completion_tracked": the "completion_time".
+        - "habit_removed": nothing else.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path: The path of the log file. It is created with the first append if it does not exist.
+        """
+        self.file_path = file_path
+        self.__repair()
+
+    def __repair(self):
+        """
+        Remove a partially written last line from the log file.
+        Returns:
+            None
+        """
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, 'rb+') as fp:
+            size = fp.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            fp.seek(size - 1)
+            if fp.read(1) == b"\n":
+                return
+            # Search backwards for the end of the last complete line
+            end = size
+            while end > 0:
+                start = max(0, end - 4096)
+                fp.seek(start)
+                newline = fp.read(end - start).rfind(b"\n")
+                if newline != -1:
+                    fp.truncate(start + newline + 1)
+                    return
+                end = start
+            fp.truncate(0)
+
+    @property
+    def size(self) -> int:
+        """
+        The size of the log file in bytes, which is the offset at which the next event will be written.
+        Returns:
+            The size of the log file, or 0 if it does not exist yet.
+        """
+        try:
+            return os.path.getsize(self.file_path)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, events: list[dict]):
+        """
+        Append events to the log.
+        Args:
+            events: The events to append, in order.
+
+        Returns:
+            None
+        """
+        if len(events) == 0:
+            return
+        for event in events:
+            assert event.get("type") in EVENT_TYPES, "Unsupported event type."
+        content = "".join(f"{json.dumps(event)}\n" for event in events)
+        save_dir = os.path.dirname(self.file_path)
+        if save_dir != "":
+            os.makedirs(save_dir, exist_ok=True)
+        with open(self.file_path, 'ab') as fp:
+            fp.write(content.encode())
+
+    def read(self, offset: int = 0) -> Iterator[tuple[dict, int]]:
+        """
+        Stream the events of the log, starting at an offset. A last line which is still being written is skipped.
+        Args:
+            offset: The byte offset to start reading at, which must be the start of an event, e.g. an offset returned
+                by an earlier call.
+
+        Returns:
+            An iterator over tuples of each event and the offset right after it.
+        """
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, 'rb') as fp:
+            fp.seek(offset)
+            for line in fp:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON at offset {offset}: {e}") from e
+                if event.get("type") not in EVENT_TYPES or "userhabit_id" not in event:
+                    raise ValueError(f"Invalid event at offset {offset}.")
+                offset += len(line)
+                yield event, offset
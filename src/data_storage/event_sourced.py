@@ -0,0 +1,353 @@
+import os
+from collections.abc import Iterator
+
+from data_storage.event_log import EventLog
+from data_storage.interface import StorageInterface
+from habit_analysis.projections import Projections, load_checkpoint
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+
+class EventSourcedStorage(StorageInterface):
+    """
+    A data storage interface that records every change of the tracked habits in an append-only event log, and keeps
+    projections of the log (see Projections) up to date, so streaks and completion counts can be read without
+    computing them from the completion history.
+
+    Writes are passed on to the wrapped storage first, and their events are appended to the log once they succeeded.
+    New completions are found by comparing the number of completions of a UserHabit, including archived ones, with
+    the number recorded in the projections, so completions must only ever be added with UserHabit.track_completion.
+
+    Since a write and its events are not stored atomically, a crash between them leaves the log behind the wrapped
+    storage. The log is therefore reconciled with the wrapped storage whenever the storage is opened: UserHabits
+    missing from the projections are logged as created, new completions as tracked, and UserHabits which no longer
+    exist as removed. An empty log is started with the current state of the wrapped storage the same way. The
+    reconciliation can't restore the time at which the missed events happened, and it never removes completions which
+    were logged but are missing in the wrapped storage.
+
+    The projections are written to a checkpoint file every checkpoint_interval events and when the storage is closed.
+    On opening, the checkpoint is loaded and only the events logged after it are applied. Events appended by other
+    processes are applied before the projections are read.
+    """
+
+    def __init__(
+        self,
+        storage: StorageInterface,
+        log_path: str,
+        checkpoint_path: str = None,
+        checkpoint_interval: int = 1000,
+    ):
+        """
+        Args:
+            storage: The data storage to wrap.
+            log_path: The path of the event log file.
+            checkpoint_path: The path of the checkpoint file. Defaults to the log path with the extension
+                ".checkpoint.json".
+            checkpoint_interval: The number of events after which the projections are checkpointed.
+        """
+        assert checkpoint_interval > 0, "Checkpoint interval must be positive."
+        self.storage = storage
+        self.event_log = EventLog(log_path)
+        self.checkpoint_path = (
+            checkpoint_path
+            if checkpoint_path is not None
+            else f"{os.path.splitext(log_path)[0]}.checkpoint.json"
+        )
+        self.checkpoint_interval = checkpoint_interval
+        self.__projections = load_checkpoint(self.checkpoint_path)
+        if self.__projections.offset > self.event_log.size:
+            # The checkpoint belongs to a different log
+            self.__projections = Projections()
+        self.__checkpointed_event_count = self.__projections.event_count
+        self.__catch_up()
+        self.__reconcile()
+
+    def __getattr__(self, name: str):
+        # Only called for attributes which are not defined by this class
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.storage, name)
+
+    @property
+    def projections(self) -> Projections:
+        """
+        The projections of the event log, including the events appended by other processes.
+        Returns:
+            The up-to-date projections, which must not be modified.
+        """
+        self.__catch_up()
+        return self.__projections
+
+    def __catch_up(self):
+        """
+        Apply all events which were appended to the log since the projections were last updated.
+        Returns:
+            None
+        """
+        if self.event_log.size == self.__projections.offset:
+            return
+        for event, offset in self.event_log.read(self.__projections.offset):
+            self.__projections.apply(event, offset)
+        if (
+            self.__projections.event_count - self.__checkpointed_event_count
+            >= self.checkpoint_interval
+        ):
+            self.checkpoint()
+
+    def __append(self, events: list[dict]):
+        """
+        Append events to the log and apply them to the projections.
+        Args:
+            events: The events to append.
+
+        Returns:
+            None
+        """
+        if len(events) == 0:
+            return
+        # Events of other processes are applied first, so the projections see all events in the order of the log
+        self.__catch_up()
+        self.event_log.append(events)
+        self.__catch_up()
+
+    def __reconcile(self):
+        """
+        Log the changes of the wrapped storage which are missing from the log, e.g. after a crash right after a write.
+        Returns:
+            None
+        """
+        userhabit_ids = set()
+        events = []
+        for user_habit in self.storage.iter_user_habits():
+            userhabit_ids.add(user_habit.userhabit_id)
+            events.extend(self.__get_update_events(user_habit))
+        events.extend(
+            self.__get_removed_event(userhabit_id)
+            for userhabit_id in self.__projections.user_habits
+            if userhabit_id not in userhabit_ids
+        )
+        self.__append(events)
+
+    @staticmethod
+    def __get_completion_events(
+        user_habit: UserHabit, completion_times: list
+    ) -> list[dict]:
+        return [
+            {
+                "type": "completion_tracked",
+                "userhabit_id": user_habit.userhabit_id,
+                "completion_time": completion_time.isoformat(),
+            }
+            for completion_time in completion_times
+        ]
+
+    def __get_created_events(self, user_habit: UserHabit) -> list[dict]:
+        """
+        Get the events creating a UserHabit with all of its completions.
+        Args:
+            user_habit: The UserHabit.
+
+        Returns:
+            A habit_created event, followed by a completion_tracked event per completion that isn't archived.
+        """
+        event = {
+            "type": "habit_created",
+            "userhabit_id": user_habit.userhabit_id,
+            "habit": user_habit.habit.name,
+            "period": user_habit.habit.period,
+            "creation_time": user_habit.creation_time.isoformat(),
+        }
+        if user_habit.archive is not None:
+            event["archive"] = user_habit.archive.json()
+        return [event] + self.__get_completion_events(
+            user_habit, user_habit.completion_times
+        )
+
+    def __get_update_events(self, user_habit: UserHabit) -> list[dict]:
+        """
+        Get the events for the completions tracked since the last update of a UserHabit.
+        Args:
+            user_habit: The UserHabit.
+
+        Returns:
+            A completion_tracked event per new completion, or the events creating the UserHabit if it is unknown.
+        """
+        if user_habit.userhabit_id not in self.__projections:
+            return self.__get_created_events(user_habit)
+        completion_count = len(user_habit.completion_times)
+        if user_habit.archive is not None:
+            completion_count += user_habit.archive.completion_count
+        new_count = min(
+            completion_count
+            - self.__projections.get_completion_count(user_habit.userhabit_id),
+            len(user_habit.completion_times),
+        )
+        if new_count <= 0:
+            return []
+        # Completions are always appended by UserHabit.track_completion
+        return self.__get_completion_events(
+            user_habit, user_habit.completion_times[-new_count:]
+        )
+
+    @staticmethod
+    def __get_removed_event(userhabit_id: str) -> dict:
+        return {"type": "habit_removed", "userhabit_id": userhabit_id}
+
+    def checkpoint(self):
+        """
+        Write the projections to the checkpoint file.
+        Returns:
+            None
+        """
+        self.__projections.save_checkpoint(self.checkpoint_path)
+        self.__checkpointed_event_count = self.__projections.event_count
+
+    def rebuild_projections(self):
+        """
+        Rebuild the projections by applying all events of the log to empty projections, and checkpoint them.
+        Returns:
+            None
+        """
+        self.__projections = Projections()
+        self.__checkpointed_event_count = 0
+        self.__catch_up()
+        self.checkpoint()
+
+    def close(self):
+        """
+        Checkpoint the projections, if any events were applied since the last checkpoint. Should be called before the
+        storage is discarded, so the next start doesn't need to apply these events again.
+        Returns:
+            None
+        """
+        self.__catch_up()
+        if self.__projections.event_count != self.__checkpointed_event_count:
+            self.checkpoint()
+
+    def insert_user(self, user: User) -> bool:
+        return self.storage.insert_user(user)
+
+    def update_user(self, user: User) -> bool:
+        return self.storage.update_user(user)
+
+    def delete_user(self, user: User) -> bool:
+        return self.storage.delete_user(user)
+
+    def get_user(self, username: str) -> User | None:
+        return self.storage.get_user(username)
+
+    def get_all_users(self) -> list[User]:
+        return self.storage.get_all_users()
+
+    def insert_habit(self, habit: Habit) -> bool:
+        return self.storage.insert_habit(habit)
+
+    def update_habit(self, habit: Habit) -> bool:
+        return self.storage.update_habit(habit)
+
+    def delete_habit(self, habit: Habit, cascade: bool = False) -> bool:
+        userhabit_ids = (
+            [
+                user_habit.userhabit_id
+                for user_habit in self.storage.get_user_habits_for_habit(habit.name)
+            ]
+            if cascade
+            else []
+        )
+        if not self.storage.delete_habit(habit, cascade):
+            return False
+        self.__append(
+            [self.__get_removed_event(userhabit_id) for userhabit_id in userhabit_ids]
+        )
+        return True
+
+    def get_habit(self, name: str) -> Habit | None:
+        return self.storage.get_habit(name)
+
+    def get_all_habits(self) -> list[Habit]:
+        return self.storage.get_all_habits()
+
+    def insert_user_habit(self, user_habit: UserHabit) -> bool:
+        return self.insert_user_habits([user_habit])[0]
+
+    def update_user_habit(self, user_habit: UserHabit) -> bool:
+        return self.update_user_habits([user_habit])[0]
+
+    def delete_user_habit(self, user_habit: UserHabit) -> bool:
+        return self.delete_user_habits([user_habit])[0]
+
+    def get_user_habit(self, userhabit_id: str) -> UserHabit | None:
+        return self.storage.get_user_habit(userhabit_id)
+
+    def get_all_user_habits(self) -> list[UserHabit]:
+        return self.storage.get_all_user_habits()
+
+    def iter_users(self) -> Iterator[User]:
+        return self.storage.iter_users()
+
+    def iter_habits(self) -> Iterator[Habit]:
+        return self.storage.iter_habits()
+
+    def iter_habit_names(self) -> Iterator[str]:
+        return self.storage.iter_habit_names()
+
+    def search_habits(self, query: str, limit: int = 9) -> list[str]:
+        return self.storage.search_habits(query, limit)
+
+    def iter_user_habits(self) -> Iterator[UserHabit]:
+        return self.storage.iter_user_habits()
+
+    def get_habits_by_period(self, period: str) -> list[Habit]:
+        return self.storage.get_habits_by_period(period)
+
+    def get_user_habits_for_habit(self, habit_name: str) -> list[UserHabit]:
+        return self.storage.get_user_habits_for_habit(habit_name)
+
+    def insert_users(self, users: list[User]) -> list[bool]:
+        return self.storage.insert_users(users)
+
+    def insert_habits(self, habits: list[Habit]) -> list[bool]:
+        return self.storage.insert_habits(habits)
+
+    def get_user_habits(self, userhabit_ids: list[str]) -> list[UserHabit | None]:
+        return self.storage.get_user_habits(userhabit_ids)
+
+    def insert_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        results = self.storage.insert_user_habits(user_habits)
+        self.__append(
+            [
+                event
+                for user_habit, inserted in zip(user_habits, results)
+                if inserted
+                for event in self.__get_created_events(user_habit)
+            ]
+        )
+        return results
+
+    def update_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        results = self.storage.update_user_habits(user_habits)
+        # A UserHabit passed more than once must only have its new completions logged once
+        updated_user_habits = {
+            user_habit.userhabit_id: user_habit
+            for user_habit, updated in zip(user_habits, results)
+            if updated
+        }
+        self.__append(
+            [
+                event
+                for user_habit in updated_user_habits.values()
+                for event in self.__get_update_events(user_habit)
+            ]
+        )
+        return results
+
+    def delete_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        results = self.storage.delete_user_habits(user_habits)
+        self.__append(
+            [
+                self.__get_removed_event(user_habit.userhabit_id)
+                for user_habit, deleted in zip(user_habits, results)
+                if deleted
+            ]
+        )
+        return results
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 
+from data_storage.search import HabitSearchIndex
 from habit_tracking.habits import Habit, UserHabit
 from habit_tracking.users import User
 
@@ -57,6 +59,15 @@ class StorageInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_all_users(self) -> list[User]:
+        """
+        Retrieve all users from the data storage.
+        Returns:
+            A list of all User objects in the data storage.
+        """
+        pass
+
     @abstractmethod
     def insert_habit(self, habit: Habit) -> bool:
         """
@@ -82,11 +93,13 @@ class StorageInterface(ABC):
         pass
 
     @abstractmethod
-    def delete_habit(self, habit: Habit) -> bool:
+    def delete_habit(self, habit: Habit, cascade: bool = False) -> bool:
         """
         Delete an existing habit from the data storage.
         Args:
             habit: The Habit object to delete from the data storage.
+            cascade: Whether to also delete all UserHabit objects tracking the habit, and remove them from the users
+                tracking them.
 
         Returns:
             True if the habit was successfully deleted, False otherwise.
@@ -170,3 +183,156 @@ class StorageInterface(ABC):
             A list of all UserHabit objects in the data storage.
         """
         pass
+
+    def iter_users(self) -> Iterator[User]:
+        """
+        Iterate over all users in the data storage, one at a time.
+        Backends may override this to avoid building all User objects up front.
+        Returns:
+            An iterator over all User objects in the data storage.
+        """
+        yield from self.get_all_users()
+
+    def iter_habits(self) -> Iterator[Habit]:
+        """
+        Iterate over all habits in the data storage, one at a time.
+        Backends may override this to avoid building all Habit objects up front.
+        Returns:
+            An iterator over all Habit objects in the data storage.
+        """
+        yield from self.get_all_habits()
+
+    def iter_habit_names(self) -> Iterator[str]:
+        """
+        Iterate over the names of all habits in the data storage, one at a time.
+        Backends may override this to list the habits without deserializing them.
+        Returns:
+            An iterator over the names of all habits in the data storage.
+        """
+        for habit in self.iter_habits():
+            yield habit.name
+
+    def search_habits(self, query: str, limit: int = 9) -> list[str]:
+        """
+        Search for habits by their name and task description. See HabitSearchIndex for how matches are ranked.
+        Backends may override this to keep the search index between searches.
+        Args:
+            query: The text to search for.
+            limit: The maximum number of results.
+
+        Returns:
+            The names of the matching habits, best match first.
+        """
+        search_index = HabitSearchIndex()
+        for habit in self.iter_habits():
+            search_index.add(habit.name, habit.task_description)
+        return search_index.search(query, limit)
+
+    def iter_user_habits(self) -> Iterator[UserHabit]:
+        """
+        Iterate over all UserHabit objects in the data storage, one at a time.
+        Backends may override this to avoid building all UserHabit objects up front.
+        Returns:
+            An iterator over all UserHabit objects in the data storage.
+        """
+        yield from self.get_all_user_habits()
+
+    def get_habits_by_period(self, period: str) -> list[Habit]:
+        """
+        Retrieve all habits with a specific period from the data storage.
+        Backends may override this to use an index instead of scanning all habits.
+        Args:
+            period: The period of the habits to retrieve.
+
+        Returns:
+            A list of all Habit objects with the provided period.
+        """
+        return [habit for habit in self.get_all_habits() if habit.period == period]
+
+    def get_user_habits_for_habit(self, habit_name: str) -> list[UserHabit]:
+        """
+        Retrieve all UserHabit objects tracking a specific habit from the data storage.
+        Backends may override this to use an index instead of scanning all UserHabit objects.
+        Args:
+            habit_name: The name of the habit tracked by the UserHabit objects to retrieve.
+
+        Returns:
+            A list of all UserHabit objects tracking the habit.
+        """
+        return [
+            user_habit
+            for user_habit in self.get_all_user_habits()
+            if user_habit.habit.name == habit_name
+        ]
+
+    def insert_users(self, users: list[User]) -> list[bool]:
+        """
+        Insert multiple new users into the data storage.
+        Backends may override this to persist all users with a single write.
+        Args:
+            users: The User objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per user, True if that user was successfully inserted, False otherwise.
+        """
+        return [self.insert_user(user) for user in users]
+
+    def insert_habits(self, habits: list[Habit]) -> list[bool]:
+        """
+        Insert multiple new habits into the data storage.
+        Backends may override this to persist all habits with a single write.
+        Args:
+            habits: The Habit objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per habit, True if that habit was successfully inserted, False otherwise.
+        """
+        return [self.insert_habit(habit) for habit in habits]
+
+    def get_user_habits(self, userhabit_ids: list[str]) -> list[UserHabit | None]:
+        """
+        Retrieve multiple UserHabit objects from the data storage by their IDs.
+        Backends may override this to share work between the lookups.
+        Args:
+            userhabit_ids: The IDs of the UserHabit objects to retrieve.
+
+        Returns:
+            A list with one entry per ID, containing the corresponding UserHabit object, or None if it does not exist.
+        """
+        return [self.get_user_habit(userhabit_id) for userhabit_id in userhabit_ids]
+
+    def insert_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Insert multiple new UserHabit objects into the data storage.
+        Backends may override this to persist all UserHabit objects with a single write.
+        Args:
+            user_habits: The UserHabit objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per UserHabit, True if that UserHabit was successfully inserted, False otherwise.
+        """
+        return [self.insert_user_habit(user_habit) for user_habit in user_habits]
+
+    def update_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Update multiple existing UserHabit objects in the data storage.
+        Backends may override this to persist all UserHabit objects with a single write.
+        Args:
+            user_habits: The UserHabit objects to update in the data storage.
+
+        Returns:
+            A list with one entry per UserHabit, True if that UserHabit was successfully updated, False otherwise.
+        """
+        return [self.update_user_habit(user_habit) for user_habit in user_habits]
+
+    def delete_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Delete multiple existing UserHabit objects from the data storage.
+        Backends may override this to persist the deletion with a single write.
+        Args:
+            user_habits: The UserHabit objects to delete from the data storage.
+
+        Returns:
+            A list with one entry per UserHabit, True if that UserHabit was successfully deleted, False otherwise.
+        """
+        return [self.delete_user_habit(user_habit) for user_habit in user_habits]
@@ -1,8 +1,22 @@
+import gzip
 import json
+import lzma
 import os
+import weakref
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:
+    # File locking is only available on POSIX systems
+    fcntl = None
+
 from data_storage.interface import StorageInterface
+from data_storage.search import HabitSearchIndex
+from data_storage.serialization import habit_from_json, user_habit_from_json
+from data_storage.snapshot import MISSING, JsonStorageSnapshot
 from habit_tracking.habits import Habit, UserHabit
 from habit_tracking.users import User
 
@@ -12,13 +26,41 @@ class JsonStorageInterface(StorageInterface):
     A data storage interface that uses JSON files to store data.
     """
 
-    def __init__(self, file_path: str):
+    def __init__(
+        self,
+        file_path: str,
+        multi_process: bool = False,
+        compression_level: int = 6,
+    ):
         """
         Args:
-            file_path: The path to the JSON file to use for data storage.
-        """
-        assert file_path.endswith('.json'), "File path must be a JSON file."
+            file_path: The path to the JSON file to use for data storage. Files ending in ".json.gz" or ".json.xz" are
+                transparently compressed using gzip or xz.
+            multi_process: Whether the file may be modified by other processes at the same time. If enabled, every
+                write holds an advisory lock on the file, and the data is reloaded before an operation whenever the
+                file has changed on disk. Requires fcntl, so this is only supported on POSIX systems.
+            compression_level: The compression level (0-9) to use for compressed files. Higher levels produce smaller
+                files, but make saving slower. Ignored for uncompressed files.
+        """
+        assert file_path.endswith(
+            ('.json', '.json.gz', '.json.xz')
+        ), "File path must be a JSON file."
+        assert 0 <= compression_level <= 9, "Compression level must be between 0 and 9."
+        assert (
+            not multi_process or fcntl is not None
+        ), "Multi-process access is not supported on this platform."
         self.file_path = file_path
+        # Archived completions are kept next to the data file, e.g. "data.archive.json" for "data.json"
+        extension_start = file_path.rindex('.json')
+        self.archive_path = (
+            f"{file_path[:extension_start]}.archive{file_path[extension_start:]}"
+        )
+        self.multi_process = multi_process
+        self.compression_level = compression_level
+        self.__file_signature = None
+        self.__lock_depth = 0
+        self.__fragments = {}
+        self.__record_versions = {}
         self.data = self.__load_json()
 
     def __load_json(self) -> dict:
@@ -27,11 +69,105 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             The JSON data loaded from the file, or the basic data structure dictionary if the file does not exist.
         """
+        self.__file_signature = self.__get_file_signature()
+        self.__fragments = {}
+        self.__record_versions = {}
+        # Snapshots of previously loaded data are unaffected by changes to the newly loaded data
+        self.__snapshots = weakref.WeakSet()
         if os.path.exists(self.file_path):
-            with open(self.file_path, 'r') as fp:
-                return json.load(fp)
+            with self.__open_file(self.file_path, 'r') as fp:
+                data = json.load(fp)
         else:
-            return {"users": {}, "habits": {}, "user_habits": {}}
+            data = {"users": {}, "habits": {}, "user_habits": {}}
+        self.__build_indexes(data)
+        return data
+
+    def __build_indexes(self, data: dict):
+        """
+        Build the secondary indexes from scratch.
+        The indexes map each period to the names of its habits, each habit name to the IDs of the UserHabit objects
+        tracking it, and each UserHabit ID to the usernames of the users referencing it. Dictionaries with None values
+        are used as insertion ordered sets. The search index is built here as well, so no search has to wait for it, and
+        is kept up to date by every later change to the habits.
+        Args:
+            data: The data to index.
+
+        Returns:
+            None
+        """
+        self.__habits_by_period = {}
+        self.__user_habits_by_habit = {}
+        self.__users_by_user_habit = {}
+        self.__search_index = HabitSearchIndex()
+        self.__search_index.add_all(
+            (habit_name, habit_data['task_description'])
+            for habit_name, habit_data in data['habits'].items()
+        )
+        for username, user_data in data['users'].items():
+            for user_habit_id in user_data['habits']:
+                self.__users_by_user_habit.setdefault(user_habit_id, {})[
+                    username
+                ] = None
+        for habit_name, habit_data in data['habits'].items():
+            self.__habits_by_period.setdefault(habit_data['period'], {})[
+                habit_name
+            ] = None
+        for user_habit_id, user_habit_data in data['user_habits'].items():
+            self.__user_habits_by_habit.setdefault(user_habit_data['habit'], {})[
+                user_habit_id
+            ] = None
+
+    def __unindex_record(self, section: str, key: str):
+        """
+        Remove a stored record from the secondary indexes.
+        Args:
+            section: The section of the data the record is stored in.
+            key: The primary key of the record.
+
+        Returns:
+            None
+        """
+        record = self.data[section].get(key)
+        if record is None:
+            return
+        match section:
+            case 'habits':
+                entries = [(self.__habits_by_period, record['period'])]
+                self.__search_index.remove(key)
+            case 'user_habits':
+                entries = [(self.__user_habits_by_habit, record['habit'])]
+            case 'users':
+                entries = [
+                    (self.__users_by_user_habit, user_habit_id)
+                    for user_habit_id in record['habits']
+                ]
+            case _:
+                entries = []
+        for index, index_key in entries:
+            index[index_key].pop(key, None)
+            if len(index[index_key]) == 0:
+                del index[index_key]
+
+    def __index_record(self, section: str, key: str):
+        """
+        Add a stored record to the secondary indexes.
+        Args:
+            section: The section of the data the record is stored in.
+            key: The primary key of the record.
+
+        Returns:
+            None
+        """
+        record = self.data[section][key]
+        match section:
+            case 'habits':
+                self.__habits_by_period.setdefault(record['period'], {})[key] = None
+                self.__search_index.add(key, record['task_description'])
+            case 'user_habits':
+                self.__user_habits_by_habit.setdefault(record['habit'], {})[key] = None
+            case 'users':
+                for user_habit_id in record['habits']:
+                    self.__users_by_user_habit.setdefault(user_habit_id, {})[key] = None
 
     def __save_json(self):
         """
@@ -39,11 +175,221 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             None
         """
-        save_dir = os.path.dirname(self.file_path)
+        self.__write_file(self.file_path, self.__serialize())
+        self.__file_signature = self.__get_file_signature()
+
+    def __write_file(self, file_path: str, content: str):
+        """
+        Atomically replace the content of a data file.
+        Args:
+            file_path: The path of the file to write.
+            content: The content to write.
+
+        Returns:
+            None
+        """
+        save_dir = os.path.dirname(file_path)
         if save_dir != "":
             os.makedirs(save_dir, exist_ok=True)
-        with open(self.file_path, 'w') as fp:
-            json.dump(self.data, fp)
+        # Write to a temporary file first, so other readers never see a partially written file
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        try:
+            with self.__open_file(temp_path, 'w') as fp:
+                fp.write(content)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def __load_archive(self) -> dict:
+        """
+        Load the archived completion times from the archive file.
+        Returns:
+            A dictionary mapping UserHabit IDs to their archived completion times in ISO format.
+        """
+        if not os.path.exists(self.archive_path):
+            return {}
+        with self.__open_file(self.archive_path, 'r') as fp:
+            return json.load(fp)["user_habits"]
+
+    def __serialize(self) -> str:
+        """
+        Serialize the data to a JSON string, identical to json.dumps(self.data).
+        The encoded form of every record is cached, so only records which changed since the last save are encoded again.
+        Returns:
+            The serialized data.
+        """
+        sections = []
+        for section, records in self.data.items():
+            fragments = self.__fragments.setdefault(section, {})
+            encoded_records = []
+            for key, record in records.items():
+                if key not in fragments:
+                    fragments[key] = json.dumps(record)
+                encoded_records.append(f"{json.dumps(key)}: {fragments[key]}")
+            sections.append(f"{json.dumps(section)}: {{{', '.join(encoded_records)}}}")
+        return f"{{{', '.join(sections)}}}"
+
+    def __set_record(self, section: str, key: str, obj: User | Habit | UserHabit):
+        """
+        Store the json of an object in a section of the data, updating the secondary indexes and invalidating the cached
+        encoded form of the record.
+        Args:
+            section: The section of the data to store the object in ("users", "habits" or "user_habits").
+            key: The primary key of the object.
+            obj: The object to store.
+
+        Returns:
+            None
+        """
+        self.__store_record(section, key, obj.json())
+        if isinstance(obj, UserHabit):
+            self.__record_versions[key] = obj.version
+
+    def __store_record(self, section: str, key: str, record: dict):
+        """
+        Store a json record in a section of the data, updating the secondary indexes and invalidating the cached
+        encoded form of the record.
+        Args:
+            section: The section of the data to store the record in ("users", "habits" or "user_habits").
+            key: The primary key of the record.
+            record: The json record to store.
+
+        Returns:
+            None
+        """
+        self.__preserve_for_snapshots(section, key)
+        self.__unindex_record(section, key)
+        self.data[section][key] = record
+        self.__index_record(section, key)
+        self.__fragments.get(section, {}).pop(key, None)
+
+    def __delete_record(self, section: str, key: str):
+        """
+        Delete a record from a section of the data, together with its index entries and cached encoded form.
+        Args:
+            section: The section of the data to delete the record from ("users", "habits" or "user_habits").
+            key: The primary key of the record.
+
+        Returns:
+            None
+        """
+        self.__preserve_for_snapshots(section, key)
+        self.__unindex_record(section, key)
+        del self.data[section][key]
+        self.__fragments.get(section, {}).pop(key, None)
+        if section == 'user_habits':
+            self.__record_versions.pop(key, None)
+
+    def __preserve_for_snapshots(self, section: str, key: str):
+        """
+        Hand the current version of a record to all live snapshots, before the record is changed.
+        Args:
+            section: The section of the data the record is stored in.
+            key: The primary key of the record.
+
+        Returns:
+            None
+        """
+        for snapshot in list(self.__snapshots):
+            snapshot.preserve(section, key, self.data[section].get(key, MISSING))
+
+    def snapshot(self) -> JsonStorageSnapshot:
+        """
+        Take an immutable point-in-time view of the data, for consistent reads while the data storage is written to.
+        The snapshot shares all unchanged records with the data storage. See JsonStorageSnapshot for details.
+        Returns:
+            The snapshot of the current data.
+        """
+        self.__refresh()
+        snapshot = JsonStorageSnapshot(self.data)
+        self.__snapshots.add(snapshot)
+        return snapshot
+
+    def __is_unchanged(self, user_habit: UserHabit) -> bool:
+        """
+        Check whether a UserHabit is in the exact state that was last stored or retrieved, so updating it is a no-op.
+        Args:
+            user_habit: The UserHabit object to check.
+
+        Returns:
+            True if the stored record is known to match the object, False otherwise.
+        """
+        return self.__record_versions.get(user_habit.userhabit_id) == user_habit.version
+
+    def __open_file(self, file_path: str, mode: str):
+        """
+        Open a data file in text mode, compressing or decompressing it according to the extension of the storage file.
+        Args:
+            file_path: The path of the file to open.
+            mode: The mode to open the file in ("r" or "w").
+
+        Returns:
+            The opened file object.
+        """
+        if self.file_path.endswith('.gz'):
+            return gzip.open(
+                file_path, mode + 't', compresslevel=self.compression_level
+            )
+        elif self.file_path.endswith('.xz'):
+            if mode == 'w':
+                return lzma.open(file_path, 'wt', preset=self.compression_level)
+            return lzma.open(file_path, 'rt')
+        else:
+            return open(file_path, mode)
+
+    def __get_file_signature(self) -> tuple[int, int, int] | None:
+        """
+        Get a signature of the file on disk which changes whenever the file is rewritten.
+        Returns:
+            A tuple of the inode, modification time and size of the file, or None if the file does not exist.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def __refresh(self):
+        """
+        Reload the data from the file if it has been changed by another process.
+        Does nothing unless multi-process access is enabled.
+        Returns:
+            None
+        """
+        if self.multi_process and self.__lock_depth == 0:
+            if self.__get_file_signature() != self.__file_signature:
+                self.data = self.__load_json()
+
+    @contextmanager
+    def __write_lock(self):
+        """
+        Hold an exclusive advisory lock on the file for the duration of a write operation.
+        The data is reloaded after acquiring the lock if the file has been changed by another process, so the write is
+        applied to the latest data. Does nothing unless multi-process access is enabled.
+        Returns:
+            A context manager holding the lock.
+        """
+        if not self.multi_process or self.__lock_depth > 0:
+            self.__lock_depth += 1
+            try:
+                yield
+            finally:
+                self.__lock_depth -= 1
+            return
+        # The data file itself is replaced on every save, so the lock is held on a separate lock file
+        with open(self.file_path + '.lock', 'a') as lock_fp:
+            fcntl.flock(lock_fp, fcntl.LOCK_EX)
+            try:
+                self.__refresh()
+                self.__lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self.__lock_depth -= 1
+            finally:
+                fcntl.flock(lock_fp, fcntl.LOCK_UN)
 
     def insert_user(self, user: User) -> bool:
         """
@@ -54,11 +400,12 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             True if the user was successfully inserted, False otherwise.
         """
-        if user.username in self.data['users']:
-            return False
-        self.data['users'][user.username] = user.json()
-        self.__save_json()
-        return True
+        with self.__write_lock():
+            if user.username in self.data['users']:
+                return False
+            self.__set_record('users', user.username, user)
+            self.__save_json()
+            return True
 
     def update_user(self, user: User) -> bool:
         """
@@ -69,11 +416,12 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             True if the user was successfully updated, False otherwise.
         """
-        if user.username not in self.data['users']:
-            return False
-        self.data['users'][user.username] = user.json()
-        self.__save_json()
-        return True
+        with self.__write_lock():
+            if user.username not in self.data['users']:
+                return False
+            self.__set_record('users', user.username, user)
+            self.__save_json()
+            return True
 
     def delete_user(self, user: User) -> bool:
         """
@@ -84,11 +432,12 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             True if the user was successfully deleted, False otherwise.
         """
-        if user.username not in self.data['users']:
-            return False
-        del self.data['users'][user.username]
-        self.__save_json()
-        return True
+        with self.__write_lock():
+            if user.username not in self.data['users']:
+                return False
+            self.__delete_record('users', user.username)
+            self.__save_json()
+            return True
 
     def get_user(self, username: str) -> User | None:
         """
@@ -99,14 +448,61 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             The User object corresponding to the provided username, or None if the user does not exist.
         """
+        self.__refresh()
         if username not in self.data['users']:
             return None
         user_data = self.data['users'][username]
+        initialised_user_habits = self.get_user_habits(user_data['habits'])
+        # Skip references to UserHabit objects which no longer exist
         initialised_user_habits = [
-            self.get_user_habit(user_habit_id) for user_habit_id in user_data['habits']
+            user_habit
+            for user_habit in initialised_user_habits
+            if user_habit is not None
         ]
         return User(username=user_data["username"], habits=initialised_user_habits)
 
+    def get_all_users(self) -> list[User]:
+        """
+        Retrieve all users from the data storage.
+        Returns:
+            A list of all User objects in the data storage.
+        """
+        self.__refresh()
+        return list(self.iter_users())
+
+    def iter_users(self) -> Iterator[User]:
+        """
+        Iterate over all users in the data storage, deserializing one user at a time.
+        Returns:
+            An iterator over all User objects in the data storage.
+        """
+        self.__refresh()
+        for username in list(self.data['users']):
+            user = self.get_user(username)
+            if user is not None:
+                yield user
+
+    def insert_users(self, users: list[User]) -> list[bool]:
+        """
+        Insert multiple new users into the data storage, writing the file only once.
+        Args:
+            users: The User objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per user, True if that user was successfully inserted, False otherwise.
+        """
+        with self.__write_lock():
+            results = []
+            for user in users:
+                if user.username in self.data['users']:
+                    results.append(False)
+                else:
+                    self.__set_record('users', user.username, user)
+                    results.append(True)
+            if any(results):
+                self.__save_json()
+            return results
+
     def insert_habit(self, habit: Habit) -> bool:
         """
         Insert a new habit into the data storage.
@@ -116,11 +512,12 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             True if the habit was successfully inserted, False otherwise.
         """
-        if habit.name in self.data['habits']:
-            return False
-        self.data['habits'][habit.name] = habit.json()
-        self.__save_json()
-        return True
+        with self.__write_lock():
+            if habit.name in self.data['habits']:
+                return False
+            self.__set_record('habits', habit.name, habit)
+            self.__save_json()
+            return True
 
     def update_habit(self, habit: Habit) -> bool:
         """
@@ -131,26 +528,50 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             True if the habit was successfully updated, False otherwise.
         """
-        if habit.name not in self.data['habits']:
-            return False
-        self.data['habits'][habit.name] = habit.json()
-        self.__save_json()
-        return True
+        with self.__write_lock():
+            if habit.name not in self.data['habits']:
+                return False
+            self.__set_record('habits', habit.name, habit)
+            self.__save_json()
+            return True
 
-    def delete_habit(self, habit: Habit) -> bool:
+    def delete_habit(self, habit: Habit, cascade: bool = False) -> bool:
         """
         Delete an existing habit from the data storage.
         Args:
             habit: The Habit object to delete from the data storage.
+            cascade: Whether to also delete all UserHabit objects tracking the habit, and remove them from the users
+                tracking them. The affected records are found using the secondary indexes and the whole deletion is
+                written at once.
 
         Returns:
             True if the habit was successfully deleted, False otherwise.
         """
-        if habit.name not in self.data['habits']:
-            return False
-        del self.data['habits'][habit.name]
-        self.__save_json()
-        return True
+        with self.__write_lock():
+            if habit.name not in self.data['habits']:
+                return False
+            if cascade:
+                user_habit_ids = list(self.__user_habits_by_habit.get(habit.name, {}))
+                affected_usernames = {}
+                for user_habit_id in user_habit_ids:
+                    for username in self.__users_by_user_habit.get(user_habit_id, {}):
+                        affected_usernames[username] = None
+                deleted_ids = set(user_habit_ids)
+                for username in affected_usernames:
+                    user_data = self.data['users'][username]
+                    remaining_ids = [
+                        user_habit_id
+                        for user_habit_id in user_data['habits']
+                        if user_habit_id not in deleted_ids
+                    ]
+                    self.__store_record(
+                        'users', username, {**user_data, 'habits': remaining_ids}
+                    )
+                for user_habit_id in user_habit_ids:
+                    self.__delete_record('user_habits', user_habit_id)
+            self.__delete_record('habits', habit.name)
+            self.__save_json()
+            return True
 
     def get_habit(self, habit_name: str) -> Habit | None:
         """
@@ -161,16 +582,10 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             The Habit object corresponding to the provided name, or None if the habit does not exist.
         """
+        self.__refresh()
         if habit_name not in self.data['habits']:
             return None
-        habit_data = self.data['habits'][habit_name]
-        creation_time = datetime.fromisoformat(habit_data["creation_time"])
-        return Habit(
-            name=habit_data["name"],
-            task_description=habit_data["task_description"],
-            period=habit_data["period"],
-            creation_time=creation_time,
-        )
+        return habit_from_json(self.data['habits'][habit_name])
 
     def get_all_habits(self) -> list[Habit]:
         """
@@ -178,18 +593,66 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             A list of all Habit objects in the data storage.
         """
-        habits = []
-        for habit_data in self.data['habits'].values():
-            creation_time = datetime.fromisoformat(habit_data["creation_time"])
-            habits.append(
-                Habit(
-                    name=habit_data["name"],
-                    task_description=habit_data["task_description"],
-                    period=habit_data["period"],
-                    creation_time=creation_time,
-                )
-            )
-        return habits
+        self.__refresh()
+        return [
+            habit_from_json(habit_data) for habit_data in self.data['habits'].values()
+        ]
+
+    def iter_habits(self) -> Iterator[Habit]:
+        """
+        Iterate over all habits in the data storage, deserializing one habit at a time.
+        Returns:
+            An iterator over all Habit objects in the data storage.
+        """
+        self.__refresh()
+        for habit_name in list(self.data['habits']):
+            habit = self.get_habit(habit_name)
+            if habit is not None:
+                yield habit
+
+    def iter_habit_names(self) -> Iterator[str]:
+        """
+        Iterate over the names of all habits in the data storage, without deserializing the habits.
+        Returns:
+            An iterator over the names of all habits in the data storage.
+        """
+        self.__refresh()
+        yield from list(self.data['habits'])
+
+    def search_habits(self, query: str, limit: int = 9) -> list[str]:
+        """
+        Search for habits by their name and task description. See HabitSearchIndex for how matches are ranked.
+        The search index is built when the data is loaded and kept up to date by all later changes to the habits.
+        Args:
+            query: The text to search for.
+            limit: The maximum number of results.
+
+        Returns:
+            The names of the matching habits, best match first.
+        """
+        self.__refresh()
+        return self.__search_index.search(query, limit)
+
+    def insert_habits(self, habits: list[Habit]) -> list[bool]:
+        """
+        Insert multiple new habits into the data storage, writing the file only once.
+        Args:
+            habits: The Habit objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per habit, True if that habit was successfully inserted, False otherwise.
+        """
+        with self.__write_lock():
+            results = []
+            for habit in habits:
+                if habit.name in self.data['habits']:
+                    results.append(False)
+                else:
+                    self.__set_record('habits', habit.name, habit)
+                    results.append(True)
+            if any(results):
+                self.__save_json()
+            return results
 
     def insert_user_habit(self, user_habit: UserHabit) -> bool:
         """
@@ -200,11 +663,12 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             True if the UserHabit object was successfully inserted, False otherwise.
         """
-        if user_habit.userhabit_id in self.data['user_habits']:
-            return False
-        self.data['user_habits'][user_habit.userhabit_id] = user_habit.json()
-        self.__save_json()
-        return True
+        with self.__write_lock():
+            if user_habit.userhabit_id in self.data['user_habits']:
+                return False
+            self.__set_record('user_habits', user_habit.userhabit_id, user_habit)
+            self.__save_json()
+            return True
 
     def update_user_habit(self, user_habit: UserHabit) -> bool:
         """
@@ -215,11 +679,14 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             True if the UserHabit object was successfully updated, False otherwise.
         """
-        if user_habit.userhabit_id not in self.data['user_habits']:
-            return False
-        self.data['user_habits'][user_habit.userhabit_id] = user_habit.json()
-        self.__save_json()
-        return True
+        with self.__write_lock():
+            if user_habit.userhabit_id not in self.data['user_habits']:
+                return False
+            if self.__is_unchanged(user_habit):
+                return True
+            self.__set_record('user_habits', user_habit.userhabit_id, user_habit)
+            self.__save_json()
+            return True
 
     def delete_user_habit(self, user_habit: UserHabit) -> bool:
         """
@@ -230,11 +697,12 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             True if the UserHabit object was successfully deleted, False otherwise.
         """
-        if user_habit.userhabit_id not in self.data['user_habits']:
-            return False
-        del self.data['user_habits'][user_habit.userhabit_id]
-        self.__save_json()
-        return True
+        with self.__write_lock():
+            if user_habit.userhabit_id not in self.data['user_habits']:
+                return False
+            self.__delete_record('user_habits', user_habit.userhabit_id)
+            self.__save_json()
+            return True
 
     def get_user_habit(self, user_habit_id: str) -> UserHabit | None:
         """
@@ -245,21 +713,7 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             The UserHabit object corresponding to the provided ID, or None if the UserHabit object does not exist.
         """
-        if user_habit_id not in self.data['user_habits']:
-            return None
-        user_habit_data = self.data['user_habits'][user_habit_id]
-        habit = self.get_habit(user_habit_data["habit"])
-        completion_times = [
-            datetime.fromisoformat(completion_time)
-            for completion_time in user_habit_data["completion_times"]
-        ]
-        creation_time = datetime.fromisoformat(user_habit_data["creation_time"])
-        return UserHabit(
-            userhabit_id=user_habit_data["userhabit_id"],
-            habit=habit,
-            completion_times=completion_times,
-            creation_time=creation_time,
-        )
+        return self.get_user_habits([user_habit_id])[0]
 
     def get_all_user_habits(self) -> list[UserHabit]:
         """
@@ -267,20 +721,195 @@ class JsonStorageInterface(StorageInterface):
         Returns:
             A list of all UserHabit objects in the data storage.
         """
+        self.__refresh()
+        return self.get_user_habits(list(self.data['user_habits']))
+
+    def iter_user_habits(self) -> Iterator[UserHabit]:
+        """
+        Iterate over all UserHabit objects in the data storage, deserializing one UserHabit at a time.
+        Returns:
+            An iterator over all UserHabit objects in the data storage.
+        """
+        self.__refresh()
+        for user_habit_id in list(self.data['user_habits']):
+            user_habit = self.get_user_habit(user_habit_id)
+            if user_habit is not None:
+                yield user_habit
+
+    def get_user_habits(self, userhabit_ids: list[str]) -> list[UserHabit | None]:
+        """
+        Retrieve multiple UserHabit objects from the data storage by their IDs.
+        Habits shared between the UserHabit objects are only deserialized once.
+        Args:
+            userhabit_ids: The IDs of the UserHabit objects to retrieve.
+
+        Returns:
+            A list with one entry per ID, containing the corresponding UserHabit object, or None if it does not exist.
+        """
+        self.__refresh()
+        habits = {}
         user_habits = []
-        for user_habit_data in self.data['user_habits'].values():
-            habit = self.get_habit(user_habit_data["habit"])
-            completion_times = [
-                datetime.fromisoformat(completion_time)
-                for completion_time in user_habit_data["completion_times"]
-            ]
-            creation_time = datetime.fromisoformat(user_habit_data["creation_time"])
-            user_habits.append(
-                UserHabit(
-                    userhabit_id=user_habit_data["userhabit_id"],
-                    habit=habit,
-                    completion_times=completion_times,
-                    creation_time=creation_time,
-                )
-            )
+        for user_habit_id in userhabit_ids:
+            if user_habit_id not in self.data['user_habits']:
+                user_habits.append(None)
+                continue
+            user_habit_data = self.data['user_habits'][user_habit_id]
+            habit_name = user_habit_data["habit"]
+            if habit_name not in habits:
+                habits[habit_name] = self.get_habit(habit_name)
+            user_habit = user_habit_from_json(user_habit_data, habits[habit_name])
+            # The new object matches the stored record, so updating it unchanged is a no-op
+            self.__record_versions[user_habit.userhabit_id] = user_habit.version
+            user_habits.append(user_habit)
         return user_habits
+
+    def insert_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Insert multiple new UserHabit objects into the data storage, writing the file only once.
+        Args:
+            user_habits: The UserHabit objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per UserHabit, True if that UserHabit was successfully inserted, False otherwise.
+        """
+        with self.__write_lock():
+            results = []
+            for user_habit in user_habits:
+                if user_habit.userhabit_id in self.data['user_habits']:
+                    results.append(False)
+                else:
+                    self.__set_record(
+                        'user_habits', user_habit.userhabit_id, user_habit
+                    )
+                    results.append(True)
+            if any(results):
+                self.__save_json()
+            return results
+
+    def update_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Update multiple existing UserHabit objects in the data storage, writing the file only once.
+        Args:
+            user_habits: The UserHabit objects to update in the data storage.
+
+        Returns:
+            A list with one entry per UserHabit, True if that UserHabit was successfully updated, False otherwise.
+        """
+        with self.__write_lock():
+            results = []
+            changed = False
+            for user_habit in user_habits:
+                if user_habit.userhabit_id not in self.data['user_habits']:
+                    results.append(False)
+                else:
+                    if not self.__is_unchanged(user_habit):
+                        self.__set_record(
+                            'user_habits', user_habit.userhabit_id, user_habit
+                        )
+                        changed = True
+                    results.append(True)
+            if changed:
+                self.__save_json()
+            return results
+
+    def delete_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Delete multiple existing UserHabit objects from the data storage, writing the file only once.
+        Args:
+            user_habits: The UserHabit objects to delete from the data storage.
+
+        Returns:
+            A list with one entry per UserHabit, True if that UserHabit was successfully deleted, False otherwise.
+        """
+        with self.__write_lock():
+            results = []
+            for user_habit in user_habits:
+                if user_habit.userhabit_id not in self.data['user_habits']:
+                    results.append(False)
+                else:
+                    self.__delete_record('user_habits', user_habit.userhabit_id)
+                    results.append(True)
+            if any(results):
+                self.__save_json()
+            return results
+
+    def get_habits_by_period(self, period: str) -> list[Habit]:
+        """
+        Retrieve all habits with a specific period from the data storage, using the period index.
+        Args:
+            period: The period of the habits to retrieve.
+
+        Returns:
+            A list of all Habit objects with the provided period.
+        """
+        self.__refresh()
+        return [
+            self.get_habit(habit_name)
+            for habit_name in self.__habits_by_period.get(period, {})
+        ]
+
+    def get_user_habits_for_habit(self, habit_name: str) -> list[UserHabit]:
+        """
+        Retrieve all UserHabit objects tracking a specific habit from the data storage, using the habit index.
+        Args:
+            habit_name: The name of the habit tracked by the UserHabit objects to retrieve.
+
+        Returns:
+            A list of all UserHabit objects tracking the habit.
+        """
+        self.__refresh()
+        return self.get_user_habits(
+            list(self.__user_habits_by_habit.get(habit_name, {}))
+        )
+
+    def archive_completions(self, cutoff: datetime) -> int:
+        """
+        Move all completions of periods ending at or before the cutoff from the data file into the archive file.
+        The data file keeps a summary of the archived periods for each UserHabit, which analytics merge with the
+        remaining completions, so streaks stay exact while the data file stays small.
+        Args:
+            cutoff: The time up to which completions should be archived.
+
+        Returns:
+            The number of completion times that were moved to the archive file.
+        """
+        with self.__write_lock():
+            archived = {}
+            changed = False
+            for user_habit in self.get_all_user_habits():
+                archived_times = user_habit.archive_completions(cutoff)
+                if len(archived_times) > 0:
+                    archived[user_habit.userhabit_id] = [
+                        completion_time.isoformat()
+                        for completion_time in archived_times
+                    ]
+                if not self.__is_unchanged(user_habit):
+                    self.__set_record(
+                        'user_habits', user_habit.userhabit_id, user_habit
+                    )
+                    changed = True
+            if len(archived) > 0:
+                # The archive is written first, so a failed save never loses completions
+                archive = self.__load_archive()
+                for user_habit_id, completion_times in archived.items():
+                    archive.setdefault(user_habit_id, []).extend(completion_times)
+                self.__write_file(
+                    self.archive_path, json.dumps({"user_habits": archive})
+                )
+            if changed:
+                self.__save_json()
+            return sum(len(completion_times) for completion_times in archived.values())
+
+    def get_archived_completion_times(self, userhabit_id: str) -> list[datetime]:
+        """
+        Retrieve the completion times of a UserHabit that were moved to the archive file.
+        Args:
+            userhabit_id: The ID of the UserHabit.
+
+        Returns:
+            The archived completion times, or an empty list if no completions of the UserHabit were archived.
+        """
+        return [
+            datetime.fromisoformat(completion_time)
+            for completion_time in self.__load_archive().get(userhabit_id, [])
+        ]
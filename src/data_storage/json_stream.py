@@ -0,0 +1,291 @@
+import gzip
+import json
+import lzma
+import os
+from collections.abc import Iterable, Iterator
+from typing import TextIO
+
+from data_storage.serialization import habit_from_json
+from habit_tracking.users import User
+
+# The sections of a JSON storage file holding each record type, in dependency order
+RECORD_SECTIONS = {"habit": "habits", "user_habit": "user_habits", "user": "users"}
+
+
+class JsonStreamReader:
+    """
+    An incremental reader for the JSON storage files written by JsonStorageInterface, which yields the records of a
+    section one at a time instead of parsing the whole file.
+
+    Only the structure of the file, an object of sections which are objects of records, is parsed by the reader
+    itself. Each record is decoded with json.JSONDecoder.raw_decode once it is completely buffered, so the memory used
+    is bounded by the size of the largest record rather than the size of the file.
+    """
+
+    def __init__(self, fp: TextIO, chunk_size: int = 1 << 16):
+        """
+        Args:
+            fp: The text file to read from.
+            chunk_size: The number of characters to read from the file at a time.
+        """
+        assert chunk_size > 0, "Chunk size must be positive."
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.__decoder = json.JSONDecoder()
+        self.__buffer = ""
+        self.__position = 0
+        self.__eof = False
+
+    def __fill(self) -> bool:
+        """
+        Read the next chunk of the file into the buffer, dropping the part of the buffer that was already parsed.
+        Returns:
+            True if more data was read, False at the end of the file.
+        """
+        if self.__eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if chunk == "":
+            self.__eof = True
+            return False
+        self.__buffer = self.__buffer[self.__position :] + chunk
+        self.__position = 0
+        return True
+
+    def __peek(self) -> str:
+        """
+        Skip whitespace and get the next character without consuming it.
+        Returns:
+            The next character, or an empty string at the end of the file.
+        """
+        while True:
+            while self.__position < len(self.__buffer):
+                if not self.__buffer[self.__position].isspace():
+                    return self.__buffer[self.__position]
+                self.__position += 1
+            if not self.__fill():
+                return ""
+
+    def __expect(self, character: str):
+        """
+        Skip whitespace and consume the next character, which must be the given one.
+        Args:
+            character: The expected character.
+
+        Returns:
+            None
+        """
+        found = self.__peek()
+        if found != character:
+            raise ValueError(f"Expected {character!r} but found {found!r}.")
+        self.__position += 1
+
+    def __read_value(self):
+        """
+        Skip whitespace and decode the next JSON value, reading more of the file until it is completely buffered.
+        Returns:
+            The decoded value.
+        """
+        self.__peek()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__position)
+            except json.JSONDecodeError:
+                if self.__fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.__buffer) and self.__fill():
+                continue
+            self.__position = end
+            return value
+
+    def __iter_keys(self) -> Iterator[str]:
+        """
+        Consume an object up to each of its values, yielding the keys. The caller must consume each value before
+        requesting the next key.
+        Returns:
+            An iterator over the keys of the object.
+        """
+        self.__expect("{")
+        if self.__peek() == "}":
+            self.__position += 1
+            return
+        while True:
+            key = self.__read_value()
+            if not isinstance(key, str):
+                raise ValueError("Object keys must be strings.")
+            self.__expect(":")
+            yield key
+            match self.__peek():
+                case ",":
+                    self.__position += 1
+                case "}":
+                    self.__position += 1
+                    return
+                case found:
+                    raise ValueError(f"Expected ',' or '}}' but found {found!r}.")
+
+    def iter_section(self, section: str) -> Iterator[tuple[str, dict]]:
+        """
+        Stream the records of a section of the file. The reader must be at the start of the file, and is at an
+        unspecified position afterwards.
+        Args:
+            section: The section to read ("users", "habits" or "user_habits").
+
+        Returns:
+            An iterator over (primary key, record) tuples, or an empty iterator if the file has no such section.
+        """
+        for key in self.__iter_keys():
+            if key != section:
+                # Other sections are skipped one record at a time, so they are never completely in memory either
+                if self.__peek() == "{":
+                    for _ in self.__iter_keys():
+                        self.__read_value()
+                else:
+                    self.__read_value()
+                continue
+            for record_key in self.__iter_keys():
+                yield record_key, self.__read_value()
+            return
+
+
+def open_store_file(file_path: str, mode: str, compression_level: int = 6) -> TextIO:
+    """
+    Open a JSON storage file in text mode, compressing or decompressing it according to its extension, like
+    JsonStorageInterface does.
+    Args:
+        file_path: The path of the file, ending in ".json", ".json.gz" or ".json.xz".
+        mode: The mode to open the file in ("r" or "w").
+        compression_level: The compression level (0-9) to use when writing compressed files.
+
+    Returns:
+        The opened file object.
+    """
+    if file_path.endswith('.gz'):
+        return gzip.open(file_path, mode + 't', compresslevel=compression_level)
+    elif file_path.endswith('.xz'):
+        if mode == 'w':
+            return lzma.open(file_path, 'wt', preset=compression_level)
+        return lzma.open(file_path, 'rt')
+    return open(file_path, mode)
+
+
+def export_store_file(file_path: str) -> Iterator[dict]:
+    """
+    Stream all records of a JSON storage file, without loading the file into memory. The file is read once per record
+    type, so the records can be exported in dependency order no matter how the sections are ordered in the file.
+    Args:
+        file_path: The path of the JSON storage file.
+
+    Returns:
+        An iterator over all records in the format of export_records, with habits first, then user habits, then users.
+    """
+    for record_type, section in RECORD_SECTIONS.items():
+        with open_store_file(file_path, 'r') as fp:
+            for _, record in JsonStreamReader(fp).iter_section(section):
+                yield {"type": record_type, "data": record}
+
+
+def write_store_file(
+    records: Iterable[dict], file_path: str, compression_level: int = 6
+) -> dict[str, dict[str, int]]:
+    """
+    Write records to a new JSON storage file one at a time, without building the data in memory. Only the primary keys
+    of the written records are kept, to skip duplicates and references to records that were not written.
+    The records must be in dependency order, as produced by export_records or export_store_file, otherwise a
+    ValueError is raised. Like in
+    import_records, duplicate records and user habits referencing an unknown habit are skipped, and users only keep
+    their references to written user habits. The file is written to a temporary file first and only replaces the
+    target once all records are written.
+    Args:
+        records: The records to write.
+        file_path: The path of the JSON storage file to create.
+        compression_level: The compression level (0-9) to use for compressed files.
+
+    Returns:
+        A dictionary mapping each record type to the number of "inserted" and "skipped" records.
+    """
+    assert file_path.endswith(
+        ('.json', '.json.gz', '.json.xz')
+    ), "File path must be a JSON file."
+    record_types = list(RECORD_SECTIONS)
+    stats = {record_type: {"inserted": 0, "skipped": 0} for record_type in record_types}
+    keys = {record_type: set() for record_type in record_types}
+    save_dir = os.path.dirname(file_path)
+    if save_dir != "":
+        os.makedirs(save_dir, exist_ok=True)
+    # The temporary file keeps the extension, so it is compressed the same way
+    temp_path = f"{file_path}.{os.getpid()}.tmp{file_path[file_path.rindex('.json'):]}"
+    try:
+        with open_store_file(temp_path, 'w', compression_level) as fp:
+            fp.write("{")
+            section_index = -1
+            section_empty = True
+            for record in records:
+                record_index = record_types.index(record["type"])
+                if record_index < section_index:
+                    raise ValueError(
+                        f"Record of type {record['type']} after a record of type "
+                        f"{record_types[section_index]}, records must be in dependency order."
+                    )
+                while section_index < record_index:
+                    if section_index >= 0:
+                        fp.write("}, ")
+                    section_index += 1
+                    fp.write(
+                        f"{json.dumps(RECORD_SECTIONS[record_types[section_index]])}: {{"
+                    )
+                    section_empty = True
+                data = record["data"]
+                match record["type"]:
+                    case "habit":
+                        obj = habit_from_json(data)
+                        key = obj.name
+                    case "user_habit":
+                        obj = None
+                        key = data["userhabit_id"]
+                        if data["habit"] not in keys["habit"]:
+                            # A UserHabit can't be stored without the habit it tracks
+                            stats["user_habit"]["skipped"] += 1
+                            continue
+                    case "user":
+                        obj = None
+                        key = data["username"]
+                if key in keys[record["type"]]:
+                    stats[record["type"]]["skipped"] += 1
+                    continue
+                match record["type"]:
+                    case "habit":
+                        record_json = obj.json()
+                    case "user_habit":
+                        # Completion times are written as they are, without decoding them
+                        record_json = data
+                    case "user":
+                        record_json = User(username=key).json()
+                        record_json["habits"] = [
+                            userhabit_id
+                            for userhabit_id in data["habits"]
+                            if userhabit_id in keys["user_habit"]
+                        ]
+                keys[record["type"]].add(key)
+                stats[record["type"]]["inserted"] += 1
+                if not section_empty:
+                    fp.write(", ")
+                fp.write(f"{json.dumps(key)}: {json.dumps(record_json)}")
+                section_empty = False
+            # Sections without records are written as well, so the file always has all of them
+            while section_index < len(record_types) - 1:
+                if section_index >= 0:
+                    fp.write("}, ")
+                section_index += 1
+                fp.write(
+                    f"{json.dumps(RECORD_SECTIONS[record_types[section_index]])}: {{"
+                )
+            fp.write("}}")
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return stats
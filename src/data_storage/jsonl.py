@@ -0,0 +1,145 @@
+import json
+from collections.abc import Iterable, Iterator
+from typing import TextIO
+
+from data_storage.interface import StorageInterface
+from data_storage.serialization import habit_from_json, user_habit_from_json
+from habit_tracking.habits import Habit
+from habit_tracking.users import User
+
+# Records are exported in dependency order, so that every record only references records that precede it.
+RECORD_TYPES = ("habit", "user_habit", "user")
+
+
+def export_records(storage: StorageInterface) -> Iterator[dict]:
+    """
+    Stream all records of a data storage as JSON compatible dictionaries.
+    Each record has the form {"type": <record type>, "data": <json of the object>}.
+    The records are streamed from the storage, so memory use depends on the storage: a JsonStorageInterface holds all
+    of its data in memory anyway. Use json_stream.export_store_file to export a JSON storage file without loading it.
+    Args:
+        storage: The data storage to export.
+
+    Returns:
+        An iterator over all records, with habits first, then user habits, then users.
+    """
+    for habit in storage.iter_habits():
+        yield {"type": "habit", "data": habit.json()}
+    for user_habit in storage.iter_user_habits():
+        yield {"type": "user_habit", "data": user_habit.json()}
+    for user in storage.iter_users():
+        yield {"type": "user", "data": user.json()}
+
+
+def write_jsonl(records: Iterable[dict], fp: TextIO) -> int:
+    """
+    Write records to a file as JSON Lines, one record per line.
+    Args:
+        records: The records to write.
+        fp: The text file to write to.
+
+    Returns:
+        The number of records written.
+    """
+    count = 0
+    for record in records:
+        fp.write(json.dumps(record))
+        fp.write("\n")
+        count += 1
+    return count
+
+
+def read_jsonl(fp: TextIO) -> Iterator[dict]:
+    """
+    Stream records from a JSON Lines file. Empty lines are skipped.
+    Args:
+        fp: The text file to read from.
+
+    Returns:
+        An iterator over the records in the file.
+    """
+    for line_number, line in enumerate(fp, start=1):
+        line = line.strip()
+        if line == "":
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}") from e
+        if record.get("type") not in RECORD_TYPES or "data" not in record:
+            raise ValueError(f"Invalid record on line {line_number}.")
+        yield record
+
+
+def import_records(
+    storage: StorageInterface, records: Iterable[dict], batch_size: int = 1000
+) -> dict[str, dict[str, int]]:
+    """
+    Import records into a data storage in batches.
+    Consecutive records of the same type are collected and inserted with a single bulk insert call once the batch is
+    full or the record type changes. Records that already exist in the data storage, and user habits referencing an
+    unknown habit, are skipped.
+    Each bulk insert is a write of the storage, so for a JsonStorageInterface the whole file is rewritten once per
+    batch, and all of its data is held in memory. Use json_stream.write_store_file to create a new JSON storage file
+    from records in constant memory instead.
+    Args:
+        storage: The data storage to import into.
+        records: The records to import, as produced by export_records or read_jsonl.
+        batch_size: The maximum number of records to insert with a single bulk insert call.
+
+    Returns:
+        A dictionary mapping each record type to the number of "inserted" and "skipped" records.
+    """
+    assert batch_size > 0, "Batch size must be positive."
+    stats = {record_type: {"inserted": 0, "skipped": 0} for record_type in RECORD_TYPES}
+    habits = {}
+    batch_type = None
+    batch = []
+
+    def flush():
+        if len(batch) == 0:
+            return
+        match batch_type:
+            case "habit":
+                results = storage.insert_habits(batch)
+            case "user_habit":
+                results = storage.insert_user_habits(batch)
+            case "user":
+                results = storage.insert_users(batch)
+        inserted = sum(results)
+        stats[batch_type]["inserted"] += inserted
+        stats[batch_type]["skipped"] += len(results) - inserted
+        batch.clear()
+
+    def get_habit(habit_name: str) -> Habit | None:
+        if habit_name not in habits:
+            habits[habit_name] = storage.get_habit(habit_name)
+        return habits[habit_name]
+
+    for record in records:
+        if record["type"] != batch_type or len(batch) >= batch_size:
+            flush()
+            batch_type = record["type"]
+        data = record["data"]
+        match batch_type:
+            case "habit":
+                habit = habit_from_json(data)
+                habits[habit.name] = habit
+                batch.append(habit)
+            case "user_habit":
+                habit = get_habit(data["habit"])
+                if habit is None:
+                    # A UserHabit can't be stored without the habit it tracks
+                    stats["user_habit"]["skipped"] += 1
+                    continue
+                batch.append(user_habit_from_json(data, habit))
+            case "user":
+                user_habits = storage.get_user_habits(data["habits"])
+                batch.append(
+                    User(
+                        username=data["username"],
+                        habits=[uh for uh in user_habits if uh is not None],
+                    )
+                )
+    flush()
+    return stats
@@ -0,0 +1,164 @@
+import threading
+import time
+from collections.abc import Callable, Iterator
+
+from data_storage.interface import StorageInterface
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+
+class LazyStorage(StorageInterface):
+    """
+    A data storage interface that defers creating another data storage, e.g. parsing a large JSON file, until it is
+    needed.
+
+    The wrapped storage is created in a background thread right away, so it is usually ready by the time the first
+    operation is made, without delaying anything before that. Operations made while the storage is still being created
+    wait until it is ready. Methods specific to the wrapped storage (e.g. JsonStorageInterface.snapshot) are available
+    as well.
+    """
+
+    def __init__(self, factory: Callable[[], StorageInterface], preload: bool = True):
+        """
+        Args:
+            factory: A function creating the wrapped data storage.
+            preload: Whether to create the wrapped storage in a background thread right away. Otherwise, it is created
+                on the first operation.
+        """
+        self.factory = factory
+        # The time in seconds it took to create the wrapped storage, or None if it has not been created yet
+        self.load_time = None
+        self.__storage = None
+        self.__error = None
+        self.__lock = threading.Lock()
+        if preload:
+            threading.Thread(target=self.__load, daemon=True).start()
+
+    def __load(self):
+        """
+        Create the wrapped storage, unless it has already been created.
+        Returns:
+            None
+        """
+        with self.__lock:
+            if self.__storage is not None or self.__error is not None:
+                return
+            start_time = time.perf_counter()
+            try:
+                self.__storage = self.factory()
+            except BaseException as e:
+                # Reported to the first operation instead of the background thread
+                self.__error = e
+            self.load_time = time.perf_counter() - start_time
+
+    @property
+    def loaded(self) -> bool:
+        """
+        Whether the wrapped storage has been created.
+        Returns:
+            True if the wrapped storage is ready, False otherwise.
+        """
+        return self.__storage is not None
+
+    @property
+    def storage(self) -> StorageInterface:
+        """
+        The wrapped storage, waiting for it to be created if needed.
+        Returns:
+            The wrapped data storage.
+        """
+        if self.__storage is None:
+            self.__load()
+        if self.__error is not None:
+            raise self.__error
+        return self.__storage
+
+    def __getattr__(self, name: str):
+        # Only called for attributes which are not defined by this class
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.storage, name)
+
+    def insert_user(self, user: User) -> bool:
+        return self.storage.insert_user(user)
+
+    def update_user(self, user: User) -> bool:
+        return self.storage.update_user(user)
+
+    def delete_user(self, user: User) -> bool:
+        return self.storage.delete_user(user)
+
+    def get_user(self, username: str) -> User | None:
+        return self.storage.get_user(username)
+
+    def get_all_users(self) -> list[User]:
+        return self.storage.get_all_users()
+
+    def insert_habit(self, habit: Habit) -> bool:
+        return self.storage.insert_habit(habit)
+
+    def update_habit(self, habit: Habit) -> bool:
+        return self.storage.update_habit(habit)
+
+    def delete_habit(self, habit: Habit, cascade: bool = False) -> bool:
+        return self.storage.delete_habit(habit, cascade)
+
+    def get_habit(self, name: str) -> Habit | None:
+        return self.storage.get_habit(name)
+
+    def get_all_habits(self) -> list[Habit]:
+        return self.storage.get_all_habits()
+
+    def insert_user_habit(self, user_habit: UserHabit) -> bool:
+        return self.storage.insert_user_habit(user_habit)
+
+    def update_user_habit(self, user_habit: UserHabit) -> bool:
+        return self.storage.update_user_habit(user_habit)
+
+    def delete_user_habit(self, user_habit: UserHabit) -> bool:
+        return self.storage.delete_user_habit(user_habit)
+
+    def get_user_habit(self, userhabit_id: str) -> UserHabit | None:
+        return self.storage.get_user_habit(userhabit_id)
+
+    def get_all_user_habits(self) -> list[UserHabit]:
+        return self.storage.get_all_user_habits()
+
+    def iter_users(self) -> Iterator[User]:
+        return self.storage.iter_users()
+
+    def iter_habits(self) -> Iterator[Habit]:
+        return self.storage.iter_habits()
+
+    def iter_habit_names(self) -> Iterator[str]:
+        return self.storage.iter_habit_names()
+
+    def search_habits(self, query: str, limit: int = 9) -> list[str]:
+        return self.storage.search_habits(query, limit)
+
+    def iter_user_habits(self) -> Iterator[UserHabit]:
+        return self.storage.iter_user_habits()
+
+    def get_habits_by_period(self, period: str) -> list[Habit]:
+        return self.storage.get_habits_by_period(period)
+
+    def get_user_habits_for_habit(self, habit_name: str) -> list[UserHabit]:
+        return self.storage.get_user_habits_for_habit(habit_name)
+
+    def insert_users(self, users: list[User]) -> list[bool]:
+        return self.storage.insert_users(users)
+
+    def insert_habits(self, habits: list[Habit]) -> list[bool]:
+        return self.storage.insert_habits(habits)
+
+    def get_user_habits(self, userhabit_ids: list[str]) -> list[UserHabit | None]:
+        return self.storage.get_user_habits(userhabit_ids)
+
+    def insert_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        return self.storage.insert_user_habits(user_habits)
+
+    def update_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        return self.storage.update_user_habits(user_habits)
+
+    def delete_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        return self.storage.delete_user_habits(user_habits)
@@ -0,0 +1,342 @@
+from collections.abc import Iterator
+
+from data_storage.interface import StorageInterface
+from data_storage.serialization import habit_from_json, user_habit_from_json
+from data_storage.snapshot import JsonStorageSnapshot
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+
+class MemoryStorageInterface(StorageInterface):
+    """
+    A data storage interface that keeps all data in memory, without touching the filesystem.
+
+    Records are stored in the same json format as in JsonStorageInterface, so objects behave the same way: changes to
+    an object only reach the data storage when it is inserted or updated. With the identity map enabled, retrieving the
+    same record multiple times returns the same object instead of a fresh one, which avoids repeated deserialization.
+    """
+
+    def __init__(self, data: dict = None, identity_map: bool = False):
+        """
+        Args:
+            data: The initial data, in the format of the JSON files used by JsonStorageInterface. Defaults to an empty
+                data storage. The dictionary is copied, so later changes to it don't affect the data storage.
+            identity_map: Whether to return the same object whenever the same record is retrieved, instead of
+                deserializing a fresh object.
+        """
+        self.identity_map = identity_map
+        if data is None:
+            data = {"users": {}, "habits": {}, "user_habits": {}}
+        self.data = {section: dict(records) for section, records in data.items()}
+        self.__objects = {section: {} for section in self.data}
+
+    def snapshot(self) -> JsonStorageSnapshot:
+        """
+        Take an immutable point-in-time view of the data, which can be used to restore the data later on.
+        Stored records are never modified in place, so this only copies references to them.
+        Returns:
+            The snapshot of the current data.
+        """
+        return JsonStorageSnapshot(
+            {section: dict(records) for section, records in self.data.items()}
+        )
+
+    def restore(self, snapshot: JsonStorageSnapshot):
+        """
+        Reset the data to the state of a snapshot. The identity map is cleared.
+        Args:
+            snapshot: The snapshot to restore, as returned by snapshot().
+
+        Returns:
+            None
+        """
+        self.data = {
+            section: dict(records.items()) for section, records in snapshot.data.items()
+        }
+        self.__objects = {section: {} for section in self.data}
+
+    def __set_record(self, section: str, key: str, obj: User | Habit | UserHabit):
+        """
+        Store the json of an object in a section of the data, and register the object in the identity map.
+        Args:
+            section: The section of the data to store the object in ("users", "habits" or "user_habits").
+            key: The primary key of the object.
+            obj: The object to store.
+
+        Returns:
+            None
+        """
+        self.data[section][key] = obj.json()
+        if self.identity_map:
+            self.__objects[section][key] = obj
+
+    def __delete_record(self, section: str, key: str):
+        """
+        Delete a record from a section of the data, together with its entry in the identity map.
+        Args:
+            section: The section of the data to delete the record from ("users", "habits" or "user_habits").
+            key: The primary key of the record.
+
+        Returns:
+            None
+        """
+        del self.data[section][key]
+        self.__objects[section].pop(key, None)
+
+    def insert_user(self, user: User) -> bool:
+        """
+        Insert a new user into the data storage.
+        Args:
+            user: The User object to insert into the data storage.
+
+        Returns:
+            True if the user was successfully inserted, False otherwise.
+        """
+        if user.username in self.data['users']:
+            return False
+        self.__set_record('users', user.username, user)
+        return True
+
+    def update_user(self, user: User) -> bool:
+        """
+        Update an existing user in the data storage.
+        Args:
+            user: The User object to update in the data storage.
+
+        Returns:
+            True if the user was successfully updated, False otherwise.
+        """
+        if user.username not in self.data['users']:
+            return False
+        self.__set_record('users', user.username, user)
+        return True
+
+    def delete_user(self, user: User) -> bool:
+        """
+        Delete an existing user from the data storage.
+        Args:
+            user: The User object to delete from the data storage.
+
+        Returns:
+            True if the user was successfully deleted, False otherwise.
+        """
+        if user.username not in self.data['users']:
+            return False
+        self.__delete_record('users', user.username)
+        return True
+
+    def get_user(self, username: str) -> User | None:
+        """
+        Retrieve a user from the data storage by their username.
+        Args:
+            username: The username of the user to retrieve.
+
+        Returns:
+            The User object corresponding to the provided username, or None if the user does not exist.
+        """
+        if username not in self.data['users']:
+            return None
+        if username in self.__objects['users']:
+            return self.__objects['users'][username]
+        user_data = self.data['users'][username]
+        initialised_user_habits = [
+            user_habit
+            for user_habit in self.get_user_habits(user_data['habits'])
+            if user_habit is not None
+        ]
+        user = User(username=user_data["username"], habits=initialised_user_habits)
+        if self.identity_map:
+            self.__objects['users'][username] = user
+        return user
+
+    def get_all_users(self) -> list[User]:
+        """
+        Retrieve all users from the data storage.
+        Returns:
+            A list of all User objects in the data storage.
+        """
+        return [self.get_user(username) for username in list(self.data['users'])]
+
+    def insert_habit(self, habit: Habit) -> bool:
+        """
+        Insert a new habit into the data storage.
+        Args:
+            habit: The Habit object to insert into the data storage.
+
+        Returns:
+            True if the habit was successfully inserted, False otherwise.
+        """
+        if habit.name in self.data['habits']:
+            return False
+        self.__set_record('habits', habit.name, habit)
+        return True
+
+    def update_habit(self, habit: Habit) -> bool:
+        """
+        Update an existing habit in the data storage.
+        Args:
+            habit: The Habit object to update in the data storage.
+
+        Returns:
+            True if the habit was successfully updated, False otherwise.
+        """
+        if habit.name not in self.data['habits']:
+            return False
+        self.__set_record('habits', habit.name, habit)
+        return True
+
+    def delete_habit(self, habit: Habit, cascade: bool = False) -> bool:
+        """
+        Delete an existing habit from the data storage.
+        Args:
+            habit: The Habit object to delete from the data storage.
+            cascade: Whether to also delete all UserHabit objects tracking the habit, and remove them from the users
+                tracking them.
+
+        Returns:
+            True if the habit was successfully deleted, False otherwise.
+        """
+        if habit.name not in self.data['habits']:
+            return False
+        if cascade:
+            deleted_ids = {
+                user_habit_id
+                for user_habit_id, user_habit_data in self.data['user_habits'].items()
+                if user_habit_data['habit'] == habit.name
+            }
+            for user in self.get_all_users():
+                if any(uh.userhabit_id in deleted_ids for uh in user.habits):
+                    user.habits = [
+                        user_habit
+                        for user_habit in user.habits
+                        if user_habit.userhabit_id not in deleted_ids
+                    ]
+                    self.__set_record('users', user.username, user)
+            for user_habit_id in deleted_ids:
+                self.__delete_record('user_habits', user_habit_id)
+        self.__delete_record('habits', habit.name)
+        return True
+
+    def get_habit(self, name: str) -> Habit | None:
+        """
+        Retrieve a habit from the data storage by its name.
+        Args:
+            name: The name of the habit to retrieve.
+
+        Returns:
+            The Habit object corresponding to the provided name, or None if the habit does not exist.
+        """
+        if name not in self.data['habits']:
+            return None
+        if name in self.__objects['habits']:
+            return self.__objects['habits'][name]
+        habit = habit_from_json(self.data['habits'][name])
+        if self.identity_map:
+            self.__objects['habits'][name] = habit
+        return habit
+
+    def get_all_habits(self) -> list[Habit]:
+        """
+        Retrieve all habits from the data storage.
+        Returns:
+            A list of all Habit objects in the data storage.
+        """
+        return [self.get_habit(habit_name) for habit_name in list(self.data['habits'])]
+
+    def iter_habit_names(self) -> Iterator[str]:
+        """
+        Iterate over the names of all habits in the data storage, without deserializing the habits.
+        Returns:
+            An iterator over the names of all habits in the data storage.
+        """
+        yield from list(self.data['habits'])
+
+    def insert_user_habit(self, user_habit: UserHabit) -> bool:
+        """
+        Insert a new UserHabit object into the data storage.
+        Args:
+            user_habit: The UserHabit object to insert into the data storage.
+
+        Returns:
+            True if the UserHabit object was successfully inserted, False otherwise.
+        """
+        if user_habit.userhabit_id in self.data['user_habits']:
+            return False
+        self.__set_record('user_habits', user_habit.userhabit_id, user_habit)
+        return True
+
+    def update_user_habit(self, user_habit: UserHabit) -> bool:
+        """
+        Update an existing UserHabit object in the data storage.
+        Args:
+            user_habit: The UserHabit object to update in the data storage.
+
+        Returns:
+            True if the UserHabit object was successfully updated, False otherwise.
+        """
+        if user_habit.userhabit_id not in self.data['user_habits']:
+            return False
+        self.__set_record('user_habits', user_habit.userhabit_id, user_habit)
+        return True
+
+    def delete_user_habit(self, user_habit: UserHabit) -> bool:
+        """
+        Delete an existing UserHabit object from the data storage.
+        Args:
+            user_habit: The UserHabit object to delete from the data storage.
+
+        Returns:
+            True if the UserHabit object was successfully deleted, False otherwise.
+        """
+        if user_habit.userhabit_id not in self.data['user_habits']:
+            return False
+        self.__delete_record('user_habits', user_habit.userhabit_id)
+        return True
+
+    def get_user_habit(self, userhabit_id: str) -> UserHabit | None:
+        """
+        Retrieve a UserHabit object from the data storage by its ID.
+        Args:
+            userhabit_id: The ID of the UserHabit object to retrieve.
+
+        Returns:
+            The UserHabit object corresponding to the provided ID, or None if the UserHabit object does not exist.
+        """
+        return self.get_user_habits([userhabit_id])[0]
+
+    def get_user_habits(self, userhabit_ids: list[str]) -> list[UserHabit | None]:
+        """
+        Retrieve multiple UserHabit objects from the data storage by their IDs.
+        Habits shared between the UserHabit objects are only deserialized once.
+        Args:
+            userhabit_ids: The IDs of the UserHabit objects to retrieve.
+
+        Returns:
+            A list with one entry per ID, containing the corresponding UserHabit object, or None if it does not exist.
+        """
+        habits = {}
+        user_habits = []
+        for userhabit_id in userhabit_ids:
+            if userhabit_id not in self.data['user_habits']:
+                user_habits.append(None)
+                continue
+            if userhabit_id in self.__objects['user_habits']:
+                user_habits.append(self.__objects['user_habits'][userhabit_id])
+                continue
+            user_habit_data = self.data['user_habits'][userhabit_id]
+            habit_name = user_habit_data["habit"]
+            if habit_name not in habits:
+                habits[habit_name] = self.get_habit(habit_name)
+            user_habit = user_habit_from_json(user_habit_data, habits[habit_name])
+            if self.identity_map:
+                self.__objects['user_habits'][userhabit_id] = user_habit
+            user_habits.append(user_habit)
+        return user_habits
+
+    def get_all_user_habits(self) -> list[UserHabit]:
+        """
+        Retrieve all UserHabit objects from the data storage.
+        Returns:
+            A list of all UserHabit objects in the data storage.
+        """
+        return self.get_user_habits(list(self.data['user_habits']))
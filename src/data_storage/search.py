@@ -0,0 +1,318 @@
+import heapq
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+
+
+class HabitSearchIndex:
+    """
+    An in-memory index for searching habits by their name and task description.
+
+    Names starting with the query are found by bisecting a sorted list of names. Other matches are found through an
+    index of the trigrams (three character sequences) of the names and descriptions, which tolerates typos and matches
+    words anywhere in the text. The posting lists of the query trigrams are walked from the rarest one, and the walk
+    stops as soon as the best matches are known, so common trigrams don't make every search score most habits. Habits
+    can be added and removed one at a time, so the index can be kept up to date with
+    the data storage without rebuilding it.
+    """
+
+    def __init__(self):
+        # Sorted (lowercase name, name) pairs, for prefix search
+        self.__sorted_names = []
+        # Trigram -> names of the habits containing it, separately for names and descriptions
+        self.__name_trigrams = defaultdict(set)
+        self.__description_trigrams = defaultdict(set)
+        # Name -> (lowercase name, name trigrams, description trigrams), for removal
+        self.__entries = {}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize a text for searching, by lowercasing it and collapsing whitespace.
+        Args:
+            text: The text to normalize.
+
+        Returns:
+            The normalized text.
+        """
+        return " ".join(text.lower().split())
+
+    @staticmethod
+    def trigrams(text: str) -> set[str]:
+        """
+        Get the trigrams of a normalized text. The text is padded with a leading space, so the trigrams at the start of
+        words are matched by queries starting with the same characters.
+        Args:
+            text: The normalized text.
+
+        Returns:
+            The set of trigrams of the text.
+        """
+        text = f" {text}"
+        return {text[i : i + 3] for i in range(len(text) - 2)}
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.__entries
+
+    def add(self, name: str, task_description: str):
+        """
+        Add a habit to the index, replacing a previous entry for the same habit.
+        Args:
+            name: The name of the habit.
+            task_description: The task description of the habit.
+
+        Returns:
+            None
+        """
+        if name in self.__entries:
+            self.remove(name)
+        lowercase_name = self.normalize(name)
+        name_trigrams = self.trigrams(lowercase_name)
+        description_trigrams = self.trigrams(self.normalize(task_description))
+        self.__entries[name] = (lowercase_name, name_trigrams, description_trigrams)
+        insort(self.__sorted_names, (lowercase_name, name))
+        for trigram in name_trigrams:
+            self.__name_trigrams[trigram].add(name)
+        for trigram in description_trigrams:
+            self.__description_trigrams[trigram].add(name)
+
+    def add_all(self, habits: Iterable[tuple[str, str]]):
+        """
+        Add many habits to the index at once, which is faster than adding them one at a time, since the sorted names
+        are only sorted once.
+        Args:
+            habits: (name, task description) tuples of the habits to add.
+
+        Returns:
+            None
+        """
+        name_trigrams_index = self.__name_trigrams
+        description_trigrams_index = self.__description_trigrams
+        new_names = []
+        for name, task_description in habits:
+            if name in self.__entries:
+                self.remove(name)
+            lowercase_name = self.normalize(name)
+            name_trigrams = self.trigrams(lowercase_name)
+            description_trigrams = self.trigrams(self.normalize(task_description))
+            self.__entries[name] = (lowercase_name, name_trigrams, description_trigrams)
+            new_names.append((lowercase_name, name))
+            for trigram in name_trigrams:
+                name_trigrams_index[trigram].add(name)
+            for trigram in description_trigrams:
+                description_trigrams_index[trigram].add(name)
+        self.__sorted_names.extend(new_names)
+        self.__sorted_names.sort()
+
+    def remove(self, name: str):
+        """
+        Remove a habit from the index. Does nothing if the habit is not in the index.
+        Args:
+            name: The name of the habit.
+
+        Returns:
+            None
+        """
+        if name not in self.__entries:
+            return
+        lowercase_name, name_trigrams, description_trigrams = self.__entries.pop(name)
+        del self.__sorted_names[
+            bisect_left(self.__sorted_names, (lowercase_name, name))
+        ]
+        for index, trigrams in (
+            (self.__name_trigrams, name_trigrams),
+            (self.__description_trigrams, description_trigrams),
+        ):
+            for trigram in trigrams:
+                index[trigram].discard(name)
+                if len(index[trigram]) == 0:
+                    del index[trigram]
+
+    def search(self, query: str, limit: int = 9) -> list[str]:
+        """
+        Search for habits matching a query.
+        Habits whose name starts with the query are ranked first, in alphabetical order. They are followed by the
+        habits sharing at least half of the trigrams of the query, ranked by the number of trigrams shared with their
+        name and then with their task description.
+        Args:
+            query: The text to search for. Case and repeated whitespace are ignored.
+            limit: The maximum number of results.
+
+        Returns:
+            The names of the matching habits, best match first.
+        """
+        assert limit > 0, "Limit must be positive."
+        query = self.normalize(query)
+        if query == "":
+            return []
+        results = []
+        position = bisect_left(self.__sorted_names, (query,))
+        while position < len(self.__sorted_names) and len(results) < limit:
+            lowercase_name, name = self.__sorted_names[position]
+            if not lowercase_name.startswith(query):
+                break
+            results.append(name)
+            position += 1
+        if len(results) == limit:
+            return results
+        query_trigrams = self.trigrams(query)
+        min_hits = (len(query_trigrams) + 1) // 2
+        # Posting lists are walked from the rarest trigram to the most common one
+        name_postings = sorted(
+            (self.__name_trigrams.get(trigram, set()) for trigram in query_trigrams),
+            key=len,
+        )
+        description_postings = sorted(
+            (
+                self.__description_trigrams.get(trigram, set())
+                for trigram in query_trigrams
+            ),
+            key=len,
+        )
+        results.extend(
+            self.__search_names(
+                name_postings,
+                description_postings,
+                min_hits,
+                limit - len(results),
+                set(results),
+            )
+        )
+        if len(results) < limit:
+            results.extend(
+                self.__search_descriptions(
+                    name_postings,
+                    description_postings,
+                    min_hits,
+                    limit - len(results),
+                    set(results),
+                )
+            )
+        return results
+
+    @staticmethod
+    def __count_hits(candidates: set[str], postings: list[set[str]]) -> Counter:
+        """
+        Count in how many posting lists each candidate occurs.
+        Args:
+            candidates: The names of the candidates.
+            postings: The posting lists.
+
+        Returns:
+            The number of posting lists containing each candidate, for the candidates occurring in any of them.
+        """
+        hits = Counter()
+        for names in postings:
+            hits.update(candidates & names)
+        return hits
+
+    def __search_names(
+        self,
+        name_postings: list[set[str]],
+        description_postings: list[set[str]],
+        min_hits: int,
+        limit: int,
+        excluded: set[str],
+    ) -> list[str]:
+        """
+        Find the best habits sharing at least min_hits trigrams with the query in their name.
+        The name posting lists are walked from the rarest one. Once the first i lists have been walked, a habit which
+        hasn't been seen yet occurs in at most the remaining len(name_postings) - i lists, so the walk stops as soon as
+        limit seen habits are known to rank above every unseen habit, or no unseen habit can reach min_hits anymore.
+        Args:
+            name_postings: The posting lists of the query trigrams in the names, rarest first.
+            description_postings: The posting lists of the query trigrams in the descriptions, rarest first.
+            min_hits: The minimum number of shared trigrams.
+            limit: The maximum number of results.
+            excluded: Names which must not be part of the results.
+
+        Returns:
+            The names of the matching habits, best match first.
+        """
+        seen = set(excluded)
+        name_hits = Counter()
+        # Number of seen habits per number of name hits
+        hit_counts = Counter()
+        for index, names in enumerate(name_postings):
+            unseen_max_hits = len(name_postings) - index
+            if unseen_max_hits < min_hits:
+                break
+            guaranteed = sum(
+                count for hits, count in hit_counts.items() if hits > unseen_max_hits
+            )
+            if guaranteed >= limit:
+                break
+            new_names = names - seen
+            if len(new_names) == 0:
+                continue
+            seen |= new_names
+            new_hits = self.__count_hits(new_names, name_postings[index:])
+            name_hits.update(new_hits)
+            hit_counts.update(new_hits.values())
+        qualified_hits = sorted(
+            (hits for hits in hit_counts.elements() if hits >= min_hits), reverse=True
+        )
+        if len(qualified_hits) == 0:
+            return []
+        # Only habits which can still make it into the results need their description hits
+        cutoff = qualified_hits[min(limit, len(qualified_hits)) - 1]
+        candidates = {name for name, hits in name_hits.items() if hits >= cutoff}
+        description_hits = self.__count_hits(candidates, description_postings)
+        return [
+            name
+            for _, _, name in heapq.nsmallest(
+                limit,
+                (
+                    (-name_hits[name], -description_hits[name], name)
+                    for name in candidates
+                ),
+            )
+        ]
+
+    def __search_descriptions(
+        self,
+        name_postings: list[set[str]],
+        description_postings: list[set[str]],
+        min_hits: int,
+        limit: int,
+        excluded: set[str],
+    ) -> list[str]:
+        """
+        Find the best habits sharing at least min_hits trigrams with the query only in their task description. These
+        habits share fewer trigrams with the query in their name than any habit found by __search_names, so they always
+        rank below them.
+        A habit sharing min_hits of the trigrams occurs in at least one of the len(description_postings) - min_hits + 1
+        rarest posting lists, so only these lists need to be walked to find the candidates.
+        Args:
+            name_postings: The posting lists of the query trigrams in the names, rarest first.
+            description_postings: The posting lists of the query trigrams in the descriptions, rarest first.
+            min_hits: The minimum number of shared trigrams.
+            limit: The maximum number of results.
+            excluded: Names which must not be part of the results.
+
+        Returns:
+            The names of the matching habits, best match first.
+        """
+        candidates = set()
+        for names in description_postings[: len(description_postings) - min_hits + 1]:
+            candidates |= names
+        candidates -= excluded
+        description_hits = self.__count_hits(candidates, description_postings)
+        candidates = {
+            name for name, hits in description_hits.items() if hits >= min_hits
+        }
+        name_hits = self.__count_hits(candidates, name_postings)
+        candidates = {name for name in candidates if name_hits[name] < min_hits}
+        return [
+            name
+            for _, _, name in heapq.nsmallest(
+                limit,
+                (
+                    (-name_hits[name], -description_hits[name], name)
+                    for name in candidates
+                ),
+            )
+        ]
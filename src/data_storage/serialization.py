@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from habit_tracking.habits import CompletionArchive, CompletionTimes, Habit, UserHabit
+
+
+def habit_from_json(habit_data: dict) -> Habit:
+    """
+    Create a Habit object from its json representation, as returned by Habit.json.
+    Args:
+        habit_data: The json representation of the habit.
+
+    Returns:
+        The Habit object.
+    """
+    return Habit(
+        name=habit_data["name"],
+        task_description=habit_data["task_description"],
+        period=habit_data["period"],
+        creation_time=datetime.fromisoformat(habit_data["creation_time"]),
+    )
+
+
+def user_habit_from_json(user_habit_data: dict, habit: Habit | None) -> UserHabit:
+    """
+    Create a UserHabit object from its json representation, as returned by UserHabit.json.
+    Args:
+        user_habit_data: The json representation of the UserHabit.
+        habit: The Habit object tracked by the UserHabit, which is only referenced by name in the json.
+
+    Returns:
+        The UserHabit object.
+    """
+    return UserHabit(
+        userhabit_id=user_habit_data["userhabit_id"],
+        habit=habit,
+        # Completion times are only decoded when they are accessed
+        completion_times=CompletionTimes.from_encoded(
+            user_habit_data["completion_times"]
+        ),
+        creation_time=datetime.fromisoformat(user_habit_data["creation_time"]),
+        archive=(
+            completion_archive_from_json(user_habit_data["archive"])
+            if "archive" in user_habit_data
+            else None
+        ),
+    )
+
+
+def completion_archive_from_json(archive_data: dict) -> CompletionArchive:
+    """
+    Create a CompletionArchive object from its json representation, as returned by CompletionArchive.json.
+    Args:
+        archive_data: The json representation of the archive summary.
+
+    Returns:
+        The CompletionArchive object.
+    """
+    return CompletionArchive(
+        archived_until=datetime.fromisoformat(archive_data["archived_until"]),
+        period_count=archive_data["period_count"],
+        completion_count=archive_data["completion_count"],
+        longest_streak=archive_data["longest_streak"],
+        trailing_streak=archive_data["trailing_streak"],
+    )
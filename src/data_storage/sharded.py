@@ -0,0 +1,546 @@
+import json
+import os
+import zlib
+from collections.abc import Iterator
+
+from data_storage.interface import StorageInterface
+from data_storage.serialization import habit_from_json, user_habit_from_json
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+
+class ShardedJsonStorageInterface(StorageInterface):
+    """
+    A data storage interface that spreads its data over multiple JSON files.
+
+    Habits are kept in a shared catalog file, while users and user habits are distributed over a fixed number of
+    hash buckets ("shards"). Updating a single user or user habit therefore only rewrites the shard it lives in,
+    instead of the whole data set.
+
+    Directory layout:
+        <directory>/manifest.json       The number of shards the directory was created with.
+        <directory>/habits.json         The shared habit catalog.
+        <directory>/shards/<n>.json     The users and user habits whose key hashes to shard n.
+    """
+
+    def __init__(self, directory: str, num_shards: int = None):
+        """
+        Args:
+            directory: The path to the directory to use for data storage.
+            num_shards: The number of shards to distribute users and user habits over. Defaults to the value stored
+                in the manifest of an existing directory, or 64 for a new one.
+        """
+        self.directory = directory
+        manifest = self.__load_file(self.__manifest_path(), {})
+        stored_num_shards = manifest.get("num_shards")
+        if num_shards is None:
+            num_shards = stored_num_shards if stored_num_shards is not None else 64
+        assert num_shards > 0, "Number of shards must be positive."
+        assert (
+            stored_num_shards is None or stored_num_shards == num_shards
+        ), "Number of shards does not match the existing storage directory."
+        self.num_shards = num_shards
+        if stored_num_shards is None:
+            self.__save_file(self.__manifest_path(), {"num_shards": num_shards})
+        self.habits = self.__load_file(self.__habits_path(), {"habits": {}})["habits"]
+        self.shards = {}
+
+    def __manifest_path(self) -> str:
+        return os.path.join(self.directory, "manifest.json")
+
+    def __habits_path(self) -> str:
+        return os.path.join(self.directory, "habits.json")
+
+    def __shard_path(self, shard_index: int) -> str:
+        return os.path.join(self.directory, "shards", f"{shard_index:04d}.json")
+
+    def shard_index(self, key: str) -> int:
+        """
+        Get the index of the shard a user or user habit is stored in.
+        Args:
+            key: The username or userhabit ID to look up.
+
+        Returns:
+            The index of the shard responsible for the key.
+        """
+        return zlib.crc32(key.encode("utf-8")) % self.num_shards
+
+    @staticmethod
+    def __load_file(file_path: str, default: dict) -> dict:
+        """
+        Load the JSON data from a file.
+        Args:
+            file_path: The file to load.
+            default: The value to return if the file does not exist.
+
+        Returns:
+            The JSON data loaded from the file, or the default value if the file does not exist.
+        """
+        if os.path.exists(file_path):
+            with open(file_path, 'r') as fp:
+                return json.load(fp)
+        else:
+            return default
+
+    @staticmethod
+    def __save_file(file_path: str, data: dict):
+        """
+        Atomically save JSON data to a file, creating the parent directories if necessary.
+        Args:
+            file_path: The file to save to.
+            data: The JSON compatible data to save.
+
+        Returns:
+            None
+        """
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        # Write to a temporary file first, so a crash never leaves a partially written shard behind
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w') as fp:
+                json.dump(data, fp)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def __get_shard(self, key: str) -> dict:
+        """
+        Get the shard responsible for a key, loading it from disk on first access.
+        Args:
+            key: The username or userhabit ID to look up.
+
+        Returns:
+            The shard data containing the "users" and "user_habits" dictionaries.
+        """
+        shard_index = self.shard_index(key)
+        if shard_index not in self.shards:
+            self.shards[shard_index] = self.__load_file(
+                self.__shard_path(shard_index), {"users": {}, "user_habits": {}}
+            )
+        return self.shards[shard_index]
+
+    def __save_shard(self, key: str):
+        """
+        Save the shard responsible for a key to its file.
+        Args:
+            key: The username or userhabit ID whose shard should be saved.
+
+        Returns:
+            None
+        """
+        shard_index = self.shard_index(key)
+        self.__save_file(self.__shard_path(shard_index), self.shards[shard_index])
+
+    def __save_shards(self, shard_indices: set[int]):
+        """
+        Save multiple shards to their files.
+        Args:
+            shard_indices: The indices of the shards to save.
+
+        Returns:
+            None
+        """
+        for shard_index in sorted(shard_indices):
+            self.__save_file(self.__shard_path(shard_index), self.shards[shard_index])
+
+    def __save_habits(self):
+        """
+        Save the habit catalog to its file.
+        Returns:
+            None
+        """
+        self.__save_file(self.__habits_path(), {"habits": self.habits})
+
+    def __iter_shards(self) -> Iterator[dict]:
+        """
+        Iterate over all shards ordered by shard index, loading each one on first access.
+        Returns:
+            An iterator over all shards.
+        """
+        for shard_index in range(self.num_shards):
+            if shard_index not in self.shards:
+                self.shards[shard_index] = self.__load_file(
+                    self.__shard_path(shard_index), {"users": {}, "user_habits": {}}
+                )
+            yield self.shards[shard_index]
+
+    def insert_user(self, user: User) -> bool:
+        """
+        Insert a new user into the data storage.
+        Args:
+            user: The User object to insert into the data storage.
+
+        Returns:
+            True if the user was successfully inserted, False otherwise.
+        """
+        shard = self.__get_shard(user.username)
+        if user.username in shard['users']:
+            return False
+        shard['users'][user.username] = user.json()
+        self.__save_shard(user.username)
+        return True
+
+    def update_user(self, user: User) -> bool:
+        """
+        Update an existing user in the data storage.
+        Args:
+            user: The User object to update in the data storage.
+
+        Returns:
+            True if the user was successfully updated, False otherwise.
+        """
+        shard = self.__get_shard(user.username)
+        if user.username not in shard['users']:
+            return False
+        shard['users'][user.username] = user.json()
+        self.__save_shard(user.username)
+        return True
+
+    def delete_user(self, user: User) -> bool:
+        """
+        Delete an existing user from the data storage.
+        Args:
+            user: The User object to delete from the data storage.
+
+        Returns:
+            True if the user was successfully deleted, False otherwise.
+        """
+        shard = self.__get_shard(user.username)
+        if user.username not in shard['users']:
+            return False
+        del shard['users'][user.username]
+        self.__save_shard(user.username)
+        return True
+
+    def get_user(self, username: str) -> User | None:
+        """
+        Retrieve a user from the data storage by their username.
+        Args:
+            username: The username of the user to retrieve.
+
+        Returns:
+            The User object corresponding to the provided username, or None if the user does not exist.
+        """
+        shard = self.__get_shard(username)
+        if username not in shard['users']:
+            return None
+        user_data = shard['users'][username]
+        initialised_user_habits = self.get_user_habits(user_data['habits'])
+        # Skip references to UserHabit objects which no longer exist
+        initialised_user_habits = [
+            user_habit
+            for user_habit in initialised_user_habits
+            if user_habit is not None
+        ]
+        return User(username=user_data["username"], habits=initialised_user_habits)
+
+    def get_all_users(self) -> list[User]:
+        """
+        Retrieve all users from the data storage. This loads every shard.
+        Returns:
+            A list of all User objects in the data storage.
+        """
+        return list(self.iter_users())
+
+    def iter_users(self) -> Iterator[User]:
+        """
+        Iterate over all users in the data storage, one shard at a time.
+        Returns:
+            An iterator over all User objects in the data storage.
+        """
+        for shard in self.__iter_shards():
+            for username in list(shard['users']):
+                user = self.get_user(username)
+                if user is not None:
+                    yield user
+
+    def insert_users(self, users: list[User]) -> list[bool]:
+        """
+        Insert multiple new users into the data storage, writing each affected shard only once.
+        Args:
+            users: The User objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per user, True if that user was successfully inserted, False otherwise.
+        """
+        results = []
+        changed_shards = set()
+        for user in users:
+            shard = self.__get_shard(user.username)
+            if user.username in shard['users']:
+                results.append(False)
+            else:
+                shard['users'][user.username] = user.json()
+                changed_shards.add(self.shard_index(user.username))
+                results.append(True)
+        self.__save_shards(changed_shards)
+        return results
+
+    def insert_habit(self, habit: Habit) -> bool:
+        """
+        Insert a new habit into the data storage.
+        Args:
+            habit: The Habit object to insert into the data storage.
+
+        Returns:
+            True if the habit was successfully inserted, False otherwise.
+        """
+        if habit.name in self.habits:
+            return False
+        self.habits[habit.name] = habit.json()
+        self.__save_habits()
+        return True
+
+    def update_habit(self, habit: Habit) -> bool:
+        """
+        Update an existing habit in the data storage.
+        Args:
+            habit: The Habit object to update in the data storage.
+
+        Returns:
+            True if the habit was successfully updated, False otherwise.
+        """
+        if habit.name not in self.habits:
+            return False
+        self.habits[habit.name] = habit.json()
+        self.__save_habits()
+        return True
+
+    def delete_habit(self, habit: Habit, cascade: bool = False) -> bool:
+        """
+        Delete an existing habit from the data storage.
+        Args:
+            habit: The Habit object to delete from the data storage.
+            cascade: Whether to also delete all UserHabit objects tracking the habit, and remove them from the users
+                tracking them. This scans every shard, but writes each affected shard only once.
+
+        Returns:
+            True if the habit was successfully deleted, False otherwise.
+        """
+        if habit.name not in self.habits:
+            return False
+        if cascade:
+            deleted_ids = set()
+            changed_shards = set()
+            for shard_index, shard in enumerate(self.__iter_shards()):
+                for user_habit_id, user_habit_data in list(
+                    shard['user_habits'].items()
+                ):
+                    if user_habit_data['habit'] == habit.name:
+                        del shard['user_habits'][user_habit_id]
+                        deleted_ids.add(user_habit_id)
+                        changed_shards.add(shard_index)
+            for shard_index, shard in enumerate(self.__iter_shards()):
+                for user_data in shard['users'].values():
+                    if any(uh_id in deleted_ids for uh_id in user_data['habits']):
+                        user_data['habits'] = [
+                            user_habit_id
+                            for user_habit_id in user_data['habits']
+                            if user_habit_id not in deleted_ids
+                        ]
+                        changed_shards.add(shard_index)
+            self.__save_shards(changed_shards)
+        del self.habits[habit.name]
+        self.__save_habits()
+        return True
+
+    def get_habit(self, habit_name: str) -> Habit | None:
+        """
+        Retrieve a habit from the data storage by its name.
+        Args:
+            habit_name: The name of the habit to retrieve.
+
+        Returns:
+            The Habit object corresponding to the provided name, or None if the habit does not exist.
+        """
+        if habit_name not in self.habits:
+            return None
+        return habit_from_json(self.habits[habit_name])
+
+    def get_all_habits(self) -> list[Habit]:
+        """
+        Retrieve all habits from the data storage.
+        Returns:
+            A list of all Habit objects in the data storage.
+        """
+        return [self.get_habit(habit_name) for habit_name in self.habits]
+
+    def iter_habit_names(self) -> Iterator[str]:
+        """
+        Iterate over the names of all habits in the data storage, without deserializing the habits.
+        Returns:
+            An iterator over the names of all habits in the data storage.
+        """
+        yield from list(self.habits)
+
+    def insert_habits(self, habits: list[Habit]) -> list[bool]:
+        """
+        Insert multiple new habits into the data storage, writing the habit catalog only once.
+        Args:
+            habits: The Habit objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per habit, True if that habit was successfully inserted, False otherwise.
+        """
+        results = []
+        for habit in habits:
+            if habit.name in self.habits:
+                results.append(False)
+            else:
+                self.habits[habit.name] = habit.json()
+                results.append(True)
+        if any(results):
+            self.__save_habits()
+        return results
+
+    def insert_user_habit(self, user_habit: UserHabit) -> bool:
+        """
+        Insert a new UserHabit object into the data storage.
+        Args:
+            user_habit: The UserHabit object to insert into the data storage.
+
+        Returns:
+            True if the UserHabit object was successfully inserted, False otherwise.
+        """
+        shard = self.__get_shard(user_habit.userhabit_id)
+        if user_habit.userhabit_id in shard['user_habits']:
+            return False
+        shard['user_habits'][user_habit.userhabit_id] = user_habit.json()
+        self.__save_shard(user_habit.userhabit_id)
+        return True
+
+    def update_user_habit(self, user_habit: UserHabit) -> bool:
+        """
+        Update an existing UserHabit object in the data storage. Only the shard holding the UserHabit is rewritten.
+        Args:
+            user_habit: The UserHabit object to update in the data storage.
+
+        Returns:
+            True if the UserHabit object was successfully updated, False otherwise.
+        """
+        shard = self.__get_shard(user_habit.userhabit_id)
+        if user_habit.userhabit_id not in shard['user_habits']:
+            return False
+        shard['user_habits'][user_habit.userhabit_id] = user_habit.json()
+        self.__save_shard(user_habit.userhabit_id)
+        return True
+
+    def delete_user_habit(self, user_habit: UserHabit) -> bool:
+        """
+        Delete an existing UserHabit object from the data storage.
+        Args:
+            user_habit: The UserHabit object to delete from the data storage.
+
+        Returns:
+            True if the UserHabit object was successfully deleted, False otherwise.
+        """
+        shard = self.__get_shard(user_habit.userhabit_id)
+        if user_habit.userhabit_id not in shard['user_habits']:
+            return False
+        del shard['user_habits'][user_habit.userhabit_id]
+        self.__save_shard(user_habit.userhabit_id)
+        return True
+
+    def get_user_habit(self, user_habit_id: str) -> UserHabit | None:
+        """
+        Retrieve a UserHabit object from the data storage by its ID.
+        Args:
+            user_habit_id: The ID of the UserHabit object to retrieve.
+
+        Returns:
+            The UserHabit object corresponding to the provided ID, or None if the UserHabit object does not exist.
+        """
+        shard = self.__get_shard(user_habit_id)
+        if user_habit_id not in shard['user_habits']:
+            return None
+        user_habit_data = shard['user_habits'][user_habit_id]
+        habit = self.get_habit(user_habit_data["habit"])
+        return user_habit_from_json(user_habit_data, habit)
+
+    def get_all_user_habits(self) -> list[UserHabit]:
+        """
+        Retrieve all UserHabit objects from the data storage. This loads every shard.
+        Returns:
+            A list of all UserHabit objects in the data storage.
+        """
+        return list(self.iter_user_habits())
+
+    def iter_user_habits(self) -> Iterator[UserHabit]:
+        """
+        Iterate over all UserHabit objects in the data storage, one shard at a time.
+        Returns:
+            An iterator over all UserHabit objects in the data storage.
+        """
+        for shard in self.__iter_shards():
+            for user_habit_id in list(shard['user_habits']):
+                user_habit = self.get_user_habit(user_habit_id)
+                if user_habit is not None:
+                    yield user_habit
+
+    def insert_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Insert multiple new UserHabit objects into the data storage, writing each affected shard only once.
+        Args:
+            user_habits: The UserHabit objects to insert into the data storage.
+
+        Returns:
+            A list with one entry per UserHabit, True if that UserHabit was successfully inserted, False otherwise.
+        """
+        results = []
+        changed_shards = set()
+        for user_habit in user_habits:
+            shard = self.__get_shard(user_habit.userhabit_id)
+            if user_habit.userhabit_id in shard['user_habits']:
+                results.append(False)
+            else:
+                shard['user_habits'][user_habit.userhabit_id] = user_habit.json()
+                changed_shards.add(self.shard_index(user_habit.userhabit_id))
+                results.append(True)
+        self.__save_shards(changed_shards)
+        return results
+
+    def update_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Update multiple existing UserHabit objects in the data storage, writing each affected shard only once.
+        Args:
+            user_habits: The UserHabit objects to update in the data storage.
+
+        Returns:
+            A list with one entry per UserHabit, True if that UserHabit was successfully updated, False otherwise.
+        """
+        results = []
+        changed_shards = set()
+        for user_habit in user_habits:
+            shard = self.__get_shard(user_habit.userhabit_id)
+            if user_habit.userhabit_id not in shard['user_habits']:
+                results.append(False)
+            else:
+                shard['user_habits'][user_habit.userhabit_id] = user_habit.json()
+                changed_shards.add(self.shard_index(user_habit.userhabit_id))
+                results.append(True)
+        self.__save_shards(changed_shards)
+        return results
+
+    def delete_user_habits(self, user_habits: list[UserHabit]) -> list[bool]:
+        """
+        Delete multiple existing UserHabit objects from the data storage, writing each affected shard only once.
+        Args:
+            user_habits: The UserHabit objects to delete from the data storage.
+
+        Returns:
+            A list with one entry per UserHabit, True if that UserHabit was successfully deleted, False otherwise.
+        """
+        results = []
+        changed_shards = set()
+        for user_habit in user_habits:
+            shard = self.__get_shard(user_habit.userhabit_id)
+            if user_habit.userhabit_id not in shard['user_habits']:
+                results.append(False)
+            else:
+                del shard['user_habits'][user_habit.userhabit_id]
+                changed_shards.add(self.shard_index(user_habit.userhabit_id))
+                results.append(True)
+        self.__save_shards(changed_shards)
+        return results
@@ -0,0 +1,205 @@
+from collections.abc import Iterator, Mapping
+
+from data_storage.serialization import habit_from_json, user_habit_from_json
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+# Marker for records which did not exist when the snapshot was taken.
+MISSING = object()
+
+
+class SnapshotSection(Mapping):
+    """
+    A read-only view of one section ("users", "habits" or "user_habits") of the data, as it was when the snapshot was
+    taken.
+
+    The view reads from the live section of the data store, except for records which have been changed since the
+    snapshot was taken. The data store hands the previous version of those records to the snapshot before changing
+    them, so the view only needs to hold on to the changed records.
+    """
+
+    def __init__(self, live_records: dict):
+        """
+        Args:
+            live_records: The live section of the data store.
+        """
+        self.live_records = live_records
+        self.preserved_records = {}
+
+    def preserve(self, key: str, record):
+        """
+        Keep the version of a record from the time of the snapshot, before the live record is changed.
+        Only the first call for each key has an effect, later versions are never visible to the snapshot.
+        Args:
+            key: The primary key of the record.
+            record: The current record, or MISSING if the record does not exist.
+
+        Returns:
+            None
+        """
+        self.preserved_records.setdefault(key, record)
+
+    def __get(self, key: str):
+        # The live record must be read before checking the preserved records. A writer preserves a record before
+        # changing it, so a live record read before the check is either unchanged or overridden by the check.
+        record = self.live_records.get(key, MISSING)
+        return self.preserved_records.get(key, record)
+
+    def __getitem__(self, key: str):
+        record = self.__get(key)
+        if record is MISSING:
+            raise KeyError(key)
+        return record
+
+    def __contains__(self, key) -> bool:
+        return self.__get(key) is not MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        live_keys = list(self.live_records)
+        for key in live_keys:
+            if self.__get(key) is not MISSING:
+                yield key
+        # Records which were deleted from the live data since the snapshot was taken
+        live_key_set = set(live_keys)
+        for key, record in list(self.preserved_records.items()):
+            if record is not MISSING and key not in live_key_set:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class JsonStorageSnapshot:
+    """
+    An immutable point-in-time view of the data of a JsonStorageInterface.
+
+    Taking a snapshot is cheap, since it shares all records with the data store. Writers are never blocked by a
+    snapshot. Instead, each write hands the previous version of the changed record to all live snapshots, so the memory
+    used by a snapshot is proportional to the number of records changed since it was taken. A snapshot stops receiving
+    records as soon as it is garbage collected.
+    """
+
+    def __init__(self, live_data: dict):
+        """
+        Args:
+            live_data: The live data of the data store, with one dictionary of records per section.
+        """
+        self.data = {
+            section: SnapshotSection(records) for section, records in live_data.items()
+        }
+
+    def preserve(self, section: str, key: str, record):
+        """
+        Keep the version of a record from the time of the snapshot, before the live record is changed.
+        Args:
+            section: The section of the data the record is stored in.
+            key: The primary key of the record.
+            record: The current record, or MISSING if the record does not exist.
+
+        Returns:
+            None
+        """
+        self.data[section].preserve(key, record)
+
+    def get_user(self, username: str) -> User | None:
+        """
+        Retrieve a user from the snapshot by their username.
+        Args:
+            username: The username of the user to retrieve.
+
+        Returns:
+            The User object corresponding to the provided username, or None if the user does not exist.
+        """
+        if username not in self.data['users']:
+            return None
+        user_data = self.data['users'][username]
+        initialised_user_habits = [
+            user_habit
+            for user_habit in self.get_user_habits(user_data['habits'])
+            if user_habit is not None
+        ]
+        return User(username=user_data["username"], habits=initialised_user_habits)
+
+    def iter_users(self) -> Iterator[User]:
+        """
+        Iterate over all users in the snapshot, deserializing one user at a time.
+        Returns:
+            An iterator over all User objects in the snapshot.
+        """
+        for username in self.data['users']:
+            yield self.get_user(username)
+
+    def get_all_users(self) -> list[User]:
+        """
+        Retrieve all users from the snapshot.
+        Returns:
+            A list of all User objects in the snapshot.
+        """
+        return list(self.iter_users())
+
+    def get_habit(self, habit_name: str) -> Habit | None:
+        """
+        Retrieve a habit from the snapshot by its name.
+        Args:
+            habit_name: The name of the habit to retrieve.
+
+        Returns:
+            The Habit object corresponding to the provided name, or None if the habit does not exist.
+        """
+        if habit_name not in self.data['habits']:
+            return None
+        return habit_from_json(self.data['habits'][habit_name])
+
+    def get_all_habits(self) -> list[Habit]:
+        """
+        Retrieve all habits from the snapshot.
+        Returns:
+            A list of all Habit objects in the snapshot.
+        """
+        return [
+            habit_from_json(self.data['habits'][habit_name])
+            for habit_name in self.data['habits']
+        ]
+
+    def get_user_habit(self, userhabit_id: str) -> UserHabit | None:
+        """
+        Retrieve a UserHabit object from the snapshot by its ID.
+        Args:
+            userhabit_id: The ID of the UserHabit object to retrieve.
+
+        Returns:
+            The UserHabit object corresponding to the provided ID, or None if the UserHabit object does not exist.
+        """
+        return self.get_user_habits([userhabit_id])[0]
+
+    def get_user_habits(self, userhabit_ids: list[str]) -> list[UserHabit | None]:
+        """
+        Retrieve multiple UserHabit objects from the snapshot by their IDs.
+        Args:
+            userhabit_ids: The IDs of the UserHabit objects to retrieve.
+
+        Returns:
+            A list with one entry per ID, containing the corresponding UserHabit object, or None if it does not exist.
+        """
+        habits = {}
+        user_habits = []
+        for userhabit_id in userhabit_ids:
+            if userhabit_id not in self.data['user_habits']:
+                user_habits.append(None)
+                continue
+            user_habit_data = self.data['user_habits'][userhabit_id]
+            habit_name = user_habit_data["habit"]
+            if habit_name not in habits:
+                habits[habit_name] = self.get_habit(habit_name)
+            user_habits.append(
+                user_habit_from_json(user_habit_data, habits[habit_name])
+            )
+        return user_habits
+
+    def get_all_user_habits(self) -> list[UserHabit]:
+        """
+        Retrieve all UserHabit objects from the snapshot.
+        Returns:
+            A list of all UserHabit objects in the snapshot.
+        """
+        return self.get_user_habits(list(self.data['user_habits']))
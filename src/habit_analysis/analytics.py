@@ -11,21 +11,10 @@ def get_all_tracked_habits_with_streak(user: User) -> list[tuple[Habit, int]]:
     Returns:
         A list of tuples containing the habit and its current streak.
     """
-    habits_with_streak = []
-    for user_habit in user.habits:
-        completion_history = user_habit.get_completion_history()
-        # Remove the current period if it is not yet completed
-        completion_history = (
-            completion_history if completion_history[-1][2] else completion_history[:-1]
-        )
-        current_streak = 0
-        for _, _, completed in reversed(completion_history):
-            if completed:
-                current_streak += 1
-            else:
-                break
-        habits_with_streak.append((user_habit.habit, current_streak))
-    return habits_with_streak
+    return [
+        (user_habit.habit, get_current_streak_for_habit(user_habit))
+        for user_habit in user.habits
+    ]
 
 
 def get_all_tracked_habits_with_streak_for_periodicity(
@@ -40,24 +29,11 @@ def get_all_tracked_habits_with_streak_for_periodicity(
     Returns:
         A list of tuples containing the habit and its current streak.
     """
-    habits_with_streak = []
-    for user_habit in user.habits:
-        if user_habit.habit.period == period:
-            completion_history = user_habit.get_completion_history()
-            # Remove the current period if it is not yet completed
-            completion_history = (
-                completion_history
-                if completion_history[-1][2]
-                else completion_history[:-1]
-            )
-            current_streak = 0
-            for _, _, completed in reversed(completion_history):
-                if completed:
-                    current_streak += 1
-                else:
-                    break
-            habits_with_streak.append((user_habit.habit, current_streak))
-    return habits_with_streak
+    return [
+        (user_habit.habit, get_current_streak_for_habit(user_habit))
+        for user_habit in user.habits
+        if user_habit.habit.period == period
+    ]
 
 
 def get_all_time_longest_habit_streak(user: User) -> tuple[Habit, int]:
@@ -71,16 +47,7 @@ def get_all_time_longest_habit_streak(user: User) -> tuple[Habit, int]:
     """
     longest_streak = (None, 0)
     for user_habit in user.habits:
-        completion_history = user_habit.get_completion_history()
-        longest_streak_for_habit = 0
-        current_streak = 0
-        for _, _, completed in completion_history:
-            if completed:
-                current_streak += 1
-            else:
-                longest_streak_for_habit = max(longest_streak_for_habit, current_streak)
-                current_streak = 0
-        longest_streak_for_habit = max(longest_streak_for_habit, current_streak)
+        longest_streak_for_habit = get_longest_streak_for_habit(user_habit)
         if longest_streak_for_habit > longest_streak[1]:
             longest_streak = (user_habit.habit, longest_streak_for_habit)
     return longest_streak
@@ -97,17 +64,7 @@ def get_current_longest_habit_streak(user: User) -> tuple[Habit, int]:
     """
     longest_streak = (None, 0)
     for user_habit in user.habits:
-        completion_history = user_habit.get_completion_history()
-        # Remove the current period if it is not yet completed
-        completion_history = (
-            completion_history if completion_history[-1][2] else completion_history[:-1]
-        )
-        current_streak = 0
-        for _, _, completed in reversed(completion_history):
-            if completed:
-                current_streak += 1
-            else:
-                break
+        current_streak = get_current_streak_for_habit(user_habit)
         if current_streak > longest_streak[1]:
             longest_streak = (user_habit.habit, current_streak)
     return longest_streak
@@ -116,6 +73,7 @@ def get_current_longest_habit_streak(user: User) -> tuple[Habit, int]:
 def get_longest_streak_for_habit(user_habit: UserHabit) -> int:
     """
     Retrieve the longest streak for a specific habit tracked by the user.
+    Streaks in archived periods, and streaks continuing from the archived into the live periods, are included.
     Args:
         user_habit: The UserHabit to retrieve the longest streak for.
 
@@ -123,8 +81,9 @@ def get_longest_streak_for_habit(user_habit: UserHabit) -> int:
         The length of the longest streak for the habit.
     """
     completion_history = user_habit.get_completion_history()
-    longest_streak = 0
-    current_streak = 0
+    archive = user_habit.archive
+    longest_streak = archive.longest_streak if archive is not None else 0
+    current_streak = archive.trailing_streak if archive is not None else 0
     for _, _, completed in completion_history:
         if completed:
             current_streak += 1
@@ -138,6 +97,7 @@ def get_longest_streak_for_habit(user_habit: UserHabit) -> int:
 def get_current_streak_for_habit(user_habit: UserHabit) -> int:
     """
     Retrieve the current streak for a specific habit tracked by the user.
+    Streaks continuing from the archived into the live periods are included.
     Args:
         user_habit: The UserHabit to retrieve the current streak for.
 
@@ -146,13 +106,16 @@ def get_current_streak_for_habit(user_habit: UserHabit) -> int:
     """
     completion_history = user_habit.get_completion_history()
     # Remove the current period if it is not yet completed
-    completion_history = (
-        completion_history if completion_history[-1][2] else completion_history[:-1]
-    )
+    if len(completion_history) > 0 and not completion_history[-1][2]:
+        completion_history = completion_history[:-1]
     current_streak = 0
     for _, _, completed in reversed(completion_history):
         if completed:
             current_streak += 1
         else:
             break
+    else:
+        # All live periods were completed, so the streak continues into the archived periods
+        if user_habit.archive is not None:
+            current_streak += user_habit.archive.trailing_streak
     return current_streak
@@ -0,0 +1,356 @@
+import json
+import os
+from datetime import date, datetime
+
+from habit_tracking.habits import Habit
+
+
+class UserHabitProjection:
+    """
+    The materialized streaks and completion count of a single UserHabit, derived from its events.
+
+    Periods are identified by their index since the creation of the UserHabit (see Habit.get_period_index). Completed
+    periods are kept as runs of consecutive indices, indexed by their first and by their last period, so a completion
+    is added by merging at most two neighbouring runs, even for completions of past periods, and the streak ending at a
+    period is a single lookup.
+    """
+
+    def __init__(self, habit: Habit, creation_time: datetime):
+        """
+        Args:
+            habit: The tracked habit. Only its period is used.
+            creation_time: The creation time of the UserHabit, from which periods are counted.
+        """
+        self.habit = habit
+        self.creation_time = creation_time
+        self.completion_count = 0
+        self.longest_streak = 0
+        self.__completed_periods = set()
+        # Map the first period of each run of completed periods to its last period, and the other way around
+        self.__run_ends = {}
+        self.__run_starts = {}
+
+    @property
+    def runs(self) -> list[tuple[int, int]]:
+        """
+        The runs of consecutive completed periods.
+        Returns:
+            A list of (first period index, last period index) tuples, in ascending order.
+        """
+        return sorted(self.__run_ends.items())
+
+    def add_run(self, start: int, end: int):
+        """
+        Mark a run of consecutive periods as completed, merging it with adjacent runs.
+        Args:
+            start: The index of the first period of the run.
+            end: The index of the last period of the run. Must not be smaller than start.
+
+        Returns:
+            None
+        """
+        assert start <= end, "A run must not end before it starts."
+        for index in range(start, end + 1):
+            if index in self.__completed_periods:
+                # Overlapping runs are merged one period at a time
+                for other_index in range(start, end + 1):
+                    self.add_period(other_index)
+                return
+        self.__completed_periods.update(range(start, end + 1))
+        start = self.__run_starts.pop(start - 1, start)
+        end = self.__run_ends.pop(end + 1, end)
+        self.__run_ends.pop(start, None)
+        self.__run_starts.pop(end, None)
+        self.__run_ends[start] = end
+        self.__run_starts[end] = start
+        self.longest_streak = max(self.longest_streak, end - start + 1)
+
+    def add_period(self, index: int):
+        """
+        Mark a period as completed. Periods before the creation of the UserHabit, and periods which are already
+        completed, are ignored.
+        Args:
+            index: The index of the period.
+
+        Returns:
+            None
+        """
+        if index < 0 or index in self.__completed_periods:
+            return
+        self.add_run(index, index)
+
+    def add_completion(self, completion_time: datetime):
+        """
+        Count a completion and mark its period as completed.
+        Args:
+            completion_time: The time of the completion.
+
+        Returns:
+            None
+        """
+        self.completion_count += 1
+        self.add_period(
+            self.habit.get_period_index(self.creation_time, completion_time)
+        )
+
+    def get_streak_until(self, index: int) -> int:
+        """
+        Get the length of the streak of completed periods ending with a period.
+        Args:
+            index: The index of the period.
+
+        Returns:
+            The number of consecutive completed periods up to and including the period, 0 if it is not completed.
+        """
+        if index not in self.__completed_periods:
+            return 0
+        if index in self.__run_starts:
+            return index - self.__run_starts[index] + 1
+        # The period lies within a run, which only happens if completions were tracked for future periods
+        start = index
+        while start - 1 in self.__completed_periods:
+            start -= 1
+        return index - start + 1
+
+    def get_current_streak(self, now: datetime = None) -> int:
+        """
+        Get the current streak, with the same rules as analytics.get_current_streak_for_habit: the current period only
+        counts once it is completed.
+        Args:
+            now: The current time. Defaults to the actual current time.
+
+        Returns:
+            The length of the current streak.
+        """
+        now = now if now is not None else datetime.now()
+        index = self.habit.get_period_index(self.creation_time, now)
+        if index in self.__completed_periods:
+            return self.get_streak_until(index)
+        return self.get_streak_until(index - 1)
+
+    def json(self) -> dict:
+        """
+        Returns all values of the object in a json compatible format for easier storage
+        Returns:
+            All value of the object in a json compatible format
+        """
+        return {
+            "habit": self.habit.name,
+            "period": self.habit.period,
+            "creation_time": self.creation_time.isoformat(),
+            "completion_count": self.completion_count,
+            "longest_streak": self.longest_streak,
+            "runs": [list(run) for run in self.runs],
+        }
+
+
+class Projections:
+    """
+    Materialized views of the event log of tracked habits, which are updated incrementally as events are applied, so
+    that reading a streak or a count is a single lookup instead of a computation over the whole completion history.
+
+    The projections cover the current and longest streak and the number of completions of every UserHabit, the number
+    of completions per day, and the number of completions per habit. The counts per day and per habit include the
+    completions of UserHabits which were removed later, since they happened all the same.
+
+    All projections are derived from the log alone, so they can be rebuilt at any time by applying all events to empty
+    projections. The offset of the log up to which events have been applied is stored with them, so a checkpoint only
+    needs the events after it to be brought up to date.
+    """
+
+    def __init__(self):
+        self.user_habits = {}
+        self.daily_counts = {}
+        self.habit_totals = {}
+        # The number of events applied, and the offset in the log right after the last one
+        self.event_count = 0
+        self.offset = 0
+
+    def apply(self, event: dict, offset: int = None):
+        """
+        Update the projections with an event. Events of unknown UserHabits are ignored.
+        Args:
+            event: The event, see EventLog for the event types.
+            offset: The offset in the log right after the event.
+
+        Returns:
+            None
+        """
+        userhabit_id = event["userhabit_id"]
+        match event["type"]:
+            case "habit_created":
+                user_habit = UserHabitProjection(
+                    Habit(event["habit"], "", event["period"]),
+                    datetime.fromisoformat(event["creation_time"]),
+                )
+                archive = event.get("archive")
+                if archive is not None:
+                    # Archived periods are closed, so only the streak ending with the last of them can be extended
+                    user_habit.completion_count = archive["completion_count"]
+                    user_habit.longest_streak = archive["longest_streak"]
+                    if archive["trailing_streak"] > 0:
+                        user_habit.add_run(
+                            archive["period_count"] - archive["trailing_streak"],
+                            archive["period_count"] - 1,
+                        )
+                self.user_habits[userhabit_id] = user_habit
+            case "completion_tracked":
+                user_habit = self.user_habits.get(userhabit_id)
+                if user_habit is not None:
+                    completion_time = datetime.fromisoformat(event["completion_time"])
+                    user_habit.add_completion(completion_time)
+                    day = completion_time.date().isoformat()
+                    self.daily_counts[day] = self.daily_counts.get(day, 0) + 1
+                    habit_name = user_habit.habit.name
+                    self.habit_totals[habit_name] = (
+                        self.habit_totals.get(habit_name, 0) + 1
+                    )
+            case "habit_removed":
+                self.user_habits.pop(userhabit_id, None)
+        self.event_count += 1
+        if offset is not None:
+            self.offset = offset
+
+    def __contains__(self, userhabit_id: str) -> bool:
+        return userhabit_id in self.user_habits
+
+    def get_current_streak(self, userhabit_id: str, now: datetime = None) -> int:
+        """
+        Get the current streak of a UserHabit.
+        Args:
+            userhabit_id: The ID of the UserHabit.
+            now: The current time. Defaults to the actual current time.
+
+        Returns:
+            The length of the current streak.
+        """
+        return self.user_habits[userhabit_id].get_current_streak(now)
+
+    def get_longest_streak(self, userhabit_id: str) -> int:
+        """
+        Get the longest streak of a UserHabit.
+        Args:
+            userhabit_id: The ID of the UserHabit.
+
+        Returns:
+            The length of the longest streak.
+        """
+        return self.user_habits[userhabit_id].longest_streak
+
+    def get_completion_count(self, userhabit_id: str) -> int:
+        """
+        Get the number of completions of a UserHabit, including archived completions.
+        Args:
+            userhabit_id: The ID of the UserHabit.
+
+        Returns:
+            The number of completions.
+        """
+        return self.user_habits[userhabit_id].completion_count
+
+    def get_daily_count(self, day: date) -> int:
+        """
+        Get the number of completions tracked for a day, across all users and habits.
+        Args:
+            day: The day.
+
+        Returns:
+            The number of completions.
+        """
+        return self.daily_counts.get(day.isoformat(), 0)
+
+    def get_habit_total(self, habit_name: str) -> int:
+        """
+        Get the number of completions tracked for a habit, across all users.
+        Args:
+            habit_name: The name of the habit.
+
+        Returns:
+            The number of completions.
+        """
+        return self.habit_totals.get(habit_name, 0)
+
+    def json(self) -> dict:
+        """
+        Returns all values of the object in a json compatible format for easier storage
+        Returns:
+            All value of the object in a json compatible format
+        """
+        return {
+            "offset": self.offset,
+            "event_count": self.event_count,
+            "user_habits": {
+                userhabit_id: user_habit.json()
+                for userhabit_id, user_habit in self.user_habits.items()
+            },
+            "daily_counts": self.daily_counts,
+            "habit_totals": self.habit_totals,
+        }
+
+    def save_checkpoint(self, file_path: str):
+        """
+        Atomically write the projections to a checkpoint file.
+        Args:
+            file_path: The path of the checkpoint file.
+
+        Returns:
+            None
+        """
+        save_dir = os.path.dirname(file_path)
+        if save_dir != "":
+            os.makedirs(save_dir, exist_ok=True)
+        # Write to a temporary file first, so a crash never leaves a partially written checkpoint behind
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w') as fp:
+                json.dump(self.json(), fp)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def user_habit_projection_from_json(user_habit_data: dict) -> UserHabitProjection:
+    """
+    Create a UserHabitProjection object from its json representation, as returned by UserHabitProjection.json.
+    Args:
+        user_habit_data: The json representation of the projection.
+
+    Returns:
+        The UserHabitProjection object.
+    """
+    user_habit = UserHabitProjection(
+        Habit(user_habit_data["habit"], "", user_habit_data["period"]),
+        datetime.fromisoformat(user_habit_data["creation_time"]),
+    )
+    for start, end in user_habit_data["runs"]:
+        user_habit.add_run(start, end)
+    user_habit.completion_count = user_habit_data["completion_count"]
+    user_habit.longest_streak = user_habit_data["longest_streak"]
+    return user_habit
+
+
+def load_checkpoint(file_path: str) -> Projections:
+    """
+    Load projections from a checkpoint file, as written by Projections.save_checkpoint.
+    Args:
+        file_path: The path of the checkpoint file.
+
+    Returns:
+        The projections, or empty projections if the checkpoint file does not exist.
+    """
+    projections = Projections()
+    if not os.path.exists(file_path):
+        return projections
+    with open(file_path, 'r') as fp:
+        data = json.load(fp)
+    projections.offset = data["offset"]
+    projections.event_count = data["event_count"]
+    projections.user_habits = {
+        userhabit_id: user_habit_projection_from_json(user_habit_data)
+        for userhabit_id, user_habit_data in data["user_habits"].items()
+    }
+    projections.daily_counts = data["daily_counts"]
+    projections.habit_totals = data["habit_totals"]
+    return projections
@@ -0,0 +1,92 @@
+from data_storage.interface import StorageInterface
+from habit_analysis import analytics
+from habit_analysis.projections import Projections
+from habit_tracking.habits import UserHabit
+from habit_tracking.users import User
+
+
+def get_habit_streaks(
+    user: User, period: str = None, projections: Projections = None
+) -> list[dict]:
+    """
+    Get the current and longest streak of every habit tracked by a user.
+    Args:
+        user: The user to get the streaks for.
+        period: Only include habits with this period. Defaults to all habits.
+        projections: Projections of an event log to look the streaks up in. The streaks of habits which aren't
+            projected are computed from their completion history.
+
+    Returns:
+        The name, period, current streak and longest streak of every habit.
+    """
+    habit_streaks = []
+    for user_habit in user.habits:
+        if period is not None and user_habit.habit.period != period:
+            continue
+        current_streak, longest_streak = get_user_habit_streaks(user_habit, projections)
+        habit_streaks.append(
+            {
+                "habit": user_habit.habit.name,
+                "period": user_habit.habit.period,
+                "current_streak": current_streak,
+                "longest_streak": longest_streak,
+            }
+        )
+    return habit_streaks
+
+
+def get_user_habit_streaks(
+    user_habit: UserHabit, projections: Projections = None
+) -> tuple[int, int]:
+    """
+    Get the current and longest streak of a UserHabit.
+    Args:
+        user_habit: The UserHabit to get the streaks for.
+        projections: Projections of an event log to look the streaks up in. If the UserHabit isn't projected, the
+            streaks are computed from its completion history.
+
+    Returns:
+        A tuple of the current streak and the longest streak.
+    """
+    if projections is not None and user_habit.userhabit_id in projections:
+        return (
+            projections.get_current_streak(user_habit.userhabit_id),
+            projections.get_longest_streak(user_habit.userhabit_id),
+        )
+    return (
+        analytics.get_current_streak_for_habit(user_habit),
+        analytics.get_longest_streak_for_habit(user_habit),
+    )
+
+
+def get_projections(data_storage: StorageInterface) -> Projections | None:
+    """
+    Get the projections of the event log of a data storage.
+    Args:
+        data_storage: The data storage to use.
+
+    Returns:
+        The projections, or None if the data storage doesn't record an event log.
+    """
+    return getattr(data_storage, "projections", None)
+
+
+def get_highest_streak(habit_streaks: list[dict], streak_type: str) -> dict:
+    """
+    Get the first habit with the highest streak, with the same rules as analytics.get_all_time_longest_habit_streak
+    and analytics.get_current_longest_habit_streak.
+    Args:
+        habit_streaks: The streaks of the habits, as returned by get_habit_streaks.
+        streak_type: The streak to compare ("current_streak" or "longest_streak").
+
+    Returns:
+        The name of the "habit" and its "streak", with a name of None if no habit has a streak.
+    """
+    highest_streak = {"habit": None, "streak": 0}
+    for habit_streak in habit_streaks:
+        if habit_streak[streak_type] > highest_streak["streak"]:
+            highest_streak = {
+                "habit": habit_streak["habit"],
+                "streak": habit_streak[streak_type],
+            }
+    return highest_streak
@@ -1,6 +1,250 @@
+import bisect
+import itertools
 import uuid
 from datetime import datetime, timedelta
 
+# Source of version numbers for tracking modifications. Versions are unique across all objects, so two equal versions
+# always refer to the same state of the same object.
+_versions = itertools.count(1)
+
+
+class CompletionTimes(list):
+    """
+    A list of completion times which keeps track of modifications, so that its encoded form can be cached.
+
+    Completion times created from their encoded form (see from_encoded) are decoded lazily: each element is only
+    decoded when it is accessed, and operations which can be answered from the encoded values, such as taking the
+    length or checking whether a period was completed, don't decode at all. The encoded values stay available until
+    the list is modified anywhere but at its end.
+    """
+
+    def __init__(self, iterable=()):
+        """
+        Args:
+            iterable: The initial completion times.
+        """
+        super().__init__(iterable)
+        self.version = next(_versions)
+        # Index of the first element which may have changed since the last call of mark_encoded
+        self.modified_from = 0
+        # The ISO format of all elements, or None if unknown. Elements which have not been decoded yet are stored in
+        # this format in the list itself.
+        self.__encoded = None
+        # Whether the elements are in ascending order, or None if not yet known
+        self.__sorted = None
+
+    @classmethod
+    def from_encoded(cls, encoded: list[str]) -> "CompletionTimes":
+        """
+        Create completion times from their ISO format, without decoding them up front.
+        Args:
+            encoded: The completion times in ISO format, as produced by datetime.isoformat.
+
+        Returns:
+            The CompletionTimes object.
+        """
+        # Encoded values can only be compared as strings if they are in the exact format produced by isoformat for
+        # naive datetimes, otherwise they are decoded right away.
+        if not all(len(value) in (19, 26) and value[10] == 'T' for value in encoded):
+            return cls(datetime.fromisoformat(value) for value in encoded)
+        completion_times = cls(encoded)
+        completion_times.__encoded = list(encoded)
+        return completion_times
+
+    @property
+    def encoded(self) -> list[str] | None:
+        """
+        The ISO format of all completion times, if known without encoding them.
+        Returns:
+            A list of the completion times in ISO format, which must not be modified, or None if unknown.
+        """
+        return self.__encoded
+
+    def mark_encoded(self):
+        """
+        Mark all current elements as unchanged, so that only modifications from here on need to be re-encoded.
+        Returns:
+            None
+        """
+        self.modified_from = len(self)
+
+    def any_between(self, start: datetime, end: datetime) -> bool:
+        """
+        Check whether any completion time lies within a time range. If the completion times are in ascending order,
+        the range is found with a binary search. If the encoded values are known, they are searched instead of the
+        decoded ones, so no completion time needs to be decoded.
+        Args:
+            start: The start of the time range (inclusive).
+            end: The end of the time range (exclusive).
+
+        Returns:
+            True if a completion time lies within the range, False otherwise.
+        """
+        if self.__encoded is not None:
+            values, low, high = self.__encoded, start.isoformat(), end.isoformat()
+        else:
+            values, low, high = self, start, end
+        if self.__sorted is None:
+            self.__sorted = all(
+                values[i] <= values[i + 1] for i in range(len(values) - 1)
+            )
+        if self.__sorted:
+            index = bisect.bisect_left(values, low)
+            return index < len(values) and values[index] < high
+        return any(low <= value < high for value in values)
+
+    def __decode(self, index: int) -> datetime:
+        value = super().__getitem__(index)
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+            super().__setitem__(index, value)
+        return value
+
+    def __decode_all(self):
+        if self.__encoded is not None:
+            for index in range(len(self)):
+                self.__decode(index)
+
+    def __modified(self, index: int = 0):
+        self.version = next(_versions)
+        self.modified_from = min(self.modified_from, index)
+        self.__sorted = None
+        if index < len(self):
+            # The encoded values can't be kept up to date for modifications before the end of the list
+            self.__decode_all()
+            self.__encoded = None
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.__decode(i) for i in range(*index.indices(len(self)))]
+        return self.__decode(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.__decode(index)
+
+    def __reversed__(self):
+        for index in reversed(range(len(self))):
+            yield self.__decode(index)
+
+    def __contains__(self, completion_time) -> bool:
+        return any(value == completion_time for value in self)
+
+    def __eq__(self, other) -> bool:
+        self.__decode_all()
+        return super().__eq__(other)
+
+    def __ne__(self, other) -> bool:
+        self.__decode_all()
+        return super().__ne__(other)
+
+    def __lt__(self, other) -> bool:
+        self.__decode_all()
+        return super().__lt__(other)
+
+    def __le__(self, other) -> bool:
+        self.__decode_all()
+        return super().__le__(other)
+
+    def __gt__(self, other) -> bool:
+        self.__decode_all()
+        return super().__gt__(other)
+
+    def __ge__(self, other) -> bool:
+        self.__decode_all()
+        return super().__ge__(other)
+
+    def __add__(self, other) -> list:
+        self.__decode_all()
+        return super().__add__(other)
+
+    def __mul__(self, n) -> list:
+        self.__decode_all()
+        return super().__mul__(n)
+
+    __rmul__ = __mul__
+
+    def __repr__(self) -> str:
+        self.__decode_all()
+        return super().__repr__()
+
+    def copy(self) -> list:
+        return list(self)
+
+    def count(self, completion_time) -> int:
+        return sum(1 for value in self if value == completion_time)
+
+    def index(self, completion_time, *args) -> int:
+        self.__decode_all()
+        return super().index(completion_time, *args)
+
+    def append(self, completion_time: datetime):
+        self.extend([completion_time])
+
+    def extend(self, completion_times):
+        completion_times = list(completion_times)
+        # Appending keeps the elements sorted if the new elements are sorted and follow the current last element
+        was_sorted = self.__sorted
+        previous = [self.__decode(-1)] if len(self) > 0 else []
+        self.__modified(len(self))
+        if was_sorted:
+            sequence = previous + completion_times
+            self.__sorted = all(
+                sequence[i] <= sequence[i + 1] for i in range(len(sequence) - 1)
+            )
+        if self.__encoded is not None:
+            if all(
+                completion_time.tzinfo is None for completion_time in completion_times
+            ):
+                self.__encoded.extend(
+                    completion_time.isoformat() for completion_time in completion_times
+                )
+            else:
+                # Encoded values with a time zone can't be compared as strings
+                self.__decode_all()
+                self.__encoded = None
+        super().extend(completion_times)
+
+    def __iadd__(self, completion_times):
+        self.extend(completion_times)
+        return self
+
+    def __setitem__(self, index, value):
+        self.__modified()
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self.__modified()
+        super().__delitem__(index)
+
+    def __imul__(self, n):
+        self.__modified()
+        return super().__imul__(n)
+
+    def insert(self, index, completion_time: datetime):
+        self.__modified()
+        super().insert(index, completion_time)
+
+    def remove(self, completion_time: datetime):
+        self.__modified()
+        super().remove(completion_time)
+
+    def pop(self, index=-1):
+        self.__modified()
+        return super().pop(index)
+
+    def clear(self):
+        self.__modified()
+        super().clear()
+
+    def sort(self, *args, **kwargs):
+        self.__modified()
+        super().sort(*args, **kwargs)
+
+    def reverse(self):
+        self.__modified()
+        super().reverse()
+
 
 class Habit:
     """
@@ -131,6 +375,39 @@ class Habit:
             )
         return periods
 
+    def get_period_index(self, start_time: datetime, target_time: datetime) -> int:
+        """
+        Get the index of the period in which the target time falls, counting the periods returned by
+        get_all_periods_since(start_time) from 0. The index is computed directly, without generating the periods in
+        between.
+        Args:
+            start_time: The time from which the periods are counted.
+            target_time: The time for which to determine the period index.
+
+        Returns:
+            The index of the period, which is negative if the target time lies before the first period.
+        """
+        first_start, _ = self.get_period_start_end(start_time)
+        match self.period:
+            case 'daily':
+                return (target_time.date() - first_start.date()).days
+            case 'weekly':
+                return (target_time - first_start) // timedelta(days=7)
+            case 'monthly':
+                return (target_time.year - first_start.year) * 12 + (
+                    target_time.month - first_start.month
+                )
+            case 'quarterly':
+                return (target_time.year - first_start.year) * 4 + (
+                    (target_time.month - 1) // 3 - (first_start.month - 1) // 3
+                )
+            case 'annually':
+                return target_time.year - first_start.year
+            case _:
+                raise ValueError(
+                    "Unsupported period type registered in habit (this should never happen)."
+                )
+
     def json(self):
         """
         Returns all values of the object in a json compatible format for easier storage
@@ -145,6 +422,50 @@ class Habit:
         }
 
 
+class CompletionArchive:
+    """
+    A summary of the completions of a UserHabit that were moved to the archive, covering all periods from the creation
+    of the UserHabit up to a period boundary. The summary holds everything needed to compute exact streaks, so the
+    archived completion times themselves never need to be loaded.
+    """
+
+    def __init__(
+        self,
+        archived_until: datetime,
+        period_count: int = 0,
+        completion_count: int = 0,
+        longest_streak: int = 0,
+        trailing_streak: int = 0,
+    ):
+        """
+        Args:
+            archived_until: The end of the last archived period. Completions before this time are archived.
+            period_count: The number of archived periods.
+            completion_count: The number of archived completions.
+            longest_streak: The longest streak of completed periods within the archived periods.
+            trailing_streak: The streak of completed periods ending with the last archived period.
+        """
+        self.archived_until = archived_until
+        self.period_count = period_count
+        self.completion_count = completion_count
+        self.longest_streak = longest_streak
+        self.trailing_streak = trailing_streak
+
+    def json(self) -> dict:
+        """
+        Returns all values of the object in a json compatible format for easier storage
+        Returns:
+            All value of the object in a json compatible format
+        """
+        return {
+            "archived_until": self.archived_until.isoformat(),
+            "period_count": self.period_count,
+            "completion_count": self.completion_count,
+            "longest_streak": self.longest_streak,
+            "trailing_streak": self.trailing_streak,
+        }
+
+
 class UserHabit:
     """
     A class to represent a habit being tracked by a user within the habit tracking app.
@@ -156,6 +477,7 @@ class UserHabit:
         userhabit_id: str = None,
         completion_times: list[datetime] = None,
         creation_time: datetime = None,
+        archive: CompletionArchive = None,
     ):
         """
         Args:
@@ -163,7 +485,11 @@ class UserHabit:
             userhabit_id: A unique identifier for the UserHabit object. If not provided, a random UUID is generated.
             completion_times: A list of datetime objects representing the times at which the habit was completed.
             creation_time: The time at which the UserHabit object was created. Defaults to the current time.
+            archive: The summary of archived completions, or None if no completions have been archived. Archived
+                completions are not part of completion_times.
         """
+        self.__encoded_completion_times = []
+        self.__json_cache = None
         self.habit = habit
         self.userhabit_id = (
             userhabit_id if userhabit_id is not None else uuid.uuid4().hex
@@ -172,6 +498,27 @@ class UserHabit:
         self.creation_time = (
             creation_time if creation_time is not None else datetime.now()
         )
+        self.archive = archive
+
+    def __setattr__(self, name, value):
+        if name == "completion_times":
+            if not isinstance(value, CompletionTimes):
+                value = CompletionTimes(value)
+            self.__encoded_completion_times = []
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            super().__setattr__("_UserHabit__attribute_version", next(_versions))
+
+    @property
+    def version(self) -> tuple[int, int]:
+        """
+        The version of the current state of the object. Any modification of the object, including modifications of its
+        completion times, results in a new version that no other object or state shares.
+        Note that modifications of the tracked Habit object itself are not covered, only replacing it.
+        Returns:
+            A tuple identifying the current state of the object.
+        """
+        return self.__attribute_version, self.completion_times.version
 
     def period_completed(self, period_start: datetime, period_end: datetime) -> bool:
         """
@@ -183,12 +530,7 @@ class UserHabit:
         Returns:
             True if the habit has been completed within the period, False otherwise.
         """
-        return any(
-            [
-                period_start <= completion_time < period_end
-                for completion_time in self.completion_times
-            ]
-        )
+        return self.completion_times.any_between(period_start, period_end)
 
     def track_completion(self, completion_time: datetime = None) -> bool:
         """
@@ -202,6 +544,9 @@ class UserHabit:
         completion_time = (
             completion_time if completion_time is not None else datetime.now()
         )
+        if self.archive is not None and completion_time < self.archive.archived_until:
+            # Archived periods are closed
+            return False
         period_start, period_end = self.habit.get_period_start_end(completion_time)
         if not self.period_completed(period_start, period_end):
             self.completion_times.append(completion_time)
@@ -212,27 +557,92 @@ class UserHabit:
     def get_completion_history(self) -> list[tuple[datetime, datetime, bool]]:
         """
         Get the completion history of the habit, including periods and whether the habit was completed in each period.
+        Archived periods are not included, see the archive attribute for their summary.
         Returns:
             A list of tuples, each containing the start and end times of a period, and a boolean indicating whether the
             habit was completed in that period.
         """
-        all_periods_since_creation = self.habit.get_all_periods_since(
-            self.creation_time
+        history_start = (
+            self.archive.archived_until
+            if self.archive is not None
+            else self.creation_time
         )
+        all_periods_since_start = self.habit.get_all_periods_since(history_start)
         return [
             (period_start, period_end, self.period_completed(period_start, period_end))
-            for period_start, period_end in all_periods_since_creation
+            for period_start, period_end in all_periods_since_start
         ]
 
+    def archive_completions(self, cutoff: datetime) -> list[datetime]:
+        """
+        Move the completions of all periods ending at or before the cutoff from completion_times into the archive
+        summary. Periods are only ever archived as a whole, so streaks stay exact.
+        Args:
+            cutoff: The time up to which completions should be archived.
+
+        Returns:
+            The completion times that were removed from completion_times, which should be kept in the archive storage.
+        """
+        archived_periods = [
+            (period_end, completed)
+            for _, period_end, completed in self.get_completion_history()
+            if period_end <= cutoff
+        ]
+        if len(archived_periods) == 0:
+            return []
+        archive = self.archive if self.archive is not None else CompletionArchive(None)
+        archived_until = archived_periods[-1][0]
+        longest_streak = archive.longest_streak
+        trailing_streak = archive.trailing_streak
+        for _, completed in archived_periods:
+            trailing_streak = trailing_streak + 1 if completed else 0
+            longest_streak = max(longest_streak, trailing_streak)
+        archived_times = [t for t in self.completion_times if t < archived_until]
+        self.archive = CompletionArchive(
+            archived_until=archived_until,
+            period_count=archive.period_count + len(archived_periods),
+            completion_count=archive.completion_count + len(archived_times),
+            longest_streak=longest_streak,
+            trailing_streak=trailing_streak,
+        )
+        self.completion_times = [
+            t for t in self.completion_times if t >= archived_until
+        ]
+        return archived_times
+
     def json(self) -> dict:
         """
         Returns all values of the object in a json compatible format for easier storage
         Returns:
             All value of the object in a json compatible format
         """
+        if self.__json_cache is not None and self.__json_cache[0] == self.version:
+            json_data = self.__json_cache[1]
+        else:
+            if self.completion_times.encoded is not None:
+                # Completion times which were never decoded don't need to be encoded either
+                self.__encoded_completion_times = list(self.completion_times.encoded)
+            else:
+                # Only completion times which changed since the last call need to be encoded again
+                unchanged = min(
+                    self.completion_times.modified_from,
+                    len(self.__encoded_completion_times),
+                )
+                del self.__encoded_completion_times[unchanged:]
+                self.__encoded_completion_times.extend(
+                    time.isoformat() for time in self.completion_times[unchanged:]
+                )
+            self.completion_times.mark_encoded()
+            json_data = {
+                "habit": self.habit.name,
+                "userhabit_id": self.userhabit_id,
+                "completion_times": self.__encoded_completion_times,
+                "creation_time": self.creation_time.isoformat(),
+            }
+            if self.archive is not None:
+                json_data["archive"] = self.archive.json()
+            self.__json_cache = (self.version, json_data)
         return {
-            "habit": self.habit.name,
-            "userhabit_id": self.userhabit_id,
-            "completion_times": [time.isoformat() for time in self.completion_times],
-            "creation_time": self.creation_time.isoformat(),
+            **json_data,
+            "completion_times": list(json_data["completion_times"]),
         }
@@ -0,0 +1,356 @@
+import asyncio
+import json
+import weakref
+from datetime import datetime
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from data_storage.async_adapter import AsyncStorageAdapter
+from data_storage.interface import StorageInterface
+from habit_analysis import analytics
+from habit_tracking.users import User
+
+# Requests with larger bodies are rejected, since no endpoint needs more than a few bytes
+MAX_BODY_SIZE = 64 * 1024
+
+
+class HttpError(Exception):
+    """
+    An error which is reported to the client with an HTTP status code and a JSON error message.
+    """
+
+    def __init__(self, status: HTTPStatus, message: str):
+        """
+        Args:
+            status: The HTTP status to respond with.
+            message: The error message to send to the client.
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class HabitTrackerServer:
+    """
+    A long-running HTTP server which keeps one data storage loaded and serves JSON endpoints for tracking completions,
+    listing habits and habit analytics. Only the standard library is used, with one asyncio task per connection.
+
+    All storage calls go through an AsyncStorageAdapter, so writes of concurrent clients are coalesced. Completions of
+    the same user are tracked one at a time, so concurrent requests never overwrite each other's completions.
+
+    Endpoints:
+        GET /habits[?period=<period>]: All habits, optionally only those with the given period.
+        GET /users/<username>/habits: The habits tracked by the user, with their current and longest streaks.
+        POST /users/<username>/habits/<habit name>/completions: Track a completion of a habit tracked by the user.
+            The body may contain {"time": "<ISO time>"}, the current time is used otherwise. Times with a UTC offset
+            are converted to local time, like all times stored by the habit tracker. Times in the future or before the
+            habit was started are rejected.
+        GET /users/<username>/analytics: The habits with the all-time and the current longest streak of the user.
+    """
+
+    def __init__(
+        self, storage: StorageInterface, host: str = "127.0.0.1", port: int = 8080
+    ):
+        """
+        Args:
+            storage: The data storage to serve.
+            host: The host to listen on. Defaults to localhost only.
+            port: The port to listen on, or 0 to pick a free port.
+        """
+        self.storage = AsyncStorageAdapter(storage)
+        self.host = host
+        self.port = port
+        self.__server = None
+        # Locks are only kept while a request of the user holds or waits for them, so they don't pile up per username
+        self.__user_locks = weakref.WeakValueDictionary()
+
+    async def start(self):
+        """
+        Start listening for connections. If port 0 was requested, the port attribute is set to the actual port.
+        Returns:
+            None
+        """
+        self.__server = await asyncio.start_server(
+            self.__handle_connection, self.host, self.port
+        )
+        self.port = self.__server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """
+        Start the server if needed, and serve connections until the server is closed.
+        Returns:
+            None
+        """
+        if self.__server is None:
+            await self.start()
+        async with self.__server:
+            await self.__server.serve_forever()
+
+    async def close(self):
+        """
+        Stop the server and wait for all pending storage operations to finish.
+        Returns:
+            None
+        """
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+        self.storage.close()
+
+    async def __handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """
+        Serve all requests of a single connection. Connections are kept alive unless the client asks otherwise.
+        Args:
+            reader: The stream to read requests from.
+            writer: The stream to write responses to.
+
+        Returns:
+            None
+        """
+        try:
+            while True:
+                request = await self.__read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                try:
+                    status, response = await self.__dispatch(method, target, body)
+                except HttpError as e:
+                    status, response = e.status, {"error": e.message}
+                except Exception as e:
+                    status, response = HTTPStatus.INTERNAL_SERVER_ERROR, {
+                        "error": str(e)
+                    }
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self.__write_response(writer, status, response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HttpError as e:
+            # The request could not be parsed, so the connection can't be reused
+            self.__write_response(writer, e.status, {"error": e.message}, False)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def __read_request(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[str, str, dict[str, str], bytes] | None:
+        """
+        Read a single HTTP request from a connection.
+        Args:
+            reader: The stream to read the request from.
+
+        Returns:
+            A tuple of the method, request target, headers (with lower case names) and body of the request, or None if
+            the client closed the connection.
+        """
+        request_line = await reader.readline()
+        if request_line == b"":
+            return None
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line.")
+        method, target, _ = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            content_length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length header.")
+        if content_length > MAX_BODY_SIZE:
+            raise HttpError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large."
+            )
+        body = await reader.readexactly(content_length)
+        return method, target, headers, body
+
+    def __write_response(
+        self,
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        response,
+        keep_alive: bool,
+    ):
+        """
+        Write a JSON response to a connection.
+        Args:
+            writer: The stream to write the response to.
+            status: The HTTP status of the response.
+            response: The JSON compatible response body.
+            keep_alive: Whether the connection stays open for further requests.
+
+        Returns:
+            None
+        """
+        body = json.dumps(response).encode()
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+    async def __dispatch(self, method: str, target: str, body: bytes) -> tuple:
+        """
+        Route a request to the matching endpoint.
+        Args:
+            method: The HTTP method of the request.
+            target: The request target, including the query string.
+            body: The body of the request.
+
+        Returns:
+            A tuple of the HTTP status and the JSON compatible response body.
+        """
+        url = urlsplit(target)
+        segments = [unquote(segment) for segment in url.path.strip("/").split("/")]
+        query = parse_qs(url.query)
+        match method, segments:
+            case "GET", ["habits"]:
+                return HTTPStatus.OK, await self.__list_habits(query)
+            case "GET", ["users", username, "habits"]:
+                return HTTPStatus.OK, await self.__list_user_habits(username)
+            case "POST", ["users", username, "habits", habit_name, "completions"]:
+                return await self.__track_completion(username, habit_name, body)
+            case "GET", ["users", username, "analytics"]:
+                return HTTPStatus.OK, await self.__get_analytics(username)
+            case _:
+                raise HttpError(HTTPStatus.NOT_FOUND, "Unknown endpoint.")
+
+    async def __get_user(self, username: str) -> User:
+        """
+        Retrieve a user from the data storage, reporting unknown users to the client.
+        Args:
+            username: The username of the user to retrieve.
+
+        Returns:
+            The User object.
+        """
+        user = await self.storage.get_user(username)
+        if user is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"User {username} not found.")
+        return user
+
+    async def __list_habits(self, query: dict[str, list[str]]) -> list[dict]:
+        """
+        List all habits, or all habits with the period given in the query.
+        Args:
+            query: The parsed query string of the request.
+
+        Returns:
+            The json of the habits.
+        """
+        if "period" in query:
+            habits = await self.storage.get_habits_by_period(query["period"][0])
+        else:
+            habits = await self.storage.get_all_habits()
+        return [habit.json() for habit in habits]
+
+    async def __list_user_habits(self, username: str) -> list[dict]:
+        """
+        List the habits tracked by a user with their streaks.
+        Args:
+            username: The username of the user.
+
+        Returns:
+            The json of the habits, each with its current and longest streak.
+        """
+        user = await self.__get_user(username)
+        return [
+            {
+                **user_habit.habit.json(),
+                "current_streak": analytics.get_current_streak_for_habit(user_habit),
+                "longest_streak": analytics.get_longest_streak_for_habit(user_habit),
+            }
+            for user_habit in user.habits
+        ]
+
+    async def __track_completion(
+        self, username: str, habit_name: str, body: bytes
+    ) -> tuple:
+        """
+        Track a completion of a habit tracked by a user.
+        Args:
+            username: The username of the user.
+            habit_name: The name of the habit.
+            body: The request body, optionally containing the completion time.
+
+        Returns:
+            A tuple of the HTTP status and the response body, which states whether the completion was tracked.
+        """
+        try:
+            payload = json.loads(body) if body.strip() != b"" else {}
+            completion_time = (
+                datetime.fromisoformat(payload["time"]) if "time" in payload else None
+            )
+        except (ValueError, TypeError) as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"Invalid request body: {e}")
+        if completion_time is not None and completion_time.tzinfo is not None:
+            # Stored times are naive local times, which can't be compared with aware ones
+            completion_time = completion_time.astimezone().replace(tzinfo=None)
+        lock = self.__user_locks.get(username)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.__user_locks[username] = lock
+        async with lock:
+            user = await self.__get_user(username)
+            user_habit = next(
+                (uh for uh in user.habits if uh.habit.name == habit_name), None
+            )
+            if user_habit is None:
+                raise HttpError(
+                    HTTPStatus.NOT_FOUND,
+                    f"Habit {habit_name} is not tracked by user {username}.",
+                )
+            # Completions in the future or before the habit was started are rejected, like in the interactive menu
+            if completion_time is not None and completion_time > datetime.now():
+                raise HttpError(
+                    HTTPStatus.BAD_REQUEST, "Completion time is in the future."
+                )
+            if (
+                completion_time is not None
+                and completion_time < user_habit.creation_time
+            ):
+                raise HttpError(
+                    HTTPStatus.BAD_REQUEST,
+                    "Completion time is before the habit was started.",
+                )
+            tracked = user_habit.track_completion(completion_time)
+            if tracked:
+                await self.storage.update_user_habit(user_habit)
+        return (HTTPStatus.CREATED if tracked else HTTPStatus.OK), {"tracked": tracked}
+
+    async def __get_analytics(self, username: str) -> dict:
+        """
+        Get the habits with the all-time and the current longest streak of a user.
+        Args:
+            username: The username of the user.
+
+        Returns:
+            The name and streak of both habits, with a name of None if the user has no streaks.
+        """
+        user = await self.__get_user(username)
+        longest_habit, longest_streak = analytics.get_all_time_longest_habit_streak(
+            user
+        )
+        current_habit, current_streak = analytics.get_current_longest_habit_streak(user)
+        return {
+            "longest_streak": {
+                "habit": longest_habit.name if longest_habit is not None else None,
+                "streak": longest_streak,
+            },
+            "current_longest_streak": {
+                "habit": current_habit.name if current_habit is not None else None,
+                "streak": current_streak,
+            },
+        }
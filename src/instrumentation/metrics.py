@@ -0,0 +1,393 @@
+import functools
+import importlib
+import inspect
+import json
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+# Upper bounds of the latency histogram buckets in seconds
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Modules with storage interfaces, whose public methods are instrumented
+STORAGE_MODULES = (
+    "data_storage.cached",
+    "data_storage.event_sourced",
+    "data_storage.json",
+    "data_storage.lazy",
+    "data_storage.memory",
+    "data_storage.sharded",
+)
+
+
+class Histogram:
+    """
+    A latency histogram with fixed buckets, like a Prometheus histogram. Each observation is counted in the first
+    bucket whose upper bound it doesn't exceed, or in an overflow bucket.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        """
+        Args:
+            buckets: The upper bounds of the buckets in seconds, in increasing order.
+        """
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """
+        Record an observation.
+        Args:
+            value: The observed value in seconds.
+
+        Returns:
+            None
+        """
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> list[tuple[float, int]]:
+        """
+        Get the number of observations up to each bucket bound, including the overflow bucket as infinity.
+        Returns:
+            A list of (upper bound, number of observations less than or equal to the bound) tuples.
+        """
+        cumulative_counts = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.bucket_counts):
+            total += count
+            cumulative_counts.append((bound, total))
+        return cumulative_counts
+
+    def json(self) -> dict:
+        """
+        Returns all values of the object in a json compatible format for easier storage
+        Returns:
+            All value of the object in a json compatible format
+        """
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {
+                "+Inf" if bound == float("inf") else str(bound): count
+                for bound, count in self.cumulative_counts()
+            },
+        }
+
+
+class Metrics:
+    """
+    Opt-in instrumentation of the storage, period and analytics code.
+
+    While disabled, nothing is instrumented at all, so there is no overhead. Enabling the metrics replaces the
+    instrumented functions and methods with wrappers recording the number of calls and a latency histogram per
+    function, as well as the bytes read and written by the JSON storage files. Disabling the metrics restores the
+    original functions. Call counts are the counts of the latency histograms. For iterator methods, only the creation
+    of the iterator is timed.
+    """
+
+    def __init__(self):
+        self.latencies = {}
+        self.bytes_read = {}
+        self.bytes_written = {}
+        self.__lock = threading.Lock()
+        self.__patches = []
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether the metrics are currently being recorded.
+        """
+        return len(self.__patches) > 0
+
+    def observe_call(self, name: str, seconds: float):
+        """
+        Record a call of an instrumented function.
+        Args:
+            name: The name of the function.
+            seconds: The duration of the call.
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            if name not in self.latencies:
+                self.latencies[name] = Histogram()
+            self.latencies[name].observe(seconds)
+
+    def add_bytes(self, counters: dict, name: str, count: int):
+        """
+        Add to a byte counter.
+        Args:
+            counters: The counters to add to, either bytes_read or bytes_written.
+            name: The name of the function that read or wrote the bytes.
+            count: The number of bytes.
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            counters[name] = counters.get(name, 0) + count
+
+    def reset(self):
+        """
+        Discard all recorded metrics.
+        Returns:
+            None
+        """
+        with self.__lock:
+            self.latencies.clear()
+            self.bytes_read.clear()
+            self.bytes_written.clear()
+
+    def instrument(
+        self,
+        owner,
+        attribute: str,
+        name: str,
+        file_size_counters: dict = None,
+    ):
+        """
+        Replace a function or method with a wrapper recording its calls.
+        Args:
+            owner: The module or class the function is an attribute of.
+            attribute: The attribute name of the function.
+            name: The name to record the calls under.
+            file_size_counters: A byte counter to add the size of a file to after each call, either bytes_read or
+                bytes_written. The path of the file is the "file_path" argument of the call, or the file_path attribute
+                of the object the method is called on.
+
+        Returns:
+            None
+        """
+        original = inspect.getattr_static(owner, attribute)
+        if isinstance(original, (staticmethod, classmethod)):
+            return
+        # Methods inherited from an instrumented class are instrumented again, without recording the call twice
+        original = getattr(original, "uninstrumented", original)
+        owned = attribute in vars(owner)
+        signature = inspect.signature(original)
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.observe_call(name, perf_counter() - start)
+                if file_size_counters is not None:
+                    arguments = signature.bind(*args, **kwargs).arguments
+                    file_path = arguments.get(
+                        "file_path", getattr(arguments.get("self"), "file_path", None)
+                    )
+                    if file_path is not None and os.path.exists(file_path):
+                        self.add_bytes(
+                            file_size_counters, name, os.path.getsize(file_path)
+                        )
+
+        wrapper.uninstrumented = original
+        setattr(owner, attribute, wrapper)
+        self.__patches.append((owner, attribute, original, owned))
+
+    def enable(self):
+        """
+        Start recording metrics, by instrumenting all public methods of the storage interfaces, the loading and saving
+        of JSON storage files, the completion history of tracked habits and all analytics functions.
+        Does nothing if the metrics are already enabled.
+        Returns:
+            None
+        """
+        if self.enabled:
+            return
+        # Imported here, so the metrics can be imported without loading the instrumented code
+        for module_name in STORAGE_MODULES:
+            importlib.import_module(module_name)
+        from data_storage.interface import StorageInterface
+        from data_storage.json import JsonStorageInterface
+        from habit_analysis import analytics
+        from habit_tracking.habits import UserHabit
+
+        method_names = [
+            attribute
+            for attribute, value in vars(StorageInterface).items()
+            if not attribute.startswith("_") and callable(value)
+        ]
+        storage_classes = []
+        pending_classes = [StorageInterface]
+        while len(pending_classes) > 0:
+            storage_class = pending_classes.pop()
+            storage_classes.extend(storage_class.__subclasses__())
+            pending_classes.extend(storage_class.__subclasses__())
+        for storage_class in storage_classes:
+            for method_name in method_names:
+                self.instrument(
+                    storage_class,
+                    method_name,
+                    f"storage.{storage_class.__name__}.{method_name}",
+                )
+        self.instrument(
+            JsonStorageInterface,
+            "_JsonStorageInterface__load_json",
+            "storage.JsonStorageInterface.load",
+            self.bytes_read,
+        )
+        self.instrument(
+            JsonStorageInterface,
+            "_JsonStorageInterface__write_file",
+            "storage.JsonStorageInterface.write_file",
+            self.bytes_written,
+        )
+        self.instrument(
+            JsonStorageInterface,
+            "_JsonStorageInterface__save_json",
+            "storage.JsonStorageInterface.save",
+        )
+        self.instrument(
+            UserHabit,
+            "get_completion_history",
+            "habits.UserHabit.get_completion_history",
+        )
+        for function_name, function in list(vars(analytics).items()):
+            if (
+                inspect.isfunction(function)
+                and function.__module__ == analytics.__name__
+            ):
+                self.instrument(analytics, function_name, f"analytics.{function_name}")
+
+    def disable(self):
+        """
+        Stop recording metrics and restore all instrumented functions. The recorded metrics are kept.
+        Returns:
+            None
+        """
+        while len(self.__patches) > 0:
+            owner, attribute, original, owned = self.__patches.pop()
+            if owned:
+                setattr(owner, attribute, original)
+            else:
+                delattr(owner, attribute)
+
+    def json(self) -> dict:
+        """
+        Returns all values of the object in a json compatible format for easier storage
+        Returns:
+            All value of the object in a json compatible format
+        """
+        with self.__lock:
+            return {
+                "latencies": {
+                    name: histogram.json()
+                    for name, histogram in sorted(self.latencies.items())
+                },
+                "bytes_read": dict(sorted(self.bytes_read.items())),
+                "bytes_written": dict(sorted(self.bytes_written.items())),
+            }
+
+    def prometheus(self) -> str:
+        """
+        Format the metrics in the Prometheus text exposition format.
+        Returns:
+            The metrics as text, ending with a newline.
+        """
+        lines = [
+            "# HELP habit_tracker_call_duration_seconds Duration of calls of instrumented functions.",
+            "# TYPE habit_tracker_call_duration_seconds histogram",
+        ]
+        with self.__lock:
+            for name, histogram in sorted(self.latencies.items()):
+                label = f'function="{escape_label_value(name)}"'
+                for bound, count in histogram.cumulative_counts():
+                    bound_text = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        f'habit_tracker_call_duration_seconds_bucket{{{label},le="{bound_text}"}} {count}'
+                    )
+                lines.append(
+                    f"habit_tracker_call_duration_seconds_sum{{{label}}} {histogram.sum!r}"
+                )
+                lines.append(
+                    f"habit_tracker_call_duration_seconds_count{{{label}}} {histogram.count}"
+                )
+            for metric, description, counters in (
+                ("bytes_read", "Bytes read from storage files.", self.bytes_read),
+                (
+                    "bytes_written",
+                    "Bytes written to storage files.",
+                    self.bytes_written,
+                ),
+            ):
+                lines.append(f"# HELP habit_tracker_{metric}_total {description}")
+                lines.append(f"# TYPE habit_tracker_{metric}_total counter")
+                for name, count in sorted(counters.items()):
+                    lines.append(
+                        f'habit_tracker_{metric}_total{{function="{escape_label_value(name)}"}} {count}'
+                    )
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path: str):
+        """
+        Write the metrics to a file, in the Prometheus text format for files ending in ".prom" or ".txt", and as JSON
+        otherwise.
+        Args:
+            file_path: The path of the file to write.
+
+        Returns:
+            None
+        """
+        if file_path.endswith((".prom", ".txt")):
+            content = self.prometheus()
+        else:
+            content = json.dumps(self.json(), indent=2)
+        with open(file_path, 'w') as fp:
+            fp.write(content)
+
+
+def escape_label_value(value: str) -> str:
+    """
+    Escape a label value for the Prometheus text format.
+    Args:
+        value: The label value.
+
+    Returns:
+        The escaped label value.
+    """
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# The metrics of the running program
+metrics = Metrics()
+
+
+def export_metrics_at_exit(file_path: str, instrumented_metrics: Metrics = metrics):
+    """
+    Enable the metrics and write them to a file when the program exits. See Metrics.write for the file formats.
+    Args:
+        file_path: The path of the file to write.
+        instrumented_metrics: The metrics to enable and write.
+
+    Returns:
+        None
+    """
+    import atexit
+
+    instrumented_metrics.enable()
+    atexit.register(instrumented_metrics.write, file_path)
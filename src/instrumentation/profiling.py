@@ -0,0 +1,185 @@
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+
+# The packages of the habit tracker, by which allocation sites are grouped
+PACKAGES = (
+    "habit_tracking",
+    "habit_analysis",
+    "data_storage",
+    "cli_menu",
+    "http_api",
+    "benchmarks",
+    "instrumentation",
+)
+# The directory containing the packages
+SOURCE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Profiler:
+    """
+    Profiles CPU time with cProfile and memory allocations with tracemalloc, from start() until report().
+
+    cProfile only covers the thread that started the profiler. Allocations are attributed to the innermost frame of
+    their traceback within one of the habit tracker packages, so e.g. the memory allocated by json.loads is attributed
+    to the storage code calling it. Allocations made outside of the packages are grouped as "other".
+    """
+
+    def __init__(self, traceback_frames: int = 25):
+        """
+        Args:
+            traceback_frames: The number of frames stored per allocation, which limits how far allocations made deep in
+                the standard library can be traced back to the packages.
+        """
+        self.traceback_frames = traceback_frames
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        """
+        Start profiling.
+        Returns:
+            None
+        """
+        tracemalloc.start(self.traceback_frames)
+        self.profile.enable()
+
+    def stop(self):
+        """
+        Stop profiling. Allocations which are still alive are kept for the report.
+        Returns:
+            None
+        """
+        self.profile.disable()
+
+    @staticmethod
+    def get_package(filename: str) -> str | None:
+        """
+        Get the habit tracker package a source file belongs to.
+        Args:
+            filename: The path of the source file.
+
+        Returns:
+            The name of the package, or None if the file is not part of a package.
+        """
+        relative_path = os.path.relpath(filename, SOURCE_DIRECTORY)
+        package = relative_path.split(os.sep)[0]
+        return package if package in PACKAGES else None
+
+    def get_allocation_sites(self) -> dict[str, dict]:
+        """
+        Group the memory that is currently allocated by package and allocation site.
+        Returns:
+            A dictionary mapping each package (or "other") to its total "size" in bytes, the "count" of its allocated
+            memory blocks and the size of each allocation "site" ("<file>:<line>").
+        """
+        snapshot = tracemalloc.take_snapshot()
+        packages = {}
+        # Packages of the source files, which are looked up once per file instead of once per frame
+        file_packages = {}
+        # Grouping by traceback first is much faster than going through the individual memory blocks
+        for statistic in snapshot.statistics("traceback"):
+            package, site = "other", None
+            # Frames are ordered from the oldest to the most recent call
+            for frame in reversed(statistic.traceback):
+                if frame.filename not in file_packages:
+                    file_packages[frame.filename] = self.get_package(frame.filename)
+                if file_packages[frame.filename] is not None:
+                    package = file_packages[frame.filename]
+                    site = f"{os.path.relpath(frame.filename, SOURCE_DIRECTORY)}:{frame.lineno}"
+                    break
+            if site is None:
+                frame = statistic.traceback[-1]
+                site = f"{frame.filename}:{frame.lineno}"
+            group = packages.setdefault(package, {"size": 0, "count": 0, "sites": {}})
+            group["size"] += statistic.size
+            group["count"] += statistic.count
+            group["sites"][site] = group["sites"].get(site, 0) + statistic.size
+        return packages
+
+    def report(self, top: int = 30) -> str:
+        """
+        Stop profiling and create a report of the top functions by cumulative time, the current and peak traced memory,
+        and the allocation sites of the currently allocated memory grouped by package.
+        Args:
+            top: The number of functions, and of allocation sites per package, to include.
+
+        Returns:
+            The report as text.
+        """
+        self.stop()
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+        allocation_sites = self.get_allocation_sites()
+        tracemalloc.stop()
+
+        output = io.StringIO()
+        output.write(f"=== Top {top} functions by cumulative time ===\n")
+        stats = pstats.Stats(self.profile, stream=output)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        output.write("=== Memory ===\n")
+        output.write(f"Peak traced memory: {format_size(peak_memory)}\n")
+        output.write(f"Traced memory at exit: {format_size(current_memory)}\n\n")
+        output.write("=== Allocated memory at exit by package ===\n")
+        for package, group in sorted(
+            allocation_sites.items(), key=lambda item: item[1]["size"], reverse=True
+        ):
+            output.write(
+                f"{package}: {format_size(group['size'])} in {group['count']} blocks\n"
+            )
+            sites = sorted(
+                group["sites"].items(), key=lambda item: item[1], reverse=True
+            )
+            for site, size in sites[:top]:
+                output.write(f"    {format_size(size):>10}  {site}\n")
+        return output.getvalue()
+
+    def write_report(self, file_path: str, top: int = 30):
+        """
+        Write the report to a file, and the raw cProfile statistics next to it with the extension ".pstats", e.g. for
+        viewing them in a profile visualizer.
+        Args:
+            file_path: The path of the report file.
+            top: The number of functions, and of allocation sites per package, to include.
+
+        Returns:
+            None
+        """
+        report = self.report(top)
+        with open(file_path, 'w') as fp:
+            fp.write(report)
+        self.profile.dump_stats(f"{os.path.splitext(file_path)[0]}.pstats")
+
+
+def format_size(size: int) -> str:
+    """
+    Format a number of bytes with a unit that fits its magnitude.
+    Args:
+        size: The number of bytes.
+
+    Returns:
+        The formatted size, e.g. "1.5 MiB".
+    """
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def profile_until_exit(file_path: str, top: int = 30) -> Profiler:
+    """
+    Start profiling, and write the report to a file when the program exits. See Profiler.write_report.
+    Args:
+        file_path: The path of the report file.
+        top: The number of functions, and of allocation sites per package, to include.
+
+    Returns:
+        The running profiler.
+    """
+    import atexit
+
+    profiler = Profiler()
+    profiler.start()
+    atexit.register(profiler.write_report, file_path, top)
+    return profiler
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from habit_analysis.analytics import (
     get_all_time_longest_habit_streak,
@@ -226,3 +226,30 @@ def test_get_all_time_longest_habit_streak_with_ties(user):
     habit_with_longest_streak, streak = get_all_time_longest_habit_streak(user)
     assert streak == 25
     assert habit_with_longest_streak.name in ['Morning Exercise', 'Another Habit']
+
+
+def test_streaks_are_exact_after_archiving():
+    habit = Habit("Stretch", "Stretch for 5 minutes", "daily", datetime(2024, 1, 1))
+    # Completed on every day except for every 7th day, and a long streak in March
+    completion_times = [
+        datetime(2024, 1, 1, 8) + timedelta(days=day)
+        for day in range(120)
+        if day % 7 != 6 or 60 <= day < 90
+    ]
+    # Ensure the live tail contains an unbroken streak up to now
+    completion_times += [
+        datetime(2024, 1, 1, 8) + timedelta(days=day)
+        for day in range(120, (datetime.now() - datetime(2024, 1, 1)).days + 1)
+    ]
+    user_habit = UserHabit(habit=habit, completion_times=completion_times)
+    user_habit.creation_time = datetime(2024, 1, 1)
+    expected_longest = get_longest_streak_for_habit(user_habit)
+    expected_current = get_current_streak_for_habit(user_habit)
+
+    for cutoff in [datetime(2024, 2, 1), datetime(2024, 3, 15), datetime(2024, 4, 20)]:
+        user_habit.archive_completions(cutoff)
+        assert get_longest_streak_for_habit(user_habit) == expected_longest
+        assert get_current_streak_for_habit(user_habit) == expected_current
+    assert user_habit.archive.completion_count + len(
+        user_habit.completion_times
+    ) == len(completion_times)
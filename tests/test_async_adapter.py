@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+
+from data_storage.async_adapter import AsyncStorageAdapter
+from data_storage.json import JsonStorageInterface
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return JsonStorageInterface(str(tmp_path / "test_data.json"))
+
+
+@pytest.fixture
+def adapter(storage):
+    adapter = AsyncStorageAdapter(storage)
+    yield adapter
+    adapter.close()
+
+
+def count_calls(monkeypatch, storage, method_name):
+    calls = []
+    original = getattr(storage, method_name)
+
+    def wrapper(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(storage, method_name, wrapper)
+    return calls
+
+
+def test_basic_operations(adapter):
+    async def run():
+        habit = Habit(
+            name="Exercise",
+            task_description="Do 30 minutes of exercise",
+            period="daily",
+        )
+        assert await adapter.insert_habit(habit) == True
+        assert await adapter.insert_habit(habit) == False
+        user = User(username="test_user")
+        user_habit = user.add_habit(habit)
+        assert await adapter.insert_user_habit(user_habit) == True
+        assert await adapter.insert_user(user) == True
+        retrieved_user = await adapter.get_user("test_user")
+        assert retrieved_user.habits[0].habit.name == "Exercise"
+        assert [h.name async for h in adapter.iter_habits()] == ["Exercise"]
+        assert await adapter.delete_user(user) == True
+        assert await adapter.get_user("test_user") is None
+
+    asyncio.run(run())
+
+
+def test_concurrent_inserts_are_coalesced(adapter, storage, monkeypatch):
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    storage.insert_habit(habit)
+    bulk_calls = count_calls(monkeypatch, storage, "insert_user_habits")
+    user_habits = [UserHabit(habit=habit) for _ in range(10)]
+
+    async def run():
+        return await asyncio.gather(
+            *(adapter.insert_user_habit(user_habit) for user_habit in user_habits)
+        )
+
+    assert asyncio.run(run()) == [True] * 10
+    # All inserts were queued before the executor picked them up, so they are combined
+    assert len(bulk_calls) == 1
+    assert len(bulk_calls[0][0]) == 10
+    assert len(storage.get_all_user_habits()) == 10
+
+
+def test_concurrent_updates_of_same_record_are_coalesced(adapter, storage, monkeypatch):
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    storage.insert_habit(habit)
+    update_calls = count_calls(monkeypatch, storage, "update_habit")
+
+    async def run():
+        return await asyncio.gather(*(adapter.update_habit(habit) for _ in range(10)))
+
+    assert asyncio.run(run()) == [True] * 10
+    assert len(update_calls) == 1
+
+
+def test_operations_keep_their_order(adapter):
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+
+    async def run():
+        return await asyncio.gather(
+            adapter.get_habit("Exercise"),
+            adapter.insert_habit(habit),
+            adapter.get_habit("Exercise"),
+            adapter.delete_habit(habit),
+            adapter.get_habit("Exercise"),
+        )
+
+    before, inserted, during, deleted, after = asyncio.run(run())
+    assert before is None
+    assert inserted == True
+    assert during.name == "Exercise"
+    assert deleted == True
+    assert after is None
+
+
+def test_exceptions_are_propagated(adapter, storage, monkeypatch):
+    def failing_get_habit(name):
+        raise OSError("disk failure")
+
+    monkeypatch.setattr(storage, "get_habit", failing_get_habit)
+
+    async def run():
+        await adapter.get_habit("Exercise")
+
+    with pytest.raises(OSError):
+        asyncio.run(run())
+
+
+def test_concurrent_user_habit_updates_use_bulk_update(adapter, storage, monkeypatch):
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    storage.insert_habit(habit)
+    user_habits = [UserHabit(habit=habit) for _ in range(5)]
+    storage.insert_user_habits(user_habits)
+    bulk_calls = count_calls(monkeypatch, storage, "update_user_habits")
+
+    async def run():
+        return await asyncio.gather(
+            *(adapter.update_user_habit(user_habit) for user_habit in user_habits * 2)
+        )
+
+    assert asyncio.run(run()) == [True] * 10
+    assert len(bulk_calls) == 1
+    assert len(bulk_calls[0][0]) == 5
+
+
+def test_executor_errors_are_propagated(adapter):
+    adapter.close()
+
+    async def run():
+        # The executor was shut down, so the operations can't be run at all
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(adapter.get_all_habits(), 1)
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(adapter.get_user("test_user"), 1)
+
+    asyncio.run(run())
@@ -0,0 +1,181 @@
+import argparse
+import json
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+from cli_menu.batch_commands import run_batch_command
+from cli_menu.batch_parser import add_batch_commands
+from data_storage.event_sourced import EventSourcedStorage
+from data_storage.json import JsonStorageInterface
+from habit_tracking.habits import Habit
+from habit_tracking.users import User
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = JsonStorageInterface(str(tmp_path / "test_data.json"))
+    user = User(username="test_user")
+    for name, period in [("Exercise", "daily"), ("Meal Planning", "weekly")]:
+        habit = Habit(name, name, period, datetime(2024, 1, 1))
+        storage.insert_habit(habit)
+        user_habit = user.add_habit(habit)
+        user_habit.creation_time = datetime(2024, 1, 1)
+        storage.insert_user_habit(user_habit)
+    storage.insert_user(user)
+    return storage
+
+
+def run(storage, capsys, *argv):
+    parser = argparse.ArgumentParser()
+    add_batch_commands(parser)
+    exit_code = run_batch_command(storage, parser.parse_args(argv))
+    out, err = capsys.readouterr()
+    return exit_code, json.loads(out if exit_code == 0 else err)
+
+
+def test_track_writes_once(storage, capsys, monkeypatch):
+    calls = []
+    update_user_habits = storage.update_user_habits
+    monkeypatch.setattr(
+        storage,
+        "update_user_habits",
+        lambda user_habits: calls.append(user_habits)
+        or update_user_habits(user_habits),
+    )
+    exit_code, result = run(
+        storage,
+        capsys,
+        "track",
+        "test_user",
+        "--habit",
+        "Exercise",
+        "--habit",
+        "Meal Planning",
+        "--date",
+        "2024-01-02",
+        "--date",
+        "2024-01-03",
+        "--date",
+        "2023-12-31",
+    )
+    assert exit_code == 0
+    # Both dates fall into the same week, and the last date is before the habits were started
+    assert result["tracked"] == 3
+    assert [r["tracked"] for r in result["results"]] == [
+        True,
+        True,
+        False,
+        True,
+        False,
+        False,
+    ]
+    assert "error" in result["results"][2]
+    assert len(calls) == 1
+    assert len(calls[0]) == 2
+    stored_user = JsonStorageInterface(storage.file_path).get_user("test_user")
+    assert len(stored_user.habits[0].completion_times) == 2
+
+
+def test_track_unknown_habit(storage, capsys):
+    exit_code, result = run(storage, capsys, "track", "test_user", "--habit", "Read")
+    assert exit_code == 1
+    assert "Read" in result["error"]
+
+
+def test_track_time_with_utc_offset(storage, capsys):
+    time = datetime(2024, 2, 1, 8).astimezone()
+    exit_code, result = run(
+        storage,
+        capsys,
+        "track",
+        "test_user",
+        "--habit",
+        "Exercise",
+        "--date",
+        time.isoformat(),
+    )
+    assert exit_code == 0
+    assert result["tracked"] == 1
+    stored_user = JsonStorageInterface(storage.file_path).get_user("test_user")
+    assert stored_user.habits[0].completion_times == [time.replace(tzinfo=None)]
+
+
+def test_list(storage, capsys):
+    _, habits = run(storage, capsys, "list")
+    assert [habit["name"] for habit in habits] == ["Exercise", "Meal Planning"]
+    _, habits = run(storage, capsys, "list", "--period", "weekly")
+    assert [habit["name"] for habit in habits] == ["Meal Planning"]
+    _, habits = run(storage, capsys, "list", "--user", "test_user", "--period", "daily")
+    assert [habit["name"] for habit in habits] == ["Exercise"]
+    with pytest.raises(SystemExit):
+        run(storage, capsys, "list", "--period", "bogus")
+
+
+def test_streaks_and_report(storage, capsys):
+    run(
+        storage,
+        capsys,
+        "track",
+        "test_user",
+        "--habit",
+        "Exercise",
+        "--date",
+        "2024-01-02",
+        "--date",
+        "2024-01-03",
+    )
+    _, streaks = run(storage, capsys, "streaks", "test_user", "--period", "daily")
+    assert streaks == [
+        {
+            "habit": "Exercise",
+            "period": "daily",
+            "current_streak": 0,
+            "longest_streak": 2,
+        }
+    ]
+    exit_code, report = run(storage, capsys, "report", "test_user")
+    assert exit_code == 0
+    assert report["longest_streak"] == {"habit": "Exercise", "streak": 2}
+    assert len(report["habits"]) == 2
+    exit_code, _ = run(storage, capsys, "report", "unknown_user")
+    assert exit_code == 1
+
+
+def test_streaks_from_event_log(storage, capsys, tmp_path):
+    event_sourced_storage = EventSourcedStorage(storage, str(tmp_path / "events.jsonl"))
+    today = datetime.now().strftime("%Y-%m-%d")
+    run(
+        event_sourced_storage,
+        capsys,
+        "track",
+        "test_user",
+        "--habit",
+        "Exercise",
+        "--habit",
+        "Meal Planning",
+        "--date",
+        "2024-01-02",
+        "--date",
+        today,
+    )
+    # The streaks looked up in the projections match the streaks computed from the completion history
+    _, report = run(event_sourced_storage, capsys, "report", "test_user")
+    _, expected_report = run(storage, capsys, "report", "test_user")
+    assert report == expected_report
+    assert report["current_longest_streak"] == {"habit": "Exercise", "streak": 1}
+    assert event_sourced_storage.projections.get_habit_total("Exercise") == 2
+
+
+def test_parser_does_not_import_commands():
+    # Registering the subcommands must not load the analytics, which would slow down starting the interactive menu
+    code = (
+        "import sys\n"
+        "sys.path.insert(0, 'src')\n"
+        "import cli_menu.batch_parser\n"
+        "assert 'habit_analysis.analytics' not in sys.modules\n"
+        "assert 'cli_menu.batch_commands' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,136 @@
+import time
+
+from benchmarks.runner import (
+    Benchmark,
+    compare_metadata,
+    compare_results,
+    format_duration,
+    measure,
+    run_benchmarks,
+)
+from benchmarks.suite import get_benchmarks
+
+
+def results(**ranges):
+    return {
+        "metadata": {},
+        "benchmarks": {
+            name: {"min": minimum, "max": maximum}
+            for name, (minimum, maximum) in ranges.items()
+        },
+    }
+
+
+def test_measure():
+    calls = []
+    timings = measure(Benchmark("test", lambda: lambda: calls.append(1)), 3, 0.001)
+    assert timings["repeat"] == 3
+    assert timings["loops"] > 1
+    assert len(calls) >= 3 * timings["loops"]
+    assert timings["min"] <= timings["median"] <= timings["max"]
+
+
+def test_measure_with_setup_per_call():
+    setups = []
+
+    def setup():
+        setups.append(1)
+        return lambda: None
+
+    timings = measure(Benchmark("test", setup, setup_per_call=True), 4)
+    # One more setup for the warm-up measurement
+    assert len(setups) == 5
+    assert timings["loops"] == 1
+
+
+def test_measure_discards_warmup():
+    durations = iter([0.05] + [0.001] * 10)
+
+    def setup():
+        return lambda: time.sleep(next(durations))
+
+    timings = measure(Benchmark("test", setup, setup_per_call=True), 3, warmup=1)
+    assert timings["warmup"] == 1
+    assert timings["max"] < 0.05
+    timings = measure(Benchmark("test", setup, setup_per_call=True), 3, warmup=0)
+    assert timings["repeat"] == 3
+
+
+def test_run_benchmarks():
+    benchmarks = [
+        Benchmark("a.fast", lambda: lambda: None),
+        Benchmark("b.fast", lambda: lambda: None),
+        Benchmark("b.other", lambda: lambda: None),
+    ]
+    progress = []
+    run = run_benchmarks(
+        benchmarks,
+        repeat=1,
+        min_time=0.001,
+        name_filter="b.",
+        progress=lambda name, timings: progress.append(name),
+    )
+    assert list(run["benchmarks"]) == ["b.fast", "b.other"]
+    assert progress == ["b.fast", "b.other"]
+    assert "python" in run["metadata"]
+
+
+def test_compare_results():
+    baseline = results(slower=(1.0, 1.1), faster=(1.0, 1.1), same=(1.0, 1.1))
+    current = results(
+        slower=(1.5, 1.6), faster=(0.5, 0.6), same=(1.05, 1.1), added=(1.0, 1.0)
+    )
+    comparison = {entry["name"]: entry for entry in compare_results(baseline, current)}
+    assert comparison["slower"]["status"] == "regression"
+    assert comparison["slower"]["ratio"] == 1.5
+    assert comparison["faster"]["status"] == "improvement"
+    assert comparison["same"]["status"] == "unchanged"
+    assert comparison["added"]["status"] == "new"
+    assert comparison["added"]["baseline"] is None
+    # The threshold decides what counts as a change
+    comparison = compare_results(baseline, current, threshold=1.0)
+    assert all(entry["status"] in ("unchanged", "new") for entry in comparison)
+
+
+def test_compare_results_ignores_overlapping_ranges():
+    # The minimum got slower, but it is within the noise of the baseline measurements
+    baseline = results(noisy=(1.0, 2.0))
+    current = results(noisy=(1.5, 1.6))
+    assert compare_results(baseline, current)[0]["status"] == "unchanged"
+    current = results(noisy=(0.5, 1.2))
+    assert compare_results(baseline, current)[0]["status"] == "unchanged"
+    # Baselines without a maximum are compared on the minimum alone
+    baseline = {"metadata": {}, "benchmarks": {"noisy": {"min": 1.0}}}
+    current = results(noisy=(1.5, 1.6))
+    assert compare_results(baseline, current)[0]["status"] == "regression"
+
+
+def test_compare_metadata():
+    baseline = {"metadata": {"python": "3.11.4", "platform": "Linux", "time": "a"}}
+    current = {"metadata": {"python": "3.11.4", "platform": "Linux", "time": "b"}}
+    assert compare_metadata(baseline, current) == []
+    current["metadata"]["python"] = "3.12.0"
+    warnings = compare_metadata(baseline, current)
+    assert len(warnings) == 1
+    assert "3.11.4" in warnings[0] and "3.12.0" in warnings[0]
+
+
+def test_format_duration():
+    assert format_duration(2.5) == "2.5 s"
+    assert format_duration(0.0123) == "12.3 ms"
+    assert format_duration(0.0000042) == "4.2 us"
+    assert format_duration(0.0000000042) == "4.2 ns"
+
+
+def test_suite(tmp_path):
+    benchmarks = get_benchmarks(str(tmp_path), quick=True)
+    names = [benchmark.name for benchmark in benchmarks]
+    assert len(names) == len(set(names))
+    for prefix in ("periods.", "history.", "streak.", "storage.load.", "storage.save."):
+        assert any(name.startswith(prefix) for name in names)
+    assert "storage.load.1000_users" not in names
+    assert "storage.load.1000_users" in [
+        benchmark.name for benchmark in get_benchmarks(str(tmp_path))
+    ]
+    run = run_benchmarks(benchmarks, 1, 0.001, name_filter="10_users")
+    assert "storage.write.track_completion.10_users" in run["benchmarks"]
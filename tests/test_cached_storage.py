@@ -0,0 +1,173 @@
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+from data_storage.cached import CachedStorage
+from data_storage.json import JsonStorageInterface
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+
+def count_calls(monkeypatch, storage, method_name):
+    calls = []
+    method = getattr(storage, method_name)
+
+    def wrapper(*args):
+        calls.append(args)
+        return method(*args)
+
+    monkeypatch.setattr(storage, method_name, wrapper)
+    return calls
+
+
+@pytest.fixture
+def backend(tmp_path):
+    storage = JsonStorageInterface(str(tmp_path / "test_data.json"))
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    storage.insert_habit(habit)
+    user = User(username="test_user")
+    storage.insert_user_habit(user.add_habit(habit))
+    storage.insert_user(user)
+    return storage
+
+
+def test_reads_are_cached(backend, monkeypatch):
+    calls = count_calls(monkeypatch, backend, "get_habit")
+    storage = CachedStorage(backend)
+    habit = storage.get_habit("Exercise")
+    assert storage.get_habit("Exercise") is habit
+    assert len(calls) == 1
+    assert storage.get_habit("Missing") is None
+    assert storage.stats["hits"] == 1
+    assert storage.stats["misses"] == 2
+
+
+def test_lru_eviction(backend):
+    storage = CachedStorage(backend, max_size=2)
+    for name in ["Read", "Walk"]:
+        storage.insert_habit(Habit(name=name, task_description=name, period="daily"))
+    assert storage.stats["evictions"] == 0
+    storage.get_habit("Read")
+    storage.get_habit("Exercise")
+    # "Walk" was the least recently used habit
+    assert storage.stats["evictions"] == 1
+    storage.get_habit("Read")
+    assert storage.stats["hits"] == 2
+    storage.get_habit("Walk")
+    assert storage.stats["misses"] == 2
+    assert storage.stats["size"] == 2
+
+
+def test_write_through(backend):
+    storage = CachedStorage(backend)
+    user_habit = storage.get_user("test_user").habits[0]
+    user_habit.track_completion(datetime(2024, 1, 1))
+    assert storage.update_user_habit(user_habit) == True
+    assert backend.get_user_habit(user_habit.userhabit_id).completion_times == [
+        datetime(2024, 1, 1)
+    ]
+    assert storage.get_user_habit(user_habit.userhabit_id) is user_habit
+
+
+def test_write_behind(backend, monkeypatch):
+    calls = count_calls(monkeypatch, backend, "update_user_habits")
+    storage = CachedStorage(backend, write_policy="write-behind", max_pending_writes=3)
+    user_habit = storage.get_user("test_user").habits[0]
+    for day in range(1, 6):
+        user_habit.track_completion(datetime(2024, 1, day))
+        assert storage.update_user_habit(user_habit) == True
+    # Repeated updates of the same record are only written once
+    assert len(calls) == 0
+    assert storage.stats["pending_writes"] == 1
+    assert backend.get_user_habit(user_habit.userhabit_id).completion_times == []
+    assert storage.get_user_habit(user_habit.userhabit_id) is user_habit
+
+    storage.flush()
+    assert len(calls) == 1
+    assert len(backend.get_user_habit(user_habit.userhabit_id).completion_times) == 5
+    assert storage.update_user(User(username="missing_user")) == False
+
+
+def test_write_behind_flushes_before_other_writes(backend):
+    storage = CachedStorage(backend, write_policy="write-behind")
+    user = storage.get_user("test_user")
+    user_habit = user.habits[0]
+    user_habit.track_completion(datetime(2024, 1, 1))
+    storage.update_user_habit(user_habit)
+    storage.delete_user_habit(user_habit)
+    user.habits = []
+    storage.update_user(user)
+    storage.close()
+    assert backend.get_user_habit(user_habit.userhabit_id) is None
+    assert backend.get_user("test_user").habits == []
+
+
+def test_delete_habit_cascade_invalidates_cache(backend):
+    storage = CachedStorage(backend)
+    user = storage.get_user("test_user")
+    storage.get_user_habit(user.habits[0].userhabit_id)
+    storage.delete_habit(storage.get_habit("Exercise"), cascade=True)
+    assert storage.get_habit("Exercise") is None
+    assert storage.get_user_habit(user.habits[0].userhabit_id) is None
+    assert storage.get_user("test_user").habits == []
+
+
+def test_get_user_habits_loads_misses_in_bulk(backend, monkeypatch):
+    storage = CachedStorage(backend)
+    user = storage.get_user("test_user")
+    extra = UserHabit(habit=storage.get_habit("Exercise"))
+    storage.insert_user_habit(extra)
+    storage.clear()
+    calls = count_calls(monkeypatch, backend, "get_user_habits")
+    ids = [user.habits[0].userhabit_id, extra.userhabit_id, "missing"]
+    user_habits = storage.get_user_habits(ids)
+    assert [uh.userhabit_id for uh in user_habits[:2]] == ids[:2]
+    assert user_habits[2] is None
+    assert len(calls) == 1
+    assert storage.get_user_habits(ids[:2]) == user_habits[:2]
+    assert len(calls) == 1
+
+
+def test_write_behind_flushes_at_exit(backend):
+    # The updated habit is only buffered when the process exits
+    code = (
+        "import sys\n"
+        "sys.path.insert(0, 'src')\n"
+        "from data_storage.cached import CachedStorage\n"
+        "from data_storage.json import JsonStorageInterface\n"
+        f"backend = JsonStorageInterface({backend.file_path!r})\n"
+        "storage = CachedStorage(backend, write_policy='write-behind')\n"
+        "habit = storage.get_habit('Exercise')\n"
+        "habit.task_description = 'Updated'\n"
+        "storage.update_habit(habit)\n"
+        "assert storage.stats['pending_writes'] == 1\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+    stored = JsonStorageInterface(backend.file_path).get_habit("Exercise")
+    assert stored.task_description == "Updated"
+
+
+@pytest.mark.parametrize("write_policy", ["write-through", "write-behind"])
+def test_cached_users_see_user_habit_updates(backend, write_policy):
+    storage = CachedStorage(backend, write_policy=write_policy)
+    user = storage.get_user("test_user")
+    userhabit_id = user.habits[0].userhabit_id
+    user_habit = storage.get_user_habit(userhabit_id)
+    # The user and the UserHabit cache share the same objects
+    assert user_habit is user.habits[0]
+
+    # Another version of the UserHabit, e.g. one loaded after it was evicted
+    other_version = backend.get_user_habit(userhabit_id)
+    other_version.track_completion(datetime(2024, 1, 1))
+    assert storage.update_user_habit(other_version) == True
+    assert storage.get_user("test_user").habits[0] is other_version
+    storage.clear()
+    other_version.track_completion(datetime(2024, 1, 2))
+    assert storage.update_user_habits([other_version]) == [True]
+    assert len(storage.get_user("test_user").habits[0].completion_times) == 2
+    storage.close()
+    assert len(backend.get_user_habit(userhabit_id).completion_times) == 2
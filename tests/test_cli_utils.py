@@ -0,0 +1,76 @@
+import pytest
+
+from cli_menu.cli_utils import multi_page_option_selection_menu
+
+
+@pytest.fixture
+def inputs(monkeypatch):
+    entered = []
+    monkeypatch.setattr("builtins.input", lambda *args: entered.pop(0))
+    return entered
+
+
+def test_select_option_on_first_page(inputs):
+    inputs.extend(["2"])
+    assert multi_page_option_selection_menu("habit", ["a", "b", "c"]) == "b"
+
+
+def test_select_option_on_later_page(inputs, capsys):
+    options = [f"option {i}" for i in range(20)]
+    inputs.extend(["n", "n", "n", "p", "1"])
+    assert multi_page_option_selection_menu("habit", options) == "option 9"
+    output = capsys.readouterr().out
+    assert "Page 3 / 3" in output
+    assert "No more pages. Please try again." in output
+
+
+def test_return_without_selection(inputs, capsys):
+    inputs.extend(["p", "0", "4", "x", "q"])
+    assert multi_page_option_selection_menu("habit", ["a", "b", "c"]) is None
+    output = capsys.readouterr().out
+    assert "No previous pages. Please try again." in output
+    assert output.count("Invalid selection. Please try again.") == 3
+    assert "n: Next page" not in output
+
+
+def test_many_invalid_inputs_do_not_recurse(inputs):
+    inputs.extend(["x"] * 5000 + ["1"])
+    assert multi_page_option_selection_menu("habit", ["a"]) == "a"
+
+
+def test_lazy_options_are_fetched_per_page(inputs, capsys):
+    fetched = []
+
+    def options():
+        for i in range(1000000):
+            fetched.append(i)
+            yield i
+
+    inputs.extend(["n", "n", "p", "3"])
+    assert multi_page_option_selection_menu("habit", options()) == 11
+    assert len(fetched) == 28
+    output = capsys.readouterr().out
+    assert "Page 3\n" in output
+
+
+def test_lazy_options_on_last_page(inputs, capsys):
+    inputs.extend(["n", "n", "2", "1"])
+    assert multi_page_option_selection_menu("habit", iter(range(10))) == 9
+    output = capsys.readouterr().out
+    assert "No more pages. Please try again." in output
+
+
+def test_search_options(inputs, capsys):
+    options = [f"option {i}" for i in range(20)]
+
+    def search(query):
+        return [option for option in options if option.endswith(query)]
+
+    inputs.extend(["s", "x", "s", "5", "2"])
+    assert multi_page_option_selection_menu("habit", options, search=search) == (
+        "option 15"
+    )
+    output = capsys.readouterr().out
+    assert "s: Search" in output
+    assert "No matches found. Please try again." in output
+    assert "Page 1 / 1" in output
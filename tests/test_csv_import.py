@@ -0,0 +1,102 @@
+import io
+from datetime import datetime
+
+import pytest
+
+from data_storage.csv_import import import_completions_csv
+from data_storage.json import JsonStorageInterface
+from habit_tracking.habits import Habit
+from habit_tracking.users import User
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = JsonStorageInterface(str(tmp_path / "test_data.json"))
+    user = User(username="test_user")
+    for name, period in [("Exercise", "daily"), ("Meal Planning", "weekly")]:
+        habit = Habit(name, name, period, datetime(2024, 1, 1))
+        storage.insert_habit(habit)
+        user_habit = user.add_habit(habit)
+        user_habit.creation_time = datetime(2024, 1, 1)
+        storage.insert_user_habit(user_habit)
+    storage.insert_user(user)
+    return storage
+
+
+def test_import_completions(storage, monkeypatch):
+    calls = []
+    update_user_habits = storage.update_user_habits
+    monkeypatch.setattr(
+        storage,
+        "update_user_habits",
+        lambda user_habits: calls.append(user_habits)
+        or update_user_habits(user_habits),
+    )
+    csv_data = "\n".join(
+        [
+            "username,habit,completion_time",
+            "test_user,Exercise,2024-01-03T08:00:00",
+            "test_user,Exercise,2024-01-02T08:00:00",
+            "test_user,Exercise,2024-01-02T20:00:00",
+            "test_user,Meal Planning,2024-01-02",
+            "test_user,Meal Planning,2024-01-04",
+            "test_user,Exercise,2023-12-30T10:00:00",
+            "test_user,Read,2024-01-02",
+            "unknown_user,Exercise,2024-01-02",
+            "test_user,Exercise,yesterday",
+            "test_user,Exercise,2999-01-01",
+            "test_user,Exercise",
+        ]
+    )
+    report = import_completions_csv(storage, io.StringIO(csv_data))
+    assert report["rows"] == 11
+    assert report["imported"] == 4
+    assert [reject["line"] for reject in report["rejected"]] == [4, 6, 8, 9, 10, 11, 12]
+    assert report["rejected"][0]["reason"] == "Period already completed."
+    assert len(calls) == 1
+
+    user = JsonStorageInterface(storage.file_path).get_user("test_user")
+    assert user.habits[0].completion_times == [
+        datetime(2023, 12, 30, 10),
+        datetime(2024, 1, 2, 8),
+        datetime(2024, 1, 3, 8),
+    ]
+    # Imported history before the start of the habit extends the tracked history
+    assert user.habits[0].creation_time == datetime(2023, 12, 30, 10)
+    assert len(user.habits[1].completion_times) == 1
+
+
+def test_import_deduplicates_against_existing_completions(storage):
+    user_habit = storage.get_user("test_user").habits[0]
+    user_habit.track_completion(datetime(2024, 1, 2, 12))
+    storage.update_user_habit(user_habit)
+    csv_data = (
+        "username,habit,completion_time\ntest_user,Exercise,2024-01-02T08:00:00\n"
+    )
+    report = import_completions_csv(storage, io.StringIO(csv_data))
+    assert report["imported"] == 0
+    assert len(report["rejected"]) == 1
+
+
+def test_import_times_with_utc_offset(storage):
+    csv_data = "\n".join(
+        [
+            "username,habit,completion_time",
+            "test_user,Exercise,2024-01-02T08:00:00Z",
+            "test_user,Exercise,2999-01-01T08:00:00+02:00",
+        ]
+    )
+    report = import_completions_csv(storage, io.StringIO(csv_data))
+    assert report["imported"] == 1
+    assert [reject["line"] for reject in report["rejected"]] == [3]
+    user = JsonStorageInterface(storage.file_path).get_user("test_user")
+    assert user.habits[0].completion_times == [
+        datetime.fromisoformat("2024-01-02T08:00:00+00:00")
+        .astimezone()
+        .replace(tzinfo=None)
+    ]
+
+
+def test_import_requires_columns(storage):
+    with pytest.raises(ValueError):
+        import_completions_csv(storage, io.StringIO("username,habit\n"))
@@ -0,0 +1,96 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from data_storage.demo_data import (
+    draw_completion_rate,
+    generate_habits,
+    generate_records,
+)
+from data_storage.json import JsonStorageInterface
+from data_storage.jsonl import import_records
+
+START = datetime(2023, 1, 1)
+END = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def habits():
+    return generate_habits(5, START, seed=1)
+
+
+def generate(habits, processes=1, seed=1, **kwargs):
+    usernames = [f"user{number}" for number in range(1, 6)]
+    arguments = dict(
+        habits_per_user=3,
+        start=START,
+        end=END,
+        completion_rate=0.5,
+        rate_distribution="uniform",
+        seed=seed,
+        processes=processes,
+        chunk_size=2,
+    )
+    arguments.update(kwargs)
+    return list(generate_records(habits, usernames, **arguments))
+
+
+def test_generate_habits_is_deterministic(habits):
+    assert [habit.json() for habit in habits] == [
+        habit.json() for habit in generate_habits(5, START, seed=1)
+    ]
+    assert habits[0].name == "Demo habit 1"
+    assert habits[0].creation_time == START
+
+
+def test_generate_records_is_deterministic(habits):
+    records = generate(habits)
+    assert generate(habits) == records
+    assert generate(habits, processes=2) == records
+    assert generate(habits, seed=2) != records
+
+
+def test_generate_records_order(habits):
+    record_types = [record["type"] for record in generate(habits)]
+    # Habits first, then the user habits and users of each chunk of two users
+    assert record_types == ["habit"] * 5 + (["user_habit"] * 6 + ["user"] * 2) * 2 + [
+        "user_habit"
+    ] * 3 + ["user"]
+
+
+def test_generated_completions(tmp_path, habits):
+    storage = JsonStorageInterface(str(tmp_path / "demo.json"))
+    stats = import_records(storage, generate(habits, completion_rate=1.0))
+    assert stats["user"]["inserted"] == 5
+    assert stats["user_habit"]["inserted"] == 15
+    for user in storage.get_all_users():
+        assert len(user.habits) == 3
+        for user_habit in user.habits:
+            completion_times = list(user_habit.completion_times)
+            assert all(START <= time < END for time in completion_times)
+            # Every period is completed exactly once with a completion rate of 1
+            periods = {
+                user_habit.habit.get_period_start_end(time)[0]
+                for time in completion_times
+            }
+            assert len(periods) == len(completion_times)
+            assert len(completion_times) == len(
+                [
+                    period
+                    for period in user_habit.habit.get_all_periods_since(START)
+                    if period[0] < END
+                ]
+            )
+
+
+def test_draw_completion_rate():
+    rng = random.Random(0)
+    assert draw_completion_rate(rng, 0.75, "fixed") == 0.75
+    rates = [draw_completion_rate(rng, 0.75, "uniform") for _ in range(1000)]
+    assert all(0.5 <= rate <= 1 for rate in rates)
+    rates = [draw_completion_rate(rng, 0.75, "beta") for _ in range(1000)]
+    assert all(0 <= rate <= 1 for rate in rates)
+    assert abs(sum(rates) / len(rates) - 0.75) < 0.05
+    with pytest.raises(ValueError):
+        draw_completion_rate(rng, 0.75, "normal")
@@ -0,0 +1,52 @@
+import pytest
+
+from data_storage.event_log import EventLog
+
+
+def get_event(number: int) -> dict:
+    return {
+        "type": "completion_tracked",
+        "userhabit_id": "abc",
+        "completion_time": f"2024-01-{number:02d}T12:00:00",
+    }
+
+
+def test_append_and_read(tmp_path):
+    event_log = EventLog(str(tmp_path / "events.jsonl"))
+    assert event_log.size == 0
+    assert list(event_log.read()) == []
+    event_log.append([get_event(1), get_event(2)])
+    event_log.append([get_event(3)])
+    read_events = list(event_log.read())
+    assert [event for event, _ in read_events] == [get_event(n) for n in (1, 2, 3)]
+    assert read_events[-1][1] == event_log.size
+    # Reading resumes right after an event
+    assert [event for event, _ in event_log.read(read_events[0][1])] == [
+        get_event(2),
+        get_event(3),
+    ]
+
+
+def test_partial_line_is_removed(tmp_path):
+    file_path = str(tmp_path / "events.jsonl")
+    event_log = EventLog(file_path)
+    event_log.append([get_event(1)])
+    with open(file_path, 'a') as fp:
+        fp.write('{"type": "completion_tr')
+    # A line which is still being written is skipped by readers
+    assert [event for event, _ in event_log.read()] == [get_event(1)]
+    # and removed when the log is opened
+    event_log = EventLog(file_path)
+    assert [event for event, _ in event_log.read()] == [get_event(1)]
+    event_log.append([get_event(2)])
+    assert [event for event, _ in event_log.read()] == [get_event(1), get_event(2)]
+
+
+def test_invalid_events(tmp_path):
+    file_path = str(tmp_path / "events.jsonl")
+    with open(file_path, 'w') as fp:
+        fp.write('{"type": "unknown", "userhabit_id": "abc"}\n')
+    with pytest.raises(ValueError):
+        list(EventLog(file_path).read())
+    with pytest.raises(AssertionError):
+        EventLog(file_path).append([{"type": "unknown", "userhabit_id": "abc"}])
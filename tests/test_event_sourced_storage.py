@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from data_storage.event_sourced import EventSourcedStorage
+from data_storage.json import JsonStorageInterface
+from habit_analysis.analytics import (
+    get_current_streak_for_habit,
+    get_longest_streak_for_habit,
+)
+from habit_tracking.habits import Habit
+from habit_tracking.users import User
+
+
+@pytest.fixture
+def json_storage(tmp_path):
+    storage = JsonStorageInterface(str(tmp_path / "test_data.json"))
+    habit = Habit("Exercise", "Exercise", "daily")
+    storage.insert_habit(habit)
+    user = User("testuser")
+    user_habit = user.add_habit(habit)
+    user_habit.creation_time = datetime.now() - timedelta(days=10)
+    for days in (1, 2, 3):
+        user_habit.track_completion(datetime.now() - timedelta(days=days))
+    storage.insert_user_habit(user_habit)
+    storage.insert_user(user)
+    return storage
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / "events.jsonl")
+
+
+def test_log_is_started_with_current_state(json_storage, log_path):
+    storage = EventSourcedStorage(json_storage, log_path)
+    user_habit = storage.get_user("testuser").habits[0]
+    events = [event for event, _ in storage.event_log.read()]
+    assert [event["type"] for event in events] == ["habit_created"] + [
+        "completion_tracked"
+    ] * 3
+    assert storage.projections.get_current_streak(user_habit.userhabit_id) == 3
+    assert storage.projections.get_habit_total("Exercise") == 3
+
+
+def test_writes_are_logged(json_storage, log_path):
+    storage = EventSourcedStorage(json_storage, log_path)
+    user = storage.get_user("testuser")
+    user_habit = user.habits[0]
+    assert user_habit.track_completion() == True
+    assert storage.update_user_habit(user_habit) == True
+    # Updates without new completions don't log anything
+    assert storage.update_user_habits([user_habit, user_habit]) == [True, True]
+    assert storage.projections.event_count == 5
+    assert storage.projections.get_current_streak(
+        user_habit.userhabit_id
+    ) == get_current_streak_for_habit(user_habit)
+    assert storage.projections.get_longest_streak(
+        user_habit.userhabit_id
+    ) == get_longest_streak_for_habit(user_habit)
+
+    habit = Habit("Reading", "Read", "weekly")
+    storage.insert_habit(habit)
+    new_user_habit = user.add_habit(habit)
+    new_user_habit.track_completion()
+    assert storage.insert_user_habit(new_user_habit) == True
+    assert storage.projections.get_completion_count(new_user_habit.userhabit_id) == 1
+
+    assert storage.delete_user_habit(new_user_habit) == True
+    assert new_user_habit.userhabit_id not in storage.projections
+    assert storage.delete_habit(storage.get_habit("Exercise"), cascade=True) == True
+    assert user_habit.userhabit_id not in storage.projections
+    # The wrapped storage is updated as well
+    assert json_storage.get_user_habit(user_habit.userhabit_id) is None
+
+
+def test_checkpoint_and_rebuild(json_storage, log_path):
+    storage = EventSourcedStorage(json_storage, log_path, checkpoint_interval=2)
+    user_habit = storage.get_user("testuser").habits[0]
+    user_habit.track_completion()
+    storage.update_user_habit(user_habit)
+    storage.close()
+    expected = storage.projections.json()
+
+    reopened = EventSourcedStorage(json_storage, log_path)
+    assert reopened.projections.json() == expected
+    reopened.rebuild_projections()
+    assert reopened.projections.json() == expected
+
+
+def test_events_of_other_processes_are_applied(json_storage, log_path):
+    storage = EventSourcedStorage(json_storage, log_path)
+    other_storage = EventSourcedStorage(
+        JsonStorageInterface(json_storage.file_path), log_path
+    )
+    user_habit = other_storage.get_user("testuser").habits[0]
+    user_habit.track_completion()
+    other_storage.update_user_habit(user_habit)
+    assert storage.projections.get_completion_count(user_habit.userhabit_id) == 4
+
+
+def test_missed_writes_are_reconciled_on_open(json_storage, log_path):
+    storage = EventSourcedStorage(json_storage, log_path)
+    user = storage.get_user("testuser")
+    habit = Habit("Reading", "Read", "weekly")
+    storage.insert_habit(habit)
+    removed_user_habit = user.add_habit(habit)
+    storage.insert_user_habit(removed_user_habit)
+    storage.close()
+    # Writes of a process which crashed before logging them
+    user_habit = user.habits[0]
+    user_habit.track_completion()
+    json_storage.update_user_habit(user_habit)
+    json_storage.delete_user_habit(removed_user_habit)
+    other_habit = Habit("Stretching", "Stretch", "daily")
+    json_storage.insert_habit(other_habit)
+    new_user_habit = user.add_habit(other_habit)
+    json_storage.insert_user_habit(new_user_habit)
+
+    reopened = EventSourcedStorage(json_storage, log_path)
+    assert reopened.projections.get_completion_count(user_habit.userhabit_id) == 4
+    assert reopened.projections.get_habit_total("Exercise") == 4
+    assert removed_user_habit.userhabit_id not in reopened.projections
+    assert new_user_habit.userhabit_id in reopened.projections
+    # Reopening an up-to-date log doesn't log anything
+    event_count = reopened.projections.event_count
+    assert EventSourcedStorage(json_storage, log_path).projections.event_count == (
+        event_count
+    )
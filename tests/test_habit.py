@@ -1,4 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+
+import pytest
 
 from habit_tracking.habits import Habit
 
@@ -23,6 +25,22 @@ def test_habit_get_period_start_end():
     assert end == datetime(2024, 9, 16)
 
 
+@pytest.mark.parametrize(
+    "period", ['daily', 'weekly', 'monthly', 'quarterly', 'annually']
+)
+def test_habit_get_period_index(period):
+    habit = Habit(name='Test Habit', task_description='', period=period)
+    start_time = datetime.now() - timedelta(days=800, hours=5)
+    periods = habit.get_all_periods_since(start_time)
+    for index, (period_start, period_end) in enumerate(periods):
+        assert habit.get_period_index(start_time, period_start) == index
+        assert (
+            habit.get_period_index(start_time, period_end - timedelta(seconds=1))
+            == index
+        )
+    assert habit.get_period_index(start_time, periods[0][0] - timedelta(1)) == -1
+
+
 def test_habit_json(habits):
     habit = habits['Budget Review']
     habit_json = habit.json()
@@ -1,3 +1,6 @@
+import json
+import multiprocessing
+import os
 from datetime import datetime
 
 import pytest
@@ -134,6 +137,30 @@ def test_get_all_habits(storage):
     assert "Read" in habit_names
 
 
+def test_iter_habit_names(storage):
+    storage.insert_habit(Habit(name="Exercise", task_description="", period="daily"))
+    storage.insert_habit(Habit(name="Read", task_description="", period="weekly"))
+    assert list(storage.iter_habit_names()) == ["Exercise", "Read"]
+
+
+def test_search_habits(storage):
+    exercise = Habit(name="Exercise", task_description="Go running", period="daily")
+    storage.insert_habit(exercise)
+    storage.insert_habit(Habit(name="Read", task_description="", period="weekly"))
+    assert storage.search_habits("exe") == ["Exercise"]
+    # The search index is updated by later changes to the habits
+    storage.insert_habits([Habit(name="Run", task_description="", period="daily")])
+    assert storage.search_habits("run") == ["Run", "Exercise"]
+    exercise.task_description = "Lift weights"
+    storage.update_habit(exercise)
+    assert storage.search_habits("run") == ["Run"]
+    storage.delete_habit(exercise)
+    assert storage.search_habits("exe") == []
+    # A reloaded storage builds its own search index
+    reloaded_storage = JsonStorageInterface(storage.file_path)
+    assert reloaded_storage.search_habits("r", limit=1) == ["Read"]
+
+
 def test_insert_user_habit(storage):
     habit = Habit(
         name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
@@ -253,3 +280,267 @@ def test_init_with_non_json_file(tmp_path):
     file_path = tmp_path / "test_data.txt"
     with pytest.raises(AssertionError):
         JsonStorageInterface(str(file_path))
+
+
+def test_bulk_user_habit_operations(storage, monkeypatch):
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    storage.insert_habit(habit)
+    user_habits = [UserHabit(habit=habit) for _ in range(3)]
+    missing_user_habit = UserHabit(habit=habit)
+    writes = []
+    monkeypatch.setattr(
+        storage, "_JsonStorageInterface__save_json", lambda: writes.append(1)
+    )
+    assert storage.insert_user_habits(user_habits + user_habits[:1]) == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    retrieved = storage.get_user_habits(
+        [uh.userhabit_id for uh in user_habits] + ["nonexistent"]
+    )
+    assert [uh.userhabit_id for uh in retrieved[:3]] == [
+        uh.userhabit_id for uh in user_habits
+    ]
+    assert retrieved[3] is None
+    # Habits shared between the user habits are only deserialized once
+    assert retrieved[0].habit is retrieved[1].habit
+    completion_time = datetime(2021, 1, 1, 12, 0, 0)
+    for user_habit in user_habits:
+        user_habit.completion_times.append(completion_time)
+    assert storage.update_user_habits(user_habits + [missing_user_habit]) == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert storage.get_user_habit(user_habits[0].userhabit_id).completion_times == [
+        completion_time
+    ]
+    assert storage.delete_user_habits(user_habits[:2] + [missing_user_habit]) == [
+        True,
+        True,
+        False,
+    ]
+    assert len(storage.get_all_user_habits()) == 1
+    # Each bulk operation wrote the file exactly once
+    assert len(writes) == 3
+
+
+def insert_users_in_process(file_path, prefix, count):
+    storage = JsonStorageInterface(file_path, multi_process=True)
+    for i in range(count):
+        storage.insert_user(User(username=f"{prefix}_{i}"))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires POSIX file locking")
+def test_multi_process_updates_are_not_lost(tmp_path):
+    file_path = str(tmp_path / "test_data.json")
+    storage1 = JsonStorageInterface(file_path, multi_process=True)
+    storage2 = JsonStorageInterface(file_path, multi_process=True)
+    storage1.insert_user(User(username="user_1"))
+    storage2.insert_user(User(username="user_2"))
+    # storage1 picks up the change made through storage2
+    assert storage1.get_user("user_2") is not None
+    storage1.insert_user(User(username="user_3"))
+    assert {user.username for user in storage2.get_all_users()} == {
+        "user_1",
+        "user_2",
+        "user_3",
+    }
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires POSIX file locking")
+def test_multi_process_concurrent_writers(tmp_path):
+    file_path = str(tmp_path / "test_data.json")
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=insert_users_in_process, args=(file_path, prefix, 20))
+        for prefix in ["a", "b", "c"]
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    storage = JsonStorageInterface(file_path)
+    assert len(storage.get_all_users()) == 60
+
+
+def test_multi_process_reload_only_on_change(tmp_path, monkeypatch):
+    file_path = str(tmp_path / "test_data.json")
+    storage = JsonStorageInterface(file_path, multi_process=True)
+    storage.insert_user(User(username="user_1"))
+    loads = []
+    original_load_json = storage._JsonStorageInterface__load_json
+    monkeypatch.setattr(
+        storage,
+        "_JsonStorageInterface__load_json",
+        lambda: loads.append(1) or original_load_json(),
+    )
+    # Neither reading nor the storage's own writes trigger a reload
+    storage.get_user("user_1")
+    storage.insert_user(User(username="user_2"))
+    storage.get_user("user_2")
+    assert loads == []
+    JsonStorageInterface(file_path).insert_user(User(username="user_3"))
+    assert storage.get_user("user_3") is not None
+    assert loads == [1]
+
+
+def test_unchanged_user_habit_update_is_noop(storage, monkeypatch):
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    storage.insert_habit(habit)
+    user_habit = UserHabit(habit=habit)
+    storage.insert_user_habit(user_habit)
+    writes = []
+    original_save_json = storage._JsonStorageInterface__save_json
+    monkeypatch.setattr(
+        storage,
+        "_JsonStorageInterface__save_json",
+        lambda: writes.append(1) or original_save_json(),
+    )
+    assert storage.update_user_habit(user_habit) == True
+    retrieved_user_habit = storage.get_user_habit(user_habit.userhabit_id)
+    assert storage.update_user_habits([retrieved_user_habit]) == [True]
+    assert writes == []
+    retrieved_user_habit.track_completion(datetime(2021, 1, 1, 12, 0, 0))
+    assert storage.update_user_habit(retrieved_user_habit) == True
+    assert writes == [1]
+
+
+def test_saved_file_matches_json_dump(storage):
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    storage.insert_habit(habit)
+    user = User(username="test_üser")
+    user_habit = user.add_habit(habit)
+    storage.insert_user_habit(user_habit)
+    storage.insert_user(user)
+    user_habit.track_completion(datetime(2021, 1, 1, 12, 0, 0))
+    storage.update_user_habit(user_habit)
+    storage.delete_user(user)
+    with open(storage.file_path, 'r') as fp:
+        assert fp.read() == json.dumps(storage.data)
+
+
+def test_secondary_indexes(storage):
+    exercise = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    read = Habit(name="Read", task_description="Read a book", period="weekly")
+    storage.insert_habits([exercise, read])
+    user_habits = [UserHabit(habit=exercise), UserHabit(habit=exercise)]
+    storage.insert_user_habits(user_habits + [UserHabit(habit=read)])
+    assert [habit.name for habit in storage.get_habits_by_period("daily")] == [
+        "Exercise"
+    ]
+    assert storage.get_habits_by_period("monthly") == []
+    assert {
+        uh.userhabit_id for uh in storage.get_user_habits_for_habit("Exercise")
+    } == {uh.userhabit_id for uh in user_habits}
+    # Indexes follow updates and deletions
+    read.period = "daily"
+    storage.update_habit(read)
+    assert storage.get_habits_by_period("weekly") == []
+    assert {habit.name for habit in storage.get_habits_by_period("daily")} == {
+        "Exercise",
+        "Read",
+    }
+    user_habits[0].habit = read
+    storage.update_user_habit(user_habits[0])
+    storage.delete_user_habit(user_habits[1])
+    assert storage.get_user_habits_for_habit("Exercise") == []
+    assert len(storage.get_user_habits_for_habit("Read")) == 2
+    # Indexes are rebuilt when loading the file
+    reloaded_storage = JsonStorageInterface(storage.file_path)
+    assert len(reloaded_storage.get_habits_by_period("daily")) == 2
+    assert len(reloaded_storage.get_user_habits_for_habit("Read")) == 2
+
+
+def test_delete_habit_cascade(storage):
+    exercise = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    read = Habit(name="Read", task_description="Read a book", period="weekly")
+    storage.insert_habits([exercise, read])
+    users = [User(username=f"user_{i}") for i in range(3)]
+    for user in users:
+        storage.insert_user_habits([user.add_habit(exercise), user.add_habit(read)])
+    storage.insert_users(users)
+    # Without cascading, dependent user habits are left in place
+    assert storage.delete_habit(exercise) == True
+    assert len(storage.get_all_user_habits()) == 6
+    assert storage.get_user("user_0").habits[0].habit is None
+    storage.insert_habit(exercise)
+    assert storage.delete_habit(exercise, cascade=True) == True
+    assert storage.get_user_habits_for_habit("Exercise") == []
+    assert len(storage.get_all_user_habits()) == 3
+    for user in storage.get_all_users():
+        assert [user_habit.habit.name for user_habit in user.habits] == ["Read"]
+    reloaded_storage = JsonStorageInterface(storage.file_path)
+    assert reloaded_storage.data == storage.data
+
+
+@pytest.mark.parametrize("extension", [".json.gz", ".json.xz"])
+def test_compressed_storage(tmp_path, extension):
+    file_path = str(tmp_path / f"test_data{extension}")
+    storage1 = JsonStorageInterface(file_path, compression_level=1)
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    storage1.insert_habit(habit)
+    user_habit = UserHabit(habit=habit)
+    user_habit.track_completion(datetime(2021, 1, 1, 12, 0, 0))
+    storage1.insert_user_habit(user_habit)
+    with open(file_path, 'rb') as fp:
+        assert not fp.read().startswith(b'{')
+    storage2 = JsonStorageInterface(file_path)
+    assert storage2.data == storage1.data
+    assert storage2.get_user_habit(user_habit.userhabit_id).completion_times == [
+        datetime(2021, 1, 1, 12, 0, 0)
+    ]
+
+
+def test_init_with_invalid_compression_level(tmp_path):
+    with pytest.raises(AssertionError):
+        JsonStorageInterface(str(tmp_path / "test_data.json.gz"), compression_level=10)
+
+
+def test_archive_completions(tmp_path):
+    file_path = tmp_path / "test_data.json.gz"
+    storage = JsonStorageInterface(str(file_path))
+    habit = Habit(
+        "Exercise", "Do 30 minutes of exercise", "daily", datetime(2024, 1, 1)
+    )
+    storage.insert_habit(habit)
+    user_habit = UserHabit(
+        habit=habit,
+        creation_time=datetime(2024, 1, 1),
+        completion_times=[datetime(2024, 1, day, 9) for day in range(1, 31)],
+    )
+    storage.insert_user_habit(user_habit)
+
+    assert storage.archive_completions(datetime(2024, 1, 21)) == 20
+    assert storage.archive_path == str(tmp_path / "test_data.archive.json.gz")
+    assert os.path.exists(storage.archive_path)
+    stored_user_habit = JsonStorageInterface(str(file_path)).get_user_habit(
+        user_habit.userhabit_id
+    )
+    assert len(stored_user_habit.completion_times) == 10
+    assert stored_user_habit.archive.longest_streak == 20
+    assert stored_user_habit.archive.trailing_streak == 20
+    assert storage.get_archived_completion_times(user_habit.userhabit_id) == [
+        datetime(2024, 1, day, 9) for day in range(1, 21)
+    ]
+
+    assert storage.archive_completions(datetime(2024, 1, 26)) == 5
+    assert len(storage.get_archived_completion_times(user_habit.userhabit_id)) == 25
+    assert storage.get_user_habit(user_habit.userhabit_id).archive.period_count == 25
+    # Nothing left to archive
+    assert storage.archive_completions(datetime(2024, 1, 26)) == 0
@@ -0,0 +1,83 @@
+import io
+import json
+
+import pytest
+
+from data_storage.interface import StorageInterface
+from data_storage.json import JsonStorageInterface
+from data_storage.json_stream import (
+    JsonStreamReader,
+    export_store_file,
+    write_store_file,
+)
+from data_storage.jsonl import export_records
+
+
+@pytest.fixture
+def source_storage():
+    return JsonStorageInterface("tests/test_data.json")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_reader_streams_section(chunk_size):
+    data = {
+        "users": {"a": {"n": 12345}, "b": {"n": [1.5, "}", None]}},
+        "habits": {},
+        "user_habits": {"x": {"s": "\"{"}},
+    }
+    for section, records in data.items():
+        reader = JsonStreamReader(io.StringIO(json.dumps(data, indent=1)), chunk_size)
+        assert dict(reader.iter_section(section)) == records
+    reader = JsonStreamReader(io.StringIO(json.dumps(data)), chunk_size)
+    assert list(reader.iter_section("missing")) == []
+
+
+def test_reader_rejects_invalid_json():
+    reader = JsonStreamReader(io.StringIO('{"users": {"a": }}'))
+    with pytest.raises(ValueError):
+        list(reader.iter_section("users"))
+
+
+def test_export_store_file(source_storage):
+    assert list(export_store_file("tests/test_data.json")) == list(
+        export_records(source_storage)
+    )
+
+
+@pytest.mark.parametrize("extension", [".json", ".json.gz", ".json.xz"])
+def test_write_store_file_round_trip(source_storage, tmp_path, extension):
+    file_path = str(tmp_path / f"target{extension}")
+    stats = write_store_file(export_store_file("tests/test_data.json"), file_path)
+    assert stats["habit"]["inserted"] == len(source_storage.data["habits"])
+    assert stats["user"]["inserted"] == 1
+    assert JsonStorageInterface(file_path).data == source_storage.data
+    assert [path.name for path in tmp_path.iterdir()] == [f"target{extension}"]
+
+
+def test_write_store_file_skips_invalid_records(source_storage, tmp_path):
+    records = list(export_records(source_storage))
+    user_habit = next(record for record in records if record["type"] == "user_habit")
+    orphan = {**user_habit["data"], "userhabit_id": "orphan", "habit": "missing"}
+    duplicate = records[0]
+    records.insert(1, duplicate)
+    records.insert(-1, {"type": "user_habit", "data": orphan})
+    records[-1]["data"]["habits"].append("orphan")
+    file_path = str(tmp_path / "target.json")
+    stats = write_store_file(records, file_path)
+    assert stats["habit"]["skipped"] == 1
+    assert stats["user_habit"]["skipped"] == 1
+    assert JsonStorageInterface(file_path).data == source_storage.data
+
+
+def test_write_store_file_requires_dependency_order(source_storage, tmp_path):
+    records = list(export_records(source_storage))
+    file_path = tmp_path / "target.json"
+    with pytest.raises(ValueError):
+        write_store_file(reversed(records), str(file_path))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_iter_users_defaults_to_get_all_users(source_storage):
+    assert [user.json() for user in StorageInterface.iter_users(source_storage)] == [
+        user.json() for user in source_storage.get_all_users()
+    ]
@@ -0,0 +1,81 @@
+import io
+
+import pytest
+
+from data_storage.json import JsonStorageInterface
+from data_storage.jsonl import export_records, import_records, read_jsonl, write_jsonl
+
+
+@pytest.fixture
+def source_storage(tmp_path):
+    return JsonStorageInterface("tests/test_data.json")
+
+
+def test_export_records_order(source_storage):
+    record_types = [record["type"] for record in export_records(source_storage)]
+    assert record_types == sorted(
+        record_types, key=["habit", "user_habit", "user"].index
+    )
+    assert record_types.count("habit") == len(source_storage.data["habits"])
+    assert record_types.count("user_habit") == len(source_storage.data["user_habits"])
+    assert record_types.count("user") == len(source_storage.data["users"])
+
+
+def test_export_import_round_trip(source_storage, tmp_path):
+    buffer = io.StringIO()
+    count = write_jsonl(export_records(source_storage), buffer)
+    assert count == len(buffer.getvalue().splitlines())
+    buffer.seek(0)
+    target_storage = JsonStorageInterface(str(tmp_path / "target.json"))
+    stats = import_records(target_storage, read_jsonl(buffer), batch_size=2)
+    assert stats["habit"]["inserted"] == len(source_storage.data["habits"])
+    assert stats["user"]["inserted"] == 1
+    assert target_storage.data == source_storage.data
+    # Importing the same records again skips everything
+    buffer.seek(0)
+    stats = import_records(target_storage, read_jsonl(buffer))
+    assert all(type_stats["inserted"] == 0 for type_stats in stats.values())
+
+
+def test_import_uses_batched_writes(source_storage, tmp_path, monkeypatch):
+    target_storage = JsonStorageInterface(str(tmp_path / "target.json"))
+    calls = []
+    monkeypatch.setattr(
+        target_storage,
+        "insert_user_habit",
+        lambda user_habit: pytest.fail("Single insert used during import"),
+    )
+    original_insert_user_habits = target_storage.insert_user_habits
+    monkeypatch.setattr(
+        target_storage,
+        "insert_user_habits",
+        lambda user_habits: calls.append(len(user_habits))
+        or original_insert_user_habits(user_habits),
+    )
+    import_records(target_storage, export_records(source_storage), batch_size=2)
+    assert calls == [2, 2, 1]
+
+
+def test_import_skips_user_habit_with_unknown_habit(tmp_path):
+    records = [
+        {
+            "type": "user_habit",
+            "data": {
+                "habit": "Unknown",
+                "userhabit_id": "abc",
+                "completion_times": [],
+                "creation_time": "2024-09-13T12:08:27.982664",
+            },
+        }
+    ]
+    storage = JsonStorageInterface(str(tmp_path / "target.json"))
+    stats = import_records(storage, records)
+    assert stats["user_habit"] == {"inserted": 0, "skipped": 1}
+    assert storage.get_user_habit("abc") is None
+
+
+def test_read_jsonl_invalid_record():
+    with pytest.raises(ValueError):
+        list(read_jsonl(io.StringIO('{"type": "unknown", "data": {}}\n')))
+    with pytest.raises(ValueError):
+        list(read_jsonl(io.StringIO('not json\n')))
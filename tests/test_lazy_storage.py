@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from data_storage.json import JsonStorageInterface
+from data_storage.lazy import LazyStorage
+from habit_tracking.habits import Habit
+
+
+def test_storage_is_loaded_in_background(tmp_path):
+    file_path = str(tmp_path / "test_data.json")
+    JsonStorageInterface(file_path).insert_habit(Habit("Exercise", "Exercise", "daily"))
+    release = threading.Event()
+
+    def factory():
+        release.wait()
+        return JsonStorageInterface(file_path)
+
+    storage = LazyStorage(factory)
+    assert storage.loaded == False
+    release.set()
+    # Operations wait for the background thread to finish
+    assert storage.get_habit("Exercise").name == "Exercise"
+    assert storage.loaded == True
+    assert storage.load_time is not None
+    # Methods specific to the wrapped storage are available as well
+    assert storage.file_path == file_path
+
+
+def test_storage_is_loaded_on_first_access(tmp_path):
+    calls = []
+
+    def factory():
+        calls.append(threading.current_thread())
+        return JsonStorageInterface(str(tmp_path / "test_data.json"))
+
+    storage = LazyStorage(factory, preload=False)
+    assert calls == []
+    assert storage.insert_habit(Habit("Exercise", "Exercise", "daily")) == True
+    assert storage.get_all_habits()[0].name == "Exercise"
+    assert calls == [threading.current_thread()]
+
+
+def test_loading_errors_are_raised_on_access():
+    def factory():
+        raise OSError("Storage file not readable")
+
+    storage = LazyStorage(factory)
+    with pytest.raises(OSError):
+        storage.get_all_users()
+    with pytest.raises(OSError):
+        storage.get_user("test_user")
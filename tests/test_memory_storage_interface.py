@@ -0,0 +1,113 @@
+from datetime import datetime
+
+import pytest
+
+from data_storage.memory import MemoryStorageInterface
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+
+def populate(storage):
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    storage.insert_habit(habit)
+    user = User(username="test_user")
+    user_habit = user.add_habit(habit)
+    storage.insert_user_habit(user_habit)
+    storage.insert_user(user)
+    return user, habit, user_habit
+
+
+@pytest.fixture
+def storage():
+    storage = MemoryStorageInterface()
+    populate(storage)
+    return storage
+
+
+@pytest.fixture
+def identity_storage():
+    storage = MemoryStorageInterface(identity_map=True)
+    populate(storage)
+    return storage
+
+
+def test_insert_and_get(storage):
+    user = storage.get_user("test_user")
+    assert user.username == "test_user"
+    assert len(user.habits) == 1
+    assert user.habits[0].habit.name == "Exercise"
+    assert storage.insert_habit(Habit("Exercise", "Duplicate", "daily")) == False
+    assert storage.get_user("missing") is None
+
+
+def test_returns_fresh_objects(storage):
+    user_habit = storage.get_user("test_user").habits[0]
+    user_habit.track_completion(datetime(2024, 1, 1))
+    # Changes are only stored once the object is updated
+    assert storage.get_user_habit(user_habit.userhabit_id).completion_times == []
+    assert storage.get_user_habit(user_habit.userhabit_id) is not user_habit
+    storage.update_user_habit(user_habit)
+    assert storage.get_user_habit(user_habit.userhabit_id).completion_times == [
+        datetime(2024, 1, 1)
+    ]
+
+
+def test_identity_map_returns_same_objects(identity_storage):
+    user = identity_storage.get_user("test_user")
+    assert identity_storage.get_user("test_user") is user
+    assert (
+        identity_storage.get_user_habit(user.habits[0].userhabit_id) is user.habits[0]
+    )
+    assert identity_storage.get_habit("Exercise") is user.habits[0].habit
+    identity_storage.delete_user(user)
+    assert identity_storage.get_user("test_user") is None
+
+
+def test_delete_habit_cascade(storage):
+    habit = storage.get_habit("Exercise")
+    assert storage.delete_habit(habit, cascade=True) == True
+    assert storage.get_all_user_habits() == []
+    assert storage.get_user("test_user").habits == []
+    assert storage.data["users"]["test_user"]["habits"] == []
+
+
+def test_snapshot_and_restore(identity_storage):
+    snapshot = identity_storage.snapshot()
+    user = identity_storage.get_user("test_user")
+    read = Habit(name="Read", task_description="Read a book", period="weekly")
+    identity_storage.insert_habit(read)
+    user_habit = user.add_habit(read)
+    identity_storage.insert_user_habit(user_habit)
+    identity_storage.update_user(user)
+    assert len(snapshot.get_all_habits()) == 1
+
+    identity_storage.restore(snapshot)
+    assert identity_storage.get_habit("Read") is None
+    assert identity_storage.get_user_habit(user_habit.userhabit_id) is None
+    restored_user = identity_storage.get_user("test_user")
+    assert restored_user is not user
+    assert len(restored_user.habits) == 1
+    # The snapshot can be restored again after further writes
+    identity_storage.delete_user(restored_user)
+    identity_storage.restore(snapshot)
+    assert identity_storage.get_user("test_user") is not None
+
+
+def test_initial_data_is_copied():
+    source = MemoryStorageInterface()
+    populate(source)
+    storage = MemoryStorageInterface(source.data)
+    storage.delete_habit(storage.get_habit("Exercise"), cascade=True)
+    assert source.get_habit("Exercise") is not None
+    assert len(source.get_user("test_user").habits) == 1
+    assert len(storage.get_habits_by_period("daily")) == 0
+    assert isinstance(source.get_user_habits_for_habit("Exercise")[0], UserHabit)
+
+
+def test_search_habits(storage):
+    storage.insert_habit(Habit(name="Read", task_description="", period="daily"))
+    assert list(storage.iter_habit_names()) == ["Exercise", "Read"]
+    assert storage.search_habits("minutes") == ["Exercise"]
+    assert storage.search_habits("rea") == ["Read"]
@@ -0,0 +1,138 @@
+import importlib
+import inspect
+import json
+import pkgutil
+
+import pytest
+
+import data_storage
+from data_storage.interface import StorageInterface
+from data_storage.json import JsonStorageInterface
+from habit_analysis import analytics
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+from instrumentation.metrics import (
+    STORAGE_MODULES,
+    Histogram,
+    Metrics,
+    escape_label_value,
+)
+
+
+@pytest.fixture
+def metrics():
+    metrics = Metrics()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return JsonStorageInterface(str(tmp_path / "test_data.json"))
+
+
+def test_histogram():
+    histogram = Histogram((0.001, 0.01))
+    for value in (0.0005, 0.001, 0.005, 1.0):
+        histogram.observe(value)
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(1.0065)
+    assert histogram.cumulative_counts() == [(0.001, 2), (0.01, 3), (float("inf"), 4)]
+    assert histogram.json()["buckets"] == {"0.001": 2, "0.01": 3, "+Inf": 4}
+
+
+def test_disabled_metrics_are_not_instrumented():
+    get_user = JsonStorageInterface.get_user
+    get_completion_history = UserHabit.get_completion_history
+    attributes = set(vars(JsonStorageInterface))
+    metrics = Metrics()
+    assert metrics.enabled == False
+    metrics.enable()
+    assert metrics.enabled == True
+    assert JsonStorageInterface.get_user is not get_user
+    metrics.disable()
+    assert metrics.enabled == False
+    assert JsonStorageInterface.get_user is get_user
+    assert UserHabit.get_completion_history is get_completion_history
+    # Wrappers of inherited methods are removed again
+    assert set(vars(JsonStorageInterface)) == attributes
+
+
+def test_records_calls_and_bytes(metrics, storage):
+    habit = Habit("Exercise", "Do 30 minutes of exercise", "daily")
+    user = User("test_user")
+    user_habit = user.add_habit(habit)
+    storage.insert_habit(habit)
+    storage.insert_user_habit(user_habit)
+    storage.insert_user(user)
+    JsonStorageInterface(storage.file_path)
+    analytics.get_all_tracked_habits_with_streak(storage.get_user("test_user"))
+
+    latencies = metrics.json()["latencies"]
+    assert latencies["storage.JsonStorageInterface.insert_habit"]["count"] == 1
+    assert latencies["storage.JsonStorageInterface.save"]["count"] == 3
+    # The storage fixture is loaded while the metrics are enabled, but its file doesn't exist yet
+    assert latencies["storage.JsonStorageInterface.load"]["count"] == 2
+    assert latencies["analytics.get_all_tracked_habits_with_streak"]["count"] == 1
+    assert latencies["analytics.get_current_streak_for_habit"]["count"] == 1
+    assert latencies["habits.UserHabit.get_completion_history"]["count"] == 1
+    file_size = len(open(storage.file_path).read())
+    assert metrics.bytes_read == {"storage.JsonStorageInterface.load": file_size}
+    assert metrics.bytes_written["storage.JsonStorageInterface.write_file"] > file_size
+
+    metrics.reset()
+    assert metrics.json() == {"latencies": {}, "bytes_read": {}, "bytes_written": {}}
+    JsonStorageInterface(storage.file_path)
+    assert metrics.bytes_read == {"storage.JsonStorageInterface.load": file_size}
+
+
+def test_prometheus_format(metrics, storage):
+    storage.insert_habit(Habit("Exercise", "", "daily"))
+    lines = metrics.prometheus().splitlines()
+    assert "# TYPE habit_tracker_call_duration_seconds histogram" in lines
+    assert (
+        'habit_tracker_call_duration_seconds_bucket{function="storage.JsonStorageInterface.insert_habit",le="+Inf"} 1'
+        in lines
+    )
+    assert (
+        'habit_tracker_call_duration_seconds_count{function="storage.JsonStorageInterface.insert_habit"} 1'
+        in lines
+    )
+    assert "# TYPE habit_tracker_bytes_written_total counter" in lines
+    assert any(
+        line.startswith(
+            'habit_tracker_bytes_written_total{function="storage.JsonStorageInterface.write_file"}'
+        )
+        for line in lines
+    )
+    assert escape_label_value('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
+
+
+def test_write(metrics, storage, tmp_path):
+    storage.insert_habit(Habit("Exercise", "", "daily"))
+    metrics.write(str(tmp_path / "metrics.prom"))
+    metrics.write(str(tmp_path / "metrics.json"))
+    assert (tmp_path / "metrics.prom").read_text() == metrics.prometheus()
+    with open(tmp_path / "metrics.json") as fp:
+        assert json.load(fp) == metrics.json()
+
+
+def test_all_storage_classes_are_instrumented(metrics):
+    # Every module defining a storage interface must be listed, since classes are only found once imported
+    for module_info in pkgutil.iter_modules(data_storage.__path__):
+        module = importlib.import_module(f"data_storage.{module_info.name}")
+        storage_classes = [
+            value
+            for value in vars(module).values()
+            if inspect.isclass(value)
+            and issubclass(value, StorageInterface)
+            and value is not StorageInterface
+            and value.__module__ == module.__name__
+        ]
+        if len(storage_classes) == 0:
+            continue
+        assert module.__name__ in STORAGE_MODULES
+        for storage_class in storage_classes:
+            assert hasattr(storage_class.get_user, "uninstrumented")
+            assert hasattr(storage_class.update_user_habits, "uninstrumented")
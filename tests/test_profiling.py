@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from data_storage.json import JsonStorageInterface
+from habit_tracking.habits import Habit
+from instrumentation.profiling import SOURCE_DIRECTORY, Profiler, format_size
+
+
+@pytest.fixture
+def profiler():
+    profiler = Profiler()
+    profiler.start()
+    yield profiler
+    profiler.stop()
+
+
+def test_get_package():
+    assert (
+        Profiler.get_package(os.path.join(SOURCE_DIRECTORY, "data_storage", "json.py"))
+        == "data_storage"
+    )
+    assert (
+        Profiler.get_package(
+            os.path.join(SOURCE_DIRECTORY, "habit_tracking", "habits.py")
+        )
+        == "habit_tracking"
+    )
+    assert Profiler.get_package(os.__file__) is None
+
+
+def test_format_size():
+    assert format_size(512) == "512 B"
+    assert format_size(1536) == "1.5 KiB"
+    assert format_size(3 * 1024**2) == "3.0 MiB"
+    assert format_size(2 * 1024**3) == "2.0 GiB"
+
+
+def test_get_allocation_sites(profiler, tmp_path):
+    storage = JsonStorageInterface(str(tmp_path / "test_data.json"))
+    habits = [Habit(f"Habit {number}", "", "daily") for number in range(100)]
+    for habit in habits:
+        storage.insert_habit(habit)
+    allocation_sites = profiler.get_allocation_sites()
+    assert allocation_sites["data_storage"]["size"] > 0
+    assert allocation_sites["data_storage"]["count"] > 0
+    assert all(
+        site.startswith("data_storage")
+        for site in allocation_sites["data_storage"]["sites"]
+    )
+    assert sum(allocation_sites["data_storage"]["sites"].values()) == (
+        allocation_sites["data_storage"]["size"]
+    )
+
+
+def test_write_report(profiler, tmp_path):
+    storage = JsonStorageInterface(str(tmp_path / "test_data.json"))
+    storage.insert_habit(Habit("Test habit", "", "daily"))
+    JsonStorageInterface(str(tmp_path / "test_data.json")).get_habit("Test habit")
+    report_path = str(tmp_path / "profile.txt")
+    profiler.write_report(report_path, top=5)
+    with open(report_path, 'r') as fp:
+        report = fp.read()
+    assert "=== Top 5 functions by cumulative time ===" in report
+    assert "Peak traced memory:" in report
+    assert "=== Allocated memory at exit by package ===" in report
+    assert "data_storage:" in report
+    assert os.path.exists(str(tmp_path / "profile.pstats"))
@@ -0,0 +1,161 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from habit_analysis.analytics import (
+    get_current_streak_for_habit,
+    get_longest_streak_for_habit,
+)
+from habit_analysis.projections import Projections, load_checkpoint
+from habit_tracking.habits import Habit, UserHabit
+
+
+def get_created_event(user_habit: UserHabit) -> dict:
+    event = {
+        "type": "habit_created",
+        "userhabit_id": user_habit.userhabit_id,
+        "habit": user_habit.habit.name,
+        "period": user_habit.habit.period,
+        "creation_time": user_habit.creation_time.isoformat(),
+    }
+    if user_habit.archive is not None:
+        event["archive"] = user_habit.archive.json()
+    return event
+
+
+def get_completion_event(user_habit: UserHabit, completion_time: datetime) -> dict:
+    return {
+        "type": "completion_tracked",
+        "userhabit_id": user_habit.userhabit_id,
+        "completion_time": completion_time.isoformat(),
+    }
+
+
+def get_random_user_habit(rng: random.Random, period: str) -> UserHabit:
+    now = datetime.now()
+    user_habit = UserHabit(
+        Habit(f"{period} habit", "", period),
+        creation_time=now - timedelta(days=rng.randint(0, 1500), hours=rng.random()),
+    )
+    # Completions are tracked in random order, including past periods
+    for _ in range(rng.randint(0, 300)):
+        seconds = rng.uniform(0, (now - user_habit.creation_time).total_seconds())
+        user_habit.track_completion(
+            user_habit.creation_time + timedelta(seconds=seconds)
+        )
+    return user_habit
+
+
+@pytest.mark.parametrize(
+    "period", ['daily', 'weekly', 'monthly', 'quarterly', 'annually']
+)
+def test_streaks_match_analytics(period):
+    rng = random.Random(period)
+    for _ in range(10):
+        user_habit = get_random_user_habit(rng, period)
+        projections = Projections()
+        projections.apply(get_created_event(user_habit))
+        for completion_time in user_habit.completion_times:
+            projections.apply(get_completion_event(user_habit, completion_time))
+        userhabit_id = user_habit.userhabit_id
+        assert projections.get_current_streak(
+            userhabit_id
+        ) == get_current_streak_for_habit(user_habit)
+        assert projections.get_longest_streak(
+            userhabit_id
+        ) == get_longest_streak_for_habit(user_habit)
+        assert projections.get_completion_count(userhabit_id) == len(
+            user_habit.completion_times
+        )
+
+
+def test_streaks_match_analytics_with_archive():
+    rng = random.Random(0)
+    for _ in range(10):
+        user_habit = get_random_user_habit(rng, "daily")
+        user_habit.archive_completions(datetime.now() - timedelta(days=100))
+        projections = Projections()
+        projections.apply(get_created_event(user_habit))
+        for completion_time in user_habit.completion_times:
+            projections.apply(get_completion_event(user_habit, completion_time))
+        userhabit_id = user_habit.userhabit_id
+        assert projections.get_current_streak(
+            userhabit_id
+        ) == get_current_streak_for_habit(user_habit)
+        assert projections.get_longest_streak(
+            userhabit_id
+        ) == get_longest_streak_for_habit(user_habit)
+
+
+def test_counts():
+    habit = Habit("Exercise", "", "daily")
+    user_habits = [
+        UserHabit(habit, creation_time=datetime(2024, 1, 1)) for _ in range(2)
+    ]
+    projections = Projections()
+    for user_habit in user_habits:
+        projections.apply(get_created_event(user_habit))
+    projections.apply(get_completion_event(user_habits[0], datetime(2024, 1, 1, 8)))
+    projections.apply(get_completion_event(user_habits[0], datetime(2024, 1, 2, 8)))
+    projections.apply(get_completion_event(user_habits[1], datetime(2024, 1, 2, 9)))
+    assert projections.get_daily_count(datetime(2024, 1, 2).date()) == 2
+    assert projections.get_daily_count(datetime(2024, 1, 3).date()) == 0
+    assert projections.get_habit_total("Exercise") == 3
+    assert projections.get_completion_count(user_habits[0].userhabit_id) == 2
+    assert (
+        projections.get_current_streak(
+            user_habits[0].userhabit_id, now=datetime(2024, 1, 3, 12)
+        )
+        == 2
+    )
+    assert (
+        projections.get_current_streak(
+            user_habits[0].userhabit_id, now=datetime(2024, 1, 4, 12)
+        )
+        == 0
+    )
+    # Removed UserHabits are no longer projected, but their completions still count
+    projections.apply(
+        {"type": "habit_removed", "userhabit_id": user_habits[0].userhabit_id}
+    )
+    assert user_habits[0].userhabit_id not in projections
+    assert projections.get_habit_total("Exercise") == 3
+    assert projections.event_count == 6
+
+
+def test_out_of_order_completions_merge_runs():
+    user_habit = UserHabit(
+        Habit("Exercise", "", "daily"), creation_time=datetime(2024, 1, 1)
+    )
+    projections = Projections()
+    projections.apply(get_created_event(user_habit))
+    for day in (1, 2, 4, 5, 3):
+        projections.apply(get_completion_event(user_habit, datetime(2024, 1, day)))
+    assert projections.user_habits[user_habit.userhabit_id].runs == [(0, 4)]
+    assert projections.get_longest_streak(user_habit.userhabit_id) == 5
+    assert (
+        projections.get_current_streak(
+            user_habit.userhabit_id, now=datetime(2024, 1, 6, 12)
+        )
+        == 5
+    )
+
+
+def test_checkpoint(tmp_path):
+    file_path = str(tmp_path / "checkpoint.json")
+    assert load_checkpoint(file_path).event_count == 0
+    rng = random.Random(1)
+    projections = Projections()
+    user_habits = [get_random_user_habit(rng, "weekly") for _ in range(5)]
+    for user_habit in user_habits:
+        projections.apply(get_created_event(user_habit))
+        for completion_time in user_habit.completion_times:
+            projections.apply(get_completion_event(user_habit, completion_time))
+    projections.save_checkpoint(file_path)
+    loaded = load_checkpoint(file_path)
+    assert loaded.json() == projections.json()
+    for user_habit in user_habits:
+        assert loaded.get_current_streak(
+            user_habit.userhabit_id
+        ) == get_current_streak_for_habit(user_habit)
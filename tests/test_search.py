@@ -0,0 +1,73 @@
+import pytest
+
+from data_storage.search import HabitSearchIndex
+
+
+@pytest.fixture
+def index():
+    index = HabitSearchIndex()
+    index.add("Morning Exercise", "Do 30 minutes of exercise")
+    index.add("Read", "Read a book for 1 hour")
+    index.add("Meal Planning", "Plan the meals for the week")
+    index.add("Meditate", "Meditate for 10 minutes in the morning")
+    return index
+
+
+def test_prefix_matches_first(index):
+    assert index.search("me") == ["Meal Planning", "Meditate"]
+    assert index.search("MEDI") == ["Meditate"]
+
+
+def test_fuzzy_matches(index):
+    # Typo in the name
+    assert index.search("exercize")[0] == "Morning Exercise"
+    # Match in the task description only
+    assert index.search("book") == ["Read"]
+    # Name matches are ranked before description matches
+    assert index.search("morning") == ["Morning Exercise", "Meditate"]
+
+
+def test_no_matches(index):
+    assert index.search("") == []
+    assert index.search("xyz") == []
+
+
+def test_limit(index):
+    assert index.search("m", limit=2) == ["Meal Planning", "Meditate"]
+
+
+def test_add_and_remove(index):
+    assert len(index) == 4
+    index.remove("Meditate")
+    assert "Meditate" not in index
+    assert index.search("medi") == []
+    assert index.search("morning") == ["Morning Exercise"]
+    index.add("Read", "Study a textbook")
+    assert len(index) == 3
+    assert index.search("textbook") == ["Read"]
+    assert index.search("hour") == []
+    # Removing a habit which is not indexed does nothing
+    index.remove("Meditate")
+    assert len(index) == 3
+
+
+def test_add_all(index):
+    index.add_all([("Read", "Study a textbook"), ("Walk", "Walk in the park")])
+    assert len(index) == 5
+    assert index.search("textbook") == ["Read"]
+    assert index.search("wa") == ["Walk"]
+
+
+def test_fuzzy_matches_with_many_candidates():
+    index = HabitSearchIndex()
+    index.add_all(
+        (f"Demo habit {number}", f"Complete demo habit {number}")
+        for number in range(1000)
+    )
+    # The best matches are found without scoring every habit sharing a trigram with the query
+    assert index.search("demo hbit 12", limit=3) == [
+        "Demo habit 12",
+        "Demo habit 120",
+        "Demo habit 121",
+    ]
+    assert index.search("complete 999", limit=1) == ["Demo habit 999"]
@@ -0,0 +1,162 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from data_storage.json import JsonStorageInterface
+from habit_tracking.habits import Habit
+from habit_tracking.users import User
+from http_api.server import HabitTrackerServer
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = JsonStorageInterface(str(tmp_path / "test_data.json"))
+    for name, period in [("Exercise", "daily"), ("Meal Planning", "weekly")]:
+        habit = Habit(name=name, task_description=name, period=period)
+        storage.insert_habit(habit)
+    user = User(username="test_user")
+    for habit in storage.get_all_habits():
+        user_habit = user.add_habit(habit)
+        user_habit.creation_time = datetime(2023, 1, 1)
+        storage.insert_user_habit(user_habit)
+    storage.insert_user(user)
+    return storage
+
+
+async def request(port: int, method: str, path: str, body: dict = None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+        f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, response_body = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ")[1])
+    return status, json.loads(response_body)
+
+
+def run_with_server(storage, test):
+    async def main():
+        server = HabitTrackerServer(storage, port=0)
+        await server.start()
+        try:
+            return await test(server.port)
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_list_habits(storage):
+    async def test(port):
+        status, habits = await request(port, "GET", "/habits")
+        assert status == 200
+        assert [habit["name"] for habit in habits] == ["Exercise", "Meal Planning"]
+        status, habits = await request(port, "GET", "/habits?period=weekly")
+        assert [habit["name"] for habit in habits] == ["Meal Planning"]
+
+    run_with_server(storage, test)
+
+
+def test_track_completion_and_analytics(storage):
+    async def test(port):
+        path = "/users/test_user/habits/Exercise/completions"
+        status, response = await request(port, "POST", path)
+        assert status == 201
+        assert response == {"tracked": True}
+        status, response = await request(port, "POST", path)
+        assert status == 200
+        assert response == {"tracked": False}
+
+        status, habits = await request(port, "GET", "/users/test_user/habits")
+        assert status == 200
+        streaks = {habit["name"]: habit["current_streak"] for habit in habits}
+        assert streaks == {"Exercise": 1, "Meal Planning": 0}
+        status, response = await request(port, "GET", "/users/test_user/analytics")
+        assert response["longest_streak"] == {"habit": "Exercise", "streak": 1}
+
+    run_with_server(storage, test)
+    assert len(storage.get_user("test_user").habits[0].completion_times) == 1
+
+
+def test_errors(storage):
+    async def test(port):
+        status, response = await request(port, "GET", "/users/unknown/habits")
+        assert status == 404
+        assert "error" in response
+        status, _ = await request(port, "GET", "/unknown")
+        assert status == 404
+        path = "/users/test_user/habits/Exercise/completions"
+        status, _ = await request(port, "POST", path, {"time": "yesterday"})
+        assert status == 400
+        status, response = await request(port, "POST", path, {"time": "2999-01-01"})
+        assert status == 400
+        assert "future" in response["error"]
+        status, response = await request(port, "POST", path, {"time": "2000-01-01"})
+        assert status == 400
+        assert "before" in response["error"]
+        status, _ = await request(
+            port, "POST", "/users/test_user/habits/Read/completions"
+        )
+        assert status == 404
+
+    run_with_server(storage, test)
+    assert storage.get_user("test_user").habits[0].completion_times == []
+
+
+def test_concurrent_completions_are_all_stored(storage):
+    start = datetime(2024, 1, 1, 9)
+
+    async def test(port):
+        path = "/users/test_user/habits/Exercise/completions"
+        responses = await asyncio.gather(
+            *[
+                request(
+                    port,
+                    "POST",
+                    path,
+                    {"time": (start + timedelta(days=day)).isoformat()},
+                )
+                for day in range(30)
+            ]
+        )
+        assert all(status == 201 for status, _ in responses)
+
+    run_with_server(storage, test)
+    stored = JsonStorageInterface(storage.file_path).get_user("test_user")
+    assert len(stored.habits[0].completion_times) == 30
+
+
+def test_completion_times_with_utc_offset(storage):
+    time = datetime(2024, 1, 1, 9).astimezone()
+
+    async def test(port):
+        path = "/users/test_user/habits/Exercise/completions"
+        status, _ = await request(port, "POST", path, {"time": time.isoformat()})
+        assert status == 201
+        status, _ = await request(port, "POST", path, {"time": 5})
+        assert status == 400
+
+    run_with_server(storage, test)
+    stored = JsonStorageInterface(storage.file_path).get_user("test_user")
+    assert stored.habits[0].completion_times[0] == time.replace(tzinfo=None)
+
+
+def test_user_locks_are_released(storage):
+    async def main():
+        server = HabitTrackerServer(storage, port=0)
+        await server.start()
+        try:
+            for username in ("test_user", "unknown", "other"):
+                path = f"/users/{username}/habits/Exercise/completions"
+                await request(server.port, "POST", path)
+            return len(server._HabitTrackerServer__user_locks)
+        finally:
+            await server.close()
+
+    assert asyncio.run(main()) == 0
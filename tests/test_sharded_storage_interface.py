@@ -0,0 +1,154 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from data_storage.sharded import ShardedJsonStorageInterface
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return ShardedJsonStorageInterface(str(tmp_path / "store"), num_shards=8)
+
+
+def test_insert_and_get_user_with_habits(storage):
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    assert storage.insert_habit(habit) == True
+    user = User(username="test_user")
+    user_habit = user.add_habit(habit)
+    assert storage.insert_user_habit(user_habit) == True
+    assert storage.insert_user(user) == True
+    assert storage.insert_user(user) == False
+    retrieved_user = storage.get_user("test_user")
+    assert retrieved_user.username == "test_user"
+    assert retrieved_user.habits[0].userhabit_id == user_habit.userhabit_id
+    assert retrieved_user.habits[0].habit.name == "Exercise"
+    assert storage.get_user("nonexistent_user") is None
+
+
+def test_update_user_habit_only_rewrites_its_shard(storage):
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    storage.insert_habit(habit)
+    user_habits = [UserHabit(habit=habit) for _ in range(20)]
+    for user_habit in user_habits:
+        storage.insert_user_habit(user_habit)
+    shard_dir = os.path.join(storage.directory, "shards")
+    mtimes = {
+        name: os.stat(os.path.join(shard_dir, name)).st_mtime_ns
+        for name in os.listdir(shard_dir)
+    }
+    target = user_habits[0]
+    target.completion_times.append(datetime(2021, 1, 1, 12, 0, 0))
+    assert storage.update_user_habit(target) == True
+    target_file = f"{storage.shard_index(target.userhabit_id):04d}.json"
+    for name, mtime in mtimes.items():
+        if name != target_file:
+            assert os.stat(os.path.join(shard_dir, name)).st_mtime_ns == mtime
+    retrieved_user_habit = storage.get_user_habit(target.userhabit_id)
+    assert retrieved_user_habit.completion_times == [datetime(2021, 1, 1, 12, 0, 0)]
+
+
+def test_delete_records(storage):
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    user = User(username="test_user")
+    user_habit = UserHabit(habit=habit)
+    assert storage.delete_habit(habit) == False
+    assert storage.delete_user(user) == False
+    assert storage.delete_user_habit(user_habit) == False
+    storage.insert_habit(habit)
+    storage.insert_user(user)
+    storage.insert_user_habit(user_habit)
+    assert storage.delete_user_habit(user_habit) == True
+    assert storage.delete_user(user) == True
+    assert storage.delete_habit(habit) == True
+    assert storage.get_user_habit(user_habit.userhabit_id) is None
+    assert storage.get_user("test_user") is None
+    assert storage.get_habit("Exercise") is None
+
+
+def test_data_persistence(tmp_path):
+    directory = str(tmp_path / "store")
+    storage1 = ShardedJsonStorageInterface(directory, num_shards=4)
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    storage1.insert_habit(habit)
+    user_habits = [UserHabit(habit=habit) for _ in range(10)]
+    for user_habit in user_habits:
+        storage1.insert_user_habit(user_habit)
+    storage2 = ShardedJsonStorageInterface(directory)
+    assert storage2.num_shards == 4
+    assert len(storage2.get_all_habits()) == 1
+    assert {uh.userhabit_id for uh in storage2.get_all_user_habits()} == {
+        uh.userhabit_id for uh in user_habits
+    }
+
+
+def test_init_with_mismatching_shard_count(tmp_path):
+    directory = str(tmp_path / "store")
+    ShardedJsonStorageInterface(directory, num_shards=4)
+    with pytest.raises(AssertionError):
+        ShardedJsonStorageInterface(directory, num_shards=8)
+
+
+def test_bulk_insert(storage):
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    assert storage.insert_habits([habit, habit]) == [True, False]
+    user_habits = [UserHabit(habit=habit) for _ in range(10)]
+    assert storage.insert_user_habits(user_habits) == [True] * 10
+    users = [User(username=f"user_{i}") for i in range(5)]
+    assert storage.insert_users(users + users[:1]) == [True] * 5 + [False]
+    assert len(storage.get_all_users()) == 5
+    assert len(list(storage.iter_user_habits())) == 10
+
+
+def test_delete_habit_cascade(storage):
+    exercise = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    read = Habit(name="Read", task_description="Read a book", period="weekly")
+    storage.insert_habits([exercise, read])
+    users = [User(username=f"user_{i}") for i in range(3)]
+    for user in users:
+        storage.insert_user_habits([user.add_habit(exercise), user.add_habit(read)])
+    storage.insert_users(users)
+    assert storage.delete_habit(exercise, cascade=True) == True
+    assert len(storage.get_all_user_habits()) == 3
+    reloaded_storage = ShardedJsonStorageInterface(storage.directory)
+    for user in reloaded_storage.get_all_users():
+        assert [user_habit.habit.name for user_habit in user.habits] == ["Read"]
+
+
+def test_failed_save_keeps_previous_file(tmp_path, monkeypatch):
+    directory = str(tmp_path / "store")
+    storage = ShardedJsonStorageInterface(directory, num_shards=4)
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    storage.insert_habit(habit)
+    files = sorted(os.listdir(directory))
+
+    def failing_dump(data, fp):
+        fp.write('{"partial')
+        raise OSError("disk full")
+
+    monkeypatch.setattr("data_storage.sharded.json.dump", failing_dump)
+    with pytest.raises(OSError):
+        storage.insert_habit(
+            Habit(name="Reading", task_description="Read", period="daily")
+        )
+    monkeypatch.undo()
+    assert sorted(os.listdir(directory)) == files
+    assert [
+        h.name for h in ShardedJsonStorageInterface(directory).get_all_habits()
+    ] == ["Exercise"]
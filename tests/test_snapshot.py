@@ -0,0 +1,73 @@
+import gc
+from datetime import datetime
+
+import pytest
+
+from data_storage.json import JsonStorageInterface
+from habit_tracking.habits import Habit, UserHabit
+from habit_tracking.users import User
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = JsonStorageInterface(str(tmp_path / "test_data.json"))
+    habit = Habit(
+        name="Exercise", task_description="Do 30 minutes of exercise", period="daily"
+    )
+    storage.insert_habit(habit)
+    user = User(username="test_user")
+    storage.insert_user_habit(user.add_habit(habit))
+    storage.insert_user(user)
+    return storage
+
+
+def test_snapshot_is_unaffected_by_writes(storage):
+    snapshot = storage.snapshot()
+    user = storage.get_user("test_user")
+    user_habit = user.habits[0]
+    user_habit.track_completion(datetime(2024, 1, 1))
+    storage.update_user_habit(user_habit)
+    read = Habit(name="Read", task_description="Read a book", period="weekly")
+    storage.insert_habit(read)
+    new_user_habit = user.add_habit(read)
+    storage.insert_user_habit(new_user_habit)
+    storage.update_user(user)
+    storage.delete_habit(storage.get_habit("Exercise"))
+
+    assert [habit.name for habit in snapshot.get_all_habits()] == ["Exercise"]
+    assert snapshot.get_habit("Read") is None
+    assert snapshot.get_user_habit(new_user_habit.userhabit_id) is None
+    snapshot_user = snapshot.get_user("test_user")
+    assert len(snapshot_user.habits) == 1
+    assert snapshot_user.habits[0].completion_times == []
+    assert snapshot_user.habits[0].habit.name == "Exercise"
+    assert len(snapshot.data["habits"]) == 1
+    # The live data reflects all writes
+    assert [habit.name for habit in storage.get_all_habits()] == ["Read"]
+    assert len(storage.get_user("test_user").habits) == 2
+
+
+def test_snapshot_only_keeps_changed_records(storage):
+    snapshot = storage.snapshot()
+    user_habits = [UserHabit(habit=storage.get_habit("Exercise")) for _ in range(10)]
+    storage.insert_user_habits(user_habits)
+    preserved = snapshot.data["user_habits"].preserved_records
+    assert len(preserved) == 10
+    assert len(snapshot.data["habits"].preserved_records) == 0
+    assert len(snapshot.get_all_user_habits()) == 1
+
+
+def test_released_snapshots_are_not_updated(storage, monkeypatch):
+    snapshot = storage.snapshot()
+    preserve_calls = []
+    monkeypatch.setattr(
+        type(snapshot),
+        "preserve",
+        lambda self, section, key, record: preserve_calls.append(key),
+    )
+    del snapshot
+    gc.collect()
+    storage.insert_habit(
+        Habit(name="Read", task_description="Read a book", period="weekly")
+    )
+    assert preserve_calls == []
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from habit_analysis.analytics import (
+    get_all_time_longest_habit_streak,
+    get_current_longest_habit_streak,
+)
+from habit_analysis.projections import Projections
+from habit_analysis.streaks import (
+    get_habit_streaks,
+    get_highest_streak,
+    get_user_habit_streaks,
+)
+from habit_tracking.habits import Habit
+from habit_tracking.users import User
+
+
+def make_user() -> User:
+    user = User(username="test_user")
+    now = datetime.now()
+    for name, days in [("Exercise", 2), ("Reading", 4), ("Cooking", 4)]:
+        user_habit = user.add_habit(Habit(name, name, "daily"))
+        user_habit.creation_time = now - timedelta(days=10)
+        for day in range(days):
+            user_habit.track_completion(now - timedelta(days=day + 1))
+    return user
+
+
+def test_get_highest_streak_matches_analytics():
+    user = make_user()
+    habit_streaks = get_habit_streaks(user)
+    habit, streak = get_all_time_longest_habit_streak(user)
+    assert get_highest_streak(habit_streaks, "longest_streak") == {
+        "habit": habit.name,
+        "streak": streak,
+    }
+    habit, streak = get_current_longest_habit_streak(user)
+    assert get_highest_streak(habit_streaks, "current_streak") == {
+        "habit": habit.name,
+        "streak": streak,
+    }
+    # The first of the habits with the same streak is picked
+    assert habit.name == "Reading"
+    assert get_highest_streak([], "current_streak") == {"habit": None, "streak": 0}
+
+
+def test_streaks_are_looked_up_in_projections():
+    user = make_user()
+    user_habit = user.habits[0]
+    projections = Projections()
+    projections.apply(
+        {
+            "type": "habit_created",
+            "userhabit_id": user_habit.userhabit_id,
+            "habit": user_habit.habit.name,
+            "period": user_habit.habit.period,
+            "creation_time": user_habit.creation_time.isoformat(),
+        }
+    )
+    # The projected UserHabit has no completions, the others fall back to their completion history
+    streaks = get_habit_streaks(user, projections=projections)
+    assert [habit_streak["longest_streak"] for habit_streak in streaks] == [0, 4, 4]
+    assert get_user_habit_streaks(user_habit) == (2, 2)
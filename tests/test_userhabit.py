@@ -1,6 +1,9 @@
 from datetime import datetime
 
 
+from habit_tracking.habits import CompletionTimes, Habit, UserHabit
+
+
 def test_userhabit_initialization(user_habits):
     user_habit = user_habits['5eb76a074b6a4d23bf13880eca1e05be']
     assert user_habit.userhabit_id == '5eb76a074b6a4d23bf13880eca1e05be'
@@ -65,3 +68,137 @@ def test_userhabit_json(user_habits):
     assert user_habit_json['habit'] == 'Skill Development'
     assert len(user_habit_json['completion_times']) == 1
     assert user_habit_json['creation_time'] == '2024-08-15T09:24:05.208666'
+
+
+def test_userhabit_version_tracks_modifications(user_habits):
+    user_habit = user_habits['5eb76a074b6a4d23bf13880eca1e05be']
+    version = user_habit.version
+    user_habit.json()
+    assert user_habit.version == version
+    user_habit.track_completion(datetime(2024, 10, 1))
+    assert user_habit.version != version
+    version = user_habit.version
+    user_habit.creation_time = datetime(2024, 8, 1)
+    assert user_habit.version != version
+    version = user_habit.version
+    user_habit.completion_times[0] = datetime(2024, 8, 2)
+    assert user_habit.version != version
+
+
+def test_userhabit_json_reencodes_only_changes(user_habits):
+    user_habit = user_habits['5eb76a074b6a4d23bf13880eca1e05be']
+    first_json = user_habit.json()
+    assert first_json == user_habit.json()
+    user_habit.track_completion(datetime(2024, 10, 1))
+    appended_json = user_habit.json()
+    assert appended_json['completion_times'] == first_json['completion_times'] + [
+        '2024-10-01T00:00:00'
+    ]
+    user_habit.completion_times[0] = datetime(2024, 8, 2)
+    assert user_habit.json()['completion_times'][0] == '2024-08-02T00:00:00'
+    user_habit.completion_times = [datetime(2024, 8, 3)]
+    assert user_habit.json()['completion_times'] == ['2024-08-03T00:00:00']
+    # The returned json can't be used to modify the cached encoding
+    user_habit.json()['completion_times'].append('invalid')
+    assert user_habit.json()['completion_times'] == ['2024-08-03T00:00:00']
+
+
+def test_userhabit_archive_completions():
+    habit = Habit("Read", "Read a book", "daily", datetime(2024, 1, 1))
+    user_habit = UserHabit(
+        habit=habit,
+        creation_time=datetime(2024, 1, 1),
+        completion_times=[
+            datetime(2024, 1, 1, 9),
+            datetime(2024, 1, 2, 9),
+            datetime(2024, 1, 4, 9),
+            datetime(2024, 1, 5, 9),
+            datetime(2024, 1, 6, 9),
+        ],
+    )
+    # Only whole periods are archived
+    archived = user_habit.archive_completions(datetime(2024, 1, 5, 12))
+    assert archived == [
+        datetime(2024, 1, 1, 9),
+        datetime(2024, 1, 2, 9),
+        datetime(2024, 1, 4, 9),
+    ]
+    assert user_habit.completion_times == [
+        datetime(2024, 1, 5, 9),
+        datetime(2024, 1, 6, 9),
+    ]
+    archive = user_habit.archive
+    assert archive.archived_until == datetime(2024, 1, 5)
+    assert archive.period_count == 4
+    assert archive.completion_count == 3
+    assert archive.longest_streak == 2
+    assert archive.trailing_streak == 1
+    assert user_habit.get_completion_history()[0][0] == datetime(2024, 1, 5)
+    # Archived periods can't be completed anymore
+    assert user_habit.track_completion(datetime(2024, 1, 3, 9)) == False
+    # Archiving the same range again does nothing
+    assert user_habit.archive_completions(datetime(2024, 1, 5, 12)) == []
+    assert user_habit.json()["archive"] == archive.json()
+
+
+def decoded_count(completion_times):
+    return sum(
+        1
+        for i in range(len(completion_times))
+        if isinstance(list.__getitem__(completion_times, i), datetime)
+    )
+
+
+def test_completion_times_are_decoded_lazily():
+    encoded = [f"2024-01-{day:02d}T09:00:00" for day in range(1, 11)]
+    completion_times = CompletionTimes.from_encoded(encoded)
+    assert len(completion_times) == 10
+    assert decoded_count(completion_times) == 0
+    assert completion_times[-1] == datetime(2024, 1, 10, 9)
+    assert decoded_count(completion_times) == 1
+    assert completion_times.any_between(datetime(2024, 1, 5), datetime(2024, 1, 6))
+    assert not completion_times.any_between(datetime(2024, 1, 11), datetime(2024, 2, 1))
+    assert decoded_count(completion_times) == 1
+
+    # Appending keeps the encoded values, other modifications decode all elements
+    completion_times.append(datetime(2024, 1, 12, 9, 30, 0, 5))
+    assert completion_times.encoded[-1] == "2024-01-12T09:30:00.000005"
+    assert completion_times.any_between(datetime(2024, 1, 12), datetime(2024, 1, 13))
+    completion_times.insert(0, datetime(2023, 12, 31))
+    assert completion_times.encoded is None
+    assert decoded_count(completion_times) == 12
+    assert completion_times[:2] == [datetime(2023, 12, 31), datetime(2024, 1, 1, 9)]
+
+
+def test_lazy_completion_times_behave_like_a_list():
+    completion_times = CompletionTimes.from_encoded(
+        ["2024-01-03T09:00:00", "2024-01-01T09:00:00.500000"]
+    )
+    assert completion_times == [
+        datetime(2024, 1, 3, 9),
+        datetime(2024, 1, 1, 9, 0, 0, 500000),
+    ]
+    assert list(completion_times) == list(reversed(list(reversed(completion_times))))
+    assert datetime(2024, 1, 3, 9) in completion_times
+    # Unsorted completion times are searched linearly
+    assert completion_times.any_between(datetime(2024, 1, 1), datetime(2024, 1, 2))
+    assert not completion_times.any_between(datetime(2024, 1, 2), datetime(2024, 1, 3))
+    # Values which are not in the format produced by isoformat are decoded up front
+    completion_times = CompletionTimes.from_encoded(["2024-01-03 09:00:00"])
+    assert completion_times.encoded is None
+    assert decoded_count(completion_times) == 1
+
+
+def test_userhabit_json_does_not_decode_completion_times():
+    habit = Habit("Read", "Read a book", "daily", datetime(2024, 1, 1))
+    encoded = ["2024-01-01T09:00:00", "2024-01-02T09:00:00"]
+    user_habit = UserHabit(
+        habit=habit,
+        completion_times=CompletionTimes.from_encoded(encoded),
+        creation_time=datetime(2024, 1, 1),
+    )
+    assert user_habit.json()["completion_times"] == encoded
+    assert decoded_count(user_habit.completion_times) == 0
+    assert user_habit.track_completion(datetime(2024, 1, 3, 9)) == True
+    assert user_habit.track_completion(datetime(2024, 1, 2, 20)) == False
+    assert user_habit.json()["completion_times"] == encoded + ["2024-01-03T09:00:00"]